@@ -1,3 +1,21 @@
-from audim.sub2pod import core, layouts
+import importlib
 
 __all__ = ["layouts", "core"]
+
+# Submodules are only imported on first access, so that `import audim` stays cheap
+_lazy_submodules = {
+    "core": "audim.sub2pod.core",
+    "layouts": "audim.sub2pod.layouts",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        module = importlib.import_module(_lazy_submodules[name])
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_lazy_submodules])
@@ -5,10 +5,6 @@ import re
 from typing import Optional
 from pathlib import Path
 
-import torch
-import whisperx
-from whisperx.SubtitlesProcessor import SubtitlesProcessor
-
 from audim.aud2sub.transcribers.base import BaseTranscriber
 
 
@@ -73,6 +69,9 @@ class PodcastTranscriber(BaseTranscriber):
         self.compute_type = compute_type
         self.batch_size = batch_size
 
+        # Import locally since this is a heavier dependency
+        import torch
+
         # Auto-detect device and correctly set to CPU if CUDA is not available
         if device is None:
             device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -158,6 +157,8 @@ class PodcastTranscriber(BaseTranscriber):
         if message:
             print(f"Clearing GPU memory: {message}")
 
+        import torch
+
         gc.collect()
         torch.cuda.empty_cache()
 
@@ -169,6 +170,10 @@ class PodcastTranscriber(BaseTranscriber):
             audio_path: Path to the audio file.
         """
 
+        # Import locally since these are heavier dependencies
+        import whisperx
+        from whisperx.SubtitlesProcessor import SubtitlesProcessor
+
         print(f"Processing {audio_path}...")
 
         # 1. Load the audio file
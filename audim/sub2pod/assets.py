@@ -0,0 +1,96 @@
+"""
+Decoded asset registry for videos
+
+This module decodes image assets, like logos and profile pictures, once per
+process and shares the decoded images between all elements and layouts using
+them. Large source images, like camera originals used as speaker photos, are
+decoded at a reduced scale when they are only shown small.
+"""
+
+import collections
+import os
+import threading
+
+from PIL import Image
+
+# Maximum number of decoded images kept in the registry
+max_images = 64
+
+# Decoded images by (path, modification time, file size, size, mode)
+_images = collections.OrderedDict()
+
+# Guards the registry, which render threads share
+_lock = threading.Lock()
+
+
+def load_image(path, size=None, mode="RGBA"):
+    """
+    Load an image, decoding it only once per process
+
+    Images are keyed by the file path, its modification time and size, and the
+    requested size and mode, so edited files are decoded again. The returned
+    image is shared, copy it before modifying it.
+
+    When a size is given, JPEG images are decoded at the smallest scale that is
+    still at least that large (using Pillow's draft mode), and other images are
+    first reduced by an integer factor, before being resized to the exact size.
+
+    Args:
+        path (str): Path to the image file
+        size (tuple, optional): Width and height to resize the image to,
+            defaults to the original size
+        mode (str): Mode to convert the image to, defaults to "RGBA"
+
+    Returns:
+        Image: Decoded image, shared by all callers
+    """
+
+    stat = os.stat(path)
+    key = (
+        os.path.abspath(path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        tuple(size) if size else None,
+        mode,
+    )
+
+    with _lock:
+        image = _images.get(key)
+        if image is not None:
+            _images.move_to_end(key)
+            return image
+
+    image = _decode_image(path, size, mode)
+
+    # Drop the least recently used image to keep memory use bounded
+    with _lock:
+        if len(_images) >= max_images:
+            _images.popitem(last=False)
+        _images[key] = image
+
+    return image
+
+
+def clear():
+    """
+    Forget all decoded images
+    """
+
+    _images.clear()
+
+
+def _decode_image(path, size, mode):
+    """
+    Decode an image at the requested size and mode (mostly for internal use)
+    """
+
+    with Image.open(path) as image:
+        if size:
+            # Only has an effect on JPEG images, which then decode at a reduced
+            # scale that is still at least as large as the requested size
+            image.draft(None, tuple(size))
+        image = image.convert(mode)
+
+    if size and image.size != tuple(size):
+        image = image.resize(tuple(size), reducing_gap=3.0)
+    return image
@@ -0,0 +1,252 @@
+"""
+Reused frame buffers for layouts
+
+This module lets layouts draw frames straight into preallocated numpy buffers.
+Every buffer is shared with a PIL image, so whatever PIL draws lands in the
+memory numpy reads, and a rendered frame is returned as a view of its buffer.
+Rendering a frame then neither allocates a canvas nor copies it into a new
+array, and a pool of buffers is reused for frame after frame.
+"""
+
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+class FrameBuffer:
+    """
+    RGBA frame buffer shared between numpy and PIL
+
+    `array` and `image` are two views of the same memory, anything drawn on the
+    image is visible in the array right away. The buffer can also be mapped as
+    an RGBX image, which effects treat as opaque.
+    """
+
+    def __init__(self, frame_size, array=None):
+        """
+        Initialize the frame buffer
+
+        Args:
+            frame_size (tuple): Width and height of the frames
+            array (np.ndarray, optional): Caller-supplied buffer to draw into, a
+                writable C-contiguous uint8 array of shape (height, width, 4).
+                Allocated if not given.
+        """
+
+        width, height = self.size = tuple(frame_size)
+        if array is None:
+            array = np.empty((height, width, 4), dtype=np.uint8)
+        elif (
+            array.shape != (height, width, 4)
+            or array.dtype != np.uint8
+            or not array.flags.c_contiguous
+            or not array.flags.writeable
+        ):
+            raise ValueError(
+                "Invalid frame buffer: expected a writable C-contiguous uint8 "
+                f"array of shape ({height}, {width}, 4), "
+                f"got a {array.dtype} array of shape {array.shape}"
+            )
+
+        self.array = array
+        self._images = {}
+
+    def __getstate__(self):
+        # Images map memory of this process, they are mapped again on demand
+        state = self.__dict__.copy()
+        state["_images"] = {}
+        return state
+
+    @property
+    def image(self):
+        """
+        Get the RGBA image drawing into the buffer
+        """
+
+        return self.get_image("RGBA")
+
+    def get_image(self, mode="RGBA"):
+        """
+        Get an image drawing into the buffer
+
+        Args:
+            mode (str): `'RGBA'`, or `'RGBX'` to treat the buffer as opaque
+
+        Returns:
+            Image: Image mapping the memory of the buffer
+        """
+
+        # Some PIL operations replace the memory of an image instead of drawing
+        # into it, map the buffer again if that happened
+        image, core = self._images.get(mode, (None, None))
+        if image is None or image.im is not core:
+            image = Image.frombuffer(mode, self.size, self.array, "raw", mode, 0, 1)
+            # Mapped images are read-only, and drawing on them would silently
+            # copy the buffer first. Clearing the flag is not documented by
+            # Pillow, it is checked by the tests with Pillow 10.2 to 12, and
+            # Pillow is capped below 13 until newer versions are checked.
+            image.readonly = 0
+            self._images[mode] = (image, image.im)
+        return image
+
+    def view(self, frame=None, channels=4):
+        """
+        Get a rendered frame as a view of the buffer
+
+        Args:
+            frame (optional): Image or RGBA array the frame was rendered into.
+                Copied into the buffer if it does not map the buffer.
+            channels (int): 3 for an RGB view, 4 for the RGBA array
+
+        Returns:
+            np.ndarray: View of the buffer, of shape (height, width, channels)
+        """
+
+        if isinstance(frame, Image.Image):
+            if not any(
+                frame is image and frame.im is core
+                for image, core in self._images.values()
+            ):
+                self.array[:] = np.asarray(frame.convert("RGBA"))
+        elif frame is not None and frame is not self.array:
+            self.array[:] = frame
+        return self.array if channels == 4 else self.array[:, :, :channels]
+
+
+class FramePool:
+    """
+    Ring of reused frame buffers
+
+    Hands out its buffers in turn, so a frame stays intact until `size` more
+    frames have been taken from the pool. The size has to cover every frame the
+    caller still holds on to while the next one is rendered, like frames that
+    are queued for writing.
+
+    Every thread takes from a ring of its own, so threads rendering with a
+    shared layout never draw into the same buffer.
+    """
+
+    def __init__(self, size=1):
+        """
+        Initialize the frame pool
+
+        Args:
+            size (int): Number of buffers in the pool
+        """
+
+        if size < 1:
+            raise ValueError(f"Invalid frame pool size: {size}. Must be at least 1")
+
+        self.size = size
+        self._rings = threading.local()
+
+    def __getstate__(self):
+        # Buffers are allocated again in every process
+        state = self.__dict__.copy()
+        del state["_rings"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._rings = threading.local()
+
+    def take(self, frame_size):
+        """
+        Take the next buffer of the pool
+
+        Buffers are allocated on first use, and again when the frame size
+        changes.
+
+        Args:
+            frame_size (tuple): Width and height of the frames
+
+        Returns:
+            FrameBuffer: Buffer to render the next frame into
+        """
+
+        ring = self._rings
+        if not hasattr(ring, "buffers"):
+            ring.buffers = []
+            ring.next = 0
+
+        index = ring.next
+        ring.next = (index + 1) % self.size
+
+        if index == len(ring.buffers):
+            ring.buffers.append(FrameBuffer(frame_size))
+        elif ring.buffers[index].size != tuple(frame_size):
+            ring.buffers[index] = FrameBuffer(frame_size)
+        return ring.buffers[index]
+
+
+def frame_to_image(frame):
+    """
+    Get a rendered frame as a PIL image, like for saving it to a file
+
+    RGB views of a frame buffer are converted straight from the RGBA buffer, as
+    converting the strided view with numpy would copy it one extra time.
+
+    Args:
+        frame: Rendered frame (numpy array or PIL Image)
+
+    Returns:
+        Image: RGB or RGBA image of the frame
+    """
+
+    if isinstance(frame, Image.Image):
+        return frame
+
+    buffer = _get_rgba_buffer(frame)
+    if buffer is not None:
+        return Image.fromarray(buffer).convert("RGB")
+    return Image.fromarray(frame)
+
+
+def frame_to_rgb24(frame):
+    """
+    Pack a rendered frame into raw rgb24 bytes, dropping any alpha channel
+
+    Frames with an alpha channel and RGB views of a frame buffer are packed by
+    PIL, which is much faster than copying the strided RGB channels with numpy.
+
+    Args:
+        frame: Rendered frame (numpy array or PIL Image)
+
+    Returns:
+        bytes: Raw frame data in rgb24 pixel format
+    """
+
+    if isinstance(frame, np.ndarray):
+        if frame.shape[2] == 3 and frame.flags.c_contiguous:
+            return frame.tobytes()
+        buffer = _get_rgba_buffer(frame)
+        frame = Image.fromarray(buffer if buffer is not None else frame)
+    return frame.tobytes("raw", "RGB")
+
+
+def _get_rgba_buffer(frame):
+    """
+    Get the RGBA buffer an RGB frame is a view of (mostly for internal use)
+
+    Args:
+        frame (np.ndarray): Rendered frame
+
+    Returns:
+        np.ndarray | None: C-contiguous RGBA array whose first three channels
+            are the frame, None if the frame is not such a view
+    """
+
+    base = frame.base
+    if (
+        frame.ndim == 3
+        and frame.shape[2] == 3
+        and isinstance(base, np.ndarray)
+        and base.dtype == np.uint8
+        and base.shape == frame.shape[:2] + (4,)
+        and base.strides == frame.strides
+        and base.flags.c_contiguous
+        and base.ctypes.data == frame.ctypes.data
+    ):
+        return base
+    return None
@@ -0,0 +1,222 @@
+"""
+Render cache for videos
+
+This module provides a persistent, content-addressed cache of rendered frames.
+Frames are stored under a hash of everything that determines their pixels, so
+re-rendering an episode after editing a few subtitles only renders the edited
+subtitles, and identical subtitles (like "[Host] Yeah.") share their frames.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+
+from audim.sub2pod.buffers import frame_to_image
+
+# Bump whenever the rendering changes in a way that invalidates cached frames
+CACHE_VERSION = 5
+
+
+class RenderCache:
+    """
+    Persistent content-addressed cache of rendered frames
+
+    Every frame is keyed by a hash of the layout configuration, the frame rate,
+    the subtitle text (including the speaker), and the part of the subtitle
+    timing that the frame actually depends on:
+
+    - transition frames: the frame index and the length of the transition,
+      and the subtitle duration with an animated effect
+    - held frames without an animated effect: nothing else, one frame per text
+    - idle frames between subtitles: nothing else, one frame per layout
+    - animated frames: the frame index and the subtitle duration
+
+    The cache is never pruned automatically, use `clear` to empty it.
+    """
+
+    # Layout attributes that hold per-frame state or lazily filled caches,
+    # which do not affect the rendered frames
+    volatile_attributes = ("fonts", "logo", "frame_pool")
+
+    def __init__(self, cache_dir, layout, fps):
+        """
+        Initialize the render cache
+
+        Args:
+            cache_dir (str): Directory to store the cached frames in
+            layout: Layout object that defines the visual arrangement
+            fps (int): Frames per second of the video
+        """
+
+        self.cache_dir = cache_dir
+        self.layout_key = self.get_layout_key(layout, fps)
+
+        # Animated effects make transition frames depend on the subtitle
+        # duration, layouts that do not implement the check are assumed to
+        check = getattr(layout, "is_position_dependent", None)
+        self.position_dependent = check() if callable(check) else True
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def get_layout_key(cls, layout, fps):
+        """
+        Compute the key of a layout configuration and frame rate
+
+        Args:
+            layout: Layout object that defines the visual arrangement
+            fps (int): Frames per second of the video
+
+        Returns:
+            str: Hexadecimal key, which changes whenever the rendered frames do
+        """
+
+        return hashlib.sha256(
+            f"{CACHE_VERSION}|{fps}|{cls.fingerprint(layout)}".encode()
+        ).hexdigest()
+
+    def frame_key(self, cue, kind, index=0, frames=0):
+        """
+        Compute the cache key of a frame
+
+        Args:
+            cue: Subtitle cue with `text`, `start` and `end` (in milliseconds),
+                None for idle frames
+            kind (str): `'transition'`, `'hold'`, `'frame'` or `'idle'`
+            index (int): Index of the frame within the subtitle
+            frames (int): Length of the transition in frames
+
+        Returns:
+            str: Hexadecimal cache key
+        """
+
+        if kind == "transition":
+            parts = (kind, index, frames)
+            if self.position_dependent:
+                parts += (cue.end - cue.start,)
+        elif kind in ("hold", "idle"):
+            parts = (kind,)
+        else:
+            parts = (kind, index, cue.end - cue.start)
+
+        text = cue.text if cue is not None else ""
+        content = "|".join(str(part) for part in (self.layout_key, text, *parts))
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def path(self, key):
+        """
+        Get the path of a cached frame
+
+        Args:
+            key (str): Cache key of the frame
+
+        Returns:
+            str: Path of the frame file (which may not exist yet)
+        """
+
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+
+    def get(self, key):
+        """
+        Look up a cached frame
+
+        Args:
+            key (str): Cache key of the frame
+
+        Returns:
+            str | None: Path of the cached frame file, None if not cached
+        """
+
+        path = self.path(key)
+        return path if os.path.exists(path) else None
+
+    def put(self, key, frame):
+        """
+        Store a rendered frame in the cache
+
+        The frame is written to a temporary file first and then moved in place,
+        so concurrent workers never see partially written frames.
+
+        Args:
+            key (str): Cache key of the frame
+            frame: Rendered frame (numpy array or PIL Image)
+
+        Returns:
+            str: Path of the cached frame file
+        """
+
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        frame = frame_to_image(frame)
+
+        fd, temp_path = tempfile.mkstemp(suffix=".png", dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            frame.save(f, format="PNG")
+        os.replace(temp_path, path)
+
+        return path
+
+    def clear(self):
+        """
+        Remove all cached frames
+        """
+
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def fingerprint(cls, value):
+        """
+        Describe a layout configuration as a deterministic string
+
+        Walks the public attributes of the layout and its elements and effects.
+        Images are reduced to a hash of their pixels, and files referenced by
+        `*_path` attributes contribute their size and modification time.
+
+        Args:
+            value: Layout or any value of its configuration
+
+        Returns:
+            str: Deterministic description of the value
+        """
+
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return repr(value)
+        if isinstance(value, (list, tuple)):
+            return "[" + ",".join(cls.fingerprint(item) for item in value) + "]"
+        if isinstance(value, dict):
+            items = sorted((repr(k), cls.fingerprint(v)) for k, v in value.items())
+            return "{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+        if isinstance(value, Image.Image):
+            digest = hashlib.sha256(value.tobytes()).hexdigest()
+            return f"Image({value.mode},{value.size},{digest})"
+        if hasattr(value, "__dict__"):
+            attributes = sorted(
+                (name, cls._fingerprint_attribute(name, attribute))
+                for name, attribute in vars(value).items()
+                if not name.startswith("_") and name not in cls.volatile_attributes
+            )
+            return (
+                type(value).__qualname__
+                + "("
+                + ",".join(f"{name}={attribute}" for name, attribute in attributes)
+                + ")"
+            )
+        return type(value).__qualname__
+
+    @classmethod
+    def _fingerprint_attribute(cls, name, value):
+        """
+        Describe an attribute, including the state of referenced files
+        (mostly for internal use)
+        """
+
+        description = cls.fingerprint(value)
+        if name.endswith("_path") and isinstance(value, str) and os.path.isfile(value):
+            stat = os.stat(value)
+            description += f"@{stat.st_size}:{stat.st_mtime_ns}"
+        return description
@@ -0,0 +1,281 @@
+"""
+Compositing of sprites into frames
+
+This module blends small RGBA sprites into a region of a frame, in place, without
+allocating full-frame overlays. Frames can be PIL images or numpy arrays, and the
+results match PIL's `Image.alpha_composite` and `Image.paste` pixel for pixel.
+
+Sprites keep a premultiplied copy of their pixels, so blending a sprite into an
+opaque region of a numpy frame is a single multiply-add per channel.
+"""
+
+import numpy as np
+from PIL import Image
+
+# Fixed point precision used by PIL's alpha compositing
+_PRECISION_BITS = 7
+
+
+class Sprite:
+    """
+    RGBA image prepared for repeated compositing
+
+    Keeps the PIL image for compositing into PIL frames, and lazily computes the
+    premultiplied pixels used for compositing into numpy frames.
+    """
+
+    def __init__(self, image):
+        """
+        Initialize the sprite
+
+        Args:
+            image: RGBA image (PIL Image or numpy array)
+        """
+
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+
+        self.image = image
+        self._pixels = None
+
+    @property
+    def size(self):
+        """
+        Width and height of the sprite
+        """
+
+        return self.image.size
+
+    @property
+    def pixels(self):
+        """
+        Pixels of the sprite as an RGBA numpy array
+        """
+
+        if self._pixels is None:
+            pixels = np.asarray(self.image)
+            alpha = pixels[:, :, 3:4].astype(np.uint32)
+            self._premultiplied = pixels[:, :, :3].astype(np.uint32) * alpha
+            self._inverse_alpha = 255 - alpha
+            # Set last, so other threads never see the pixels without the rest
+            self._pixels = pixels
+        return self._pixels
+
+    def premultiplied(self, region):
+        """
+        Premultiplied colors and inverse alpha of a region of the sprite
+
+        Args:
+            region (tuple): (row slice, column slice) of the sprite
+
+        Returns:
+            tuple: (colors multiplied by alpha, 255 minus alpha), both unscaled
+                uint32 arrays
+        """
+
+        self.pixels
+        return self._premultiplied[region], self._inverse_alpha[region]
+
+
+def clip(frame_size, sprite_size, x, y):
+    """
+    Clip a sprite placed at a position to the frame
+
+    Args:
+        frame_size (tuple): Width and height of the frame
+        sprite_size (tuple): Width and height of the sprite
+        x (int): Horizontal position of the sprite in the frame
+        y (int): Vertical position of the sprite in the frame
+
+    Returns:
+        tuple | None: ((row slice, column slice) of the frame, (row slice,
+            column slice) of the sprite), None if the sprite is outside the frame
+    """
+
+    left, top = max(0, x), max(0, y)
+    right = min(frame_size[0], x + sprite_size[0])
+    bottom = min(frame_size[1], y + sprite_size[1])
+    if left >= right or top >= bottom:
+        return None
+
+    frame_region = (slice(top, bottom), slice(left, right))
+    sprite_region = (slice(top - y, bottom - y), slice(left - x, right - x))
+    return frame_region, sprite_region
+
+
+def alpha_composite(frame, sprite, x, y):
+    """
+    Composite a sprite over a region of a frame in place
+
+    Matches `Image.alpha_composite`, clipped to the frame.
+
+    Args:
+        frame: RGBA frame (PIL Image or numpy array), modified in place
+        sprite (Sprite | Image): Sprite to composite
+        x (int): Horizontal position of the sprite in the frame
+        y (int): Vertical position of the sprite in the frame
+
+    Returns:
+        The frame
+    """
+
+    if not isinstance(sprite, Sprite):
+        sprite = Sprite(sprite)
+
+    regions = clip(frame_size(frame), sprite.size, x, y)
+    if regions is None:
+        return frame
+    frame_region, sprite_region = regions
+
+    if isinstance(frame, Image.Image):
+        top, left = frame_region[0].start, frame_region[1].start
+        frame.alpha_composite(
+            sprite.image,
+            dest=(left, top),
+            source=(
+                sprite_region[1].start,
+                sprite_region[0].start,
+                sprite_region[1].stop,
+                sprite_region[0].stop,
+            ),
+        )
+        return frame
+
+    dst = frame[frame_region]
+    src = sprite.pixels[sprite_region]
+    src_alpha = src[:, :, 3].astype(np.uint32)
+    dst_alpha = dst[:, :, 3].astype(np.uint32)
+
+    # Opaque regions only need the premultiplied sprite and its inverse alpha
+    if (dst_alpha == 255).all():
+        premultiplied, inverse_alpha = sprite.premultiplied(sprite_region)
+        color = (premultiplied + dst[:, :, :3] * inverse_alpha) << _PRECISION_BITS
+        dst[:, :, :3] = _shift_div255(color + (0x80 << _PRECISION_BITS)) >> (
+            _PRECISION_BITS
+        )
+        return frame
+
+    # General case, with PIL's fixed point arithmetic
+    visible = src_alpha > 0
+    out_alpha255 = src_alpha * 255 + dst_alpha * (255 - src_alpha)
+    coef1 = np.zeros_like(out_alpha255)
+    np.floor_divide(
+        src_alpha * (255 * 255 << _PRECISION_BITS),
+        out_alpha255,
+        out=coef1,
+        where=visible,
+    )
+    coef2 = (255 << _PRECISION_BITS) - coef1
+
+    color = src[:, :, :3] * coef1[:, :, None] + dst[:, :, :3] * coef2[:, :, None]
+    color = _shift_div255(color + (0x80 << _PRECISION_BITS)) >> _PRECISION_BITS
+    alpha = _shift_div255(out_alpha255 + 0x80)
+
+    dst[:, :, :3] = np.where(visible[:, :, None], color, dst[:, :, :3])
+    dst[:, :, 3] = np.where(visible, alpha, dst_alpha)
+    return frame
+
+
+def paste(frame, sprite, x, y):
+    """
+    Paste a sprite into a region of a frame in place, masked by its alpha
+
+    Matches `Image.paste(sprite, (x, y), sprite)`, clipped to the frame.
+
+    Args:
+        frame: RGBA frame (PIL Image or numpy array), modified in place
+        sprite (Sprite | Image): Sprite to paste
+        x (int): Horizontal position of the sprite in the frame
+        y (int): Vertical position of the sprite in the frame
+
+    Returns:
+        The frame
+    """
+
+    if not isinstance(sprite, Sprite):
+        sprite = Sprite(sprite)
+
+    if isinstance(frame, Image.Image):
+        frame.paste(sprite.image, (x, y), sprite.image)
+        return frame
+
+    regions = clip(frame_size(frame), sprite.size, x, y)
+    if regions is None:
+        return frame
+    frame_region, sprite_region = regions
+
+    dst = frame[frame_region]
+    src = sprite.pixels[sprite_region].astype(np.uint32)
+    mask = src[:, :, 3:4]
+    dst[:] = _div255(dst * (255 - mask) + src * mask)
+    return frame
+
+
+def premultiply(pixels, opacity=255):
+    """
+    Fade RGBA pixels and premultiply all channels by the faded alpha
+
+    Matches compositing the faded pixels onto a transparent canvas with PIL,
+    including its rounding.
+
+    Args:
+        pixels (np.ndarray): RGBA pixels
+        opacity (int): Opacity to fade the pixels to (0-255)
+
+    Returns:
+        np.ndarray: New array with the premultiplied RGBA pixels
+    """
+
+    alpha = np.minimum(pixels[:, :, 3], opacity)
+    low, high = int(alpha.min()), int(alpha.max())
+
+    # Opaque pixels fade to a single alpha value, which allows multiplying by a
+    # scalar instead of broadcasting the alpha channel
+    if low == high:
+        faded = np.multiply(pixels, np.uint16(low), dtype=np.uint16)
+        faded[:, :, 3] = low * low
+    else:
+        faded = pixels.astype(np.uint16)
+        faded[:, :, 3] = alpha
+        faded *= faded[:, :, 3:4]
+
+    # Exact integer division by 255 with rounding, like PIL does
+    faded += 128
+    faded += faded >> 8
+    faded >>= 8
+    return faded.astype(np.uint8)
+
+
+def frame_size(frame):
+    """
+    Width and height of a frame
+
+    Args:
+        frame: Frame (PIL Image or numpy array)
+
+    Returns:
+        tuple: Width and height of the frame
+    """
+
+    if isinstance(frame, Image.Image):
+        return frame.size
+    return frame.shape[1], frame.shape[0]
+
+
+def _shift_div255(value):
+    """
+    Divide by 255 the way PIL does in fixed point (mostly for internal use)
+    """
+
+    return ((value >> 8) + value) >> 8
+
+
+def _div255(value):
+    """
+    Divide by 255 with rounding, the way PIL does (mostly for internal use)
+    """
+
+    value = value + 128
+    return ((value >> 8) + value) >> 8
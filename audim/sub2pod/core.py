@@ -1,15 +1,28 @@
+import collections
 import concurrent.futures
+import copy
+import itertools
 import logging
 import multiprocessing
 import os
+import pickle
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 
 import numpy as np
-import pysrt
 from PIL import Image
-from tqdm import tqdm
+
+from audim.sub2pod.buffers import frame_to_rgb24
+from audim.sub2pod.cache import RenderCache
+from audim.sub2pod.reassembly import BatchReassembler
+from audim.sub2pod.scheduler import RenderScheduler, get_transition_frames
+from audim.sub2pod.store import FrameStore
+from audim.sub2pod.telemetry import RenderReport, StageTimer, get_peak_rss
+from audim.sub2pod.timeline import Cue, Timeline, parse_fps
+from audim.sub2pod.writer import FrameWriter
 
 # Configure logging
 logging.basicConfig(
@@ -19,6 +32,117 @@ logging.basicConfig(
 )
 logger = logging.getLogger("VideoGenerator")
 
+# Layout, render cache, frame store and frame writer of the current worker,
+# installed once in each worker process by `_init_render_worker`, or in each
+# worker thread by `_init_render_thread`
+_worker = threading.local()
+
+
+def _init_render_worker(layout, render_cache=None, frame_store=None, frame_writer=None):
+    """
+    Install the layout in a worker process (mostly for internal use)
+
+    Used as the process pool initializer, so the layout and its decoded assets
+    are pickled once per worker instead of once per submitted batch.
+
+    The process pool only reports a failed initializer as a broken pool, so
+    the error is logged here with its traceback before it is raised.
+
+    Args:
+        layout: Layout object to use for frame creation
+        render_cache (RenderCache, optional): Cache of rendered frames
+        frame_store (FrameStore, optional): Store to write rendered frames to
+        frame_writer (FrameWriter, optional): Writer of rendered frame files
+    """
+
+    try:
+        _prepare_render_layout(layout, frame_writer)
+        _init_render_thread(layout, render_cache, frame_store, frame_writer)
+    except Exception:
+        logger.exception("Could not set up the render worker")
+        raise
+
+
+def _init_render_thread(layout, render_cache=None, frame_store=None, frame_writer=None):
+    """
+    Install the layout in a worker thread (mostly for internal use)
+
+    Used as the thread pool initializer. All worker threads share the layout,
+    which must have been prepared by `_prepare_render_layout` up front, and
+    every thread gets a frame writer of its own.
+
+    Args:
+        layout: Layout object to use for frame creation
+        render_cache (RenderCache, optional): Cache of rendered frames
+        frame_store (FrameStore, optional): Store to write rendered frames to
+        frame_writer (FrameWriter, optional): Writer of rendered frame files
+    """
+
+    _worker.layout = layout
+    _worker.cache = render_cache
+    _worker.store = frame_store
+    # A batch only waits for the frames queued by its own thread
+    _worker.writer = copy.copy(frame_writer) if frame_writer else None
+
+
+def _get_worker_id():
+    """
+    Identify the current worker process or thread (mostly for internal use)
+
+    Returns:
+        tuple: Process id and thread id
+    """
+
+    return os.getpid(), threading.get_ident()
+
+
+def _get_worker_stats(start_time, timer, rendered_frames, cache_hits):
+    """
+    Collect the stats of a batch in the current worker (mostly for internal use)
+
+    Args:
+        start_time (float): `time.perf_counter()` when the batch started
+        timer (StageTimer): Stage times measured while processing the batch
+        rendered_frames (int): Number of distinct frames of the batch
+        cache_hits (int): Number of frames found in the render cache
+
+    Returns:
+        dict: Worker stats with the `worker` id, the `busy` time in seconds,
+            the number of `rendered_frames` and `cache_hits`, the times of the
+            `stages`, and the `peak_rss` of the worker
+    """
+
+    return {
+        "worker": _get_worker_id(),
+        "busy": time.perf_counter() - start_time,
+        "rendered_frames": rendered_frames,
+        "cache_hits": cache_hits,
+        "stages": timer.collect(),
+        "peak_rss": get_peak_rss(),
+    }
+
+
+def _prepare_render_layout(layout, frame_writer=None):
+    """
+    Set up the frame pool of a layout and warm it up (mostly for internal use)
+
+    Args:
+        layout: Layout object to use for frame creation
+        frame_writer (FrameWriter, optional): Writer the rendered frames are
+            queued to
+    """
+
+    # Render into reused buffers, enough to cover the frames that are still
+    # queued for writing while the next one renders
+    set_frame_pool = getattr(layout, "set_frame_pool", None)
+    if callable(set_frame_pool):
+        set_frame_pool(frame_writer.max_queued + 1 if frame_writer else 1)
+
+    # Let the layout decode its assets and warm its caches up front
+    prepare = getattr(layout, "prepare", None)
+    if callable(prepare):
+        prepare()
+
 
 class VideoGenerator:
     """
@@ -49,26 +173,189 @@ class VideoGenerator:
     It uses a layout object to define the visual arrangement of the video.
     """
 
-    def __init__(self, layout, fps=30, batch_size=300):
+    # Resolution scale and frame rate of draft previews
+    preview_scale = 0.5
+    preview_fps = 10
+
+    # Raw pixel formats frames can be piped into FFmpeg with, by converter
+    pixel_formats = {"rgb24": "_frame_to_rgb24", "yuv420p": "_frame_to_yuv420p"}
+
+    # Backends rendering frames in parallel
+    backends = ("processes", "threads", "auto")
+
+    # Number of frames rendered per thread to calibrate the `'auto'` backend
+    calibration_frames = 6
+
+    def __init__(
+        self,
+        layout,
+        fps=None,
+        batch_size=300,
+        export_mode="frames",
+        cache_dir=None,
+        preview=False,
+        scale=None,
+        pixel_format="rgb24",
+        store_dir=None,
+        max_pending_batches=None,
+        frame_format="png",
+        png_compress_level=6,
+        writer_threads=2,
+        backend="processes",
+        report_path=None,
+    ):
         """
         Initialize the video generator
 
         Args:
             layout: Layout object that defines the visual arrangement
-            fps (int): Frames per second for the output video
+            fps (int | float | str | Fraction): Frames per second for the output
+                video, fractional rates like `29.97` or `'30000/1001'` are exact.
+                Defaults to `30`, or `10` for previews.
             batch_size (int): Number of frames to process in a batch
                               before writing to disk
+            export_mode (str): How rendered frames reach the encoder:
+                `'frames'` (default), `'stream'`, `'memmap'` or `'chunked'`
+
+                - `frames`: Frames are written as PNG files to a temporary
+                  directory by `generate_from_srt` and encoded afterwards
+                - `stream`: Frames are rendered during `export_video` and piped
+                  as raw video into FFmpeg, no temporary frame files are written
+                - `memmap`: Frames are written uncompressed into a single
+                  memory-mapped `FrameStore` by `generate_from_srt`, and piped
+                  as raw video into FFmpeg during export. Skips PNG compression
+                  at the cost of disk space (width x height x 3 bytes per
+                  rendered frame).
+                - `chunked`: Frames are rendered during `export_video`, and
+                  every worker encodes its batches into closed-GOP video
+                  segments with its own FFmpeg as soon as they are rendered.
+                  The segments are then joined without re-encoding, and the
+                  audio is added once. Rendering and encoding overlap and scale
+                  across all cores.
+            cache_dir (str, optional): Directory of a persistent render cache.
+                Rendered frames are stored there and reused by later runs, so
+                re-rendering after editing a few subtitles only renders the
+                edited subtitles. Disabled by default.
+            preview (bool): Render a quick draft to review speaker assignment and
+                text wrapping: half the width and height, 10 fps, and the
+                `'ultrafast'` encoding preset, unless set otherwise
+            scale (float, optional): Factor to scale the video size and all
+                layout sizes by, e.g. `0.5`. The layout passed in is not changed,
+                a scaled copy is used instead.
+            pixel_format (str): Raw pixel format frames are piped into FFmpeg
+                with in `'stream'` and `'chunked'` modes: `'rgb24'` (default)
+                or `'yuv420p'`
+
+                - `rgb24`: Frames are piped as RGB, FFmpeg converts them to
+                  `yuv420p` for encoding
+                - `yuv420p`: Frames are converted to planar `yuv420p` by the
+                  render workers, which halves the bytes piped into FFmpeg and
+                  spares it the conversion. Requires an even video width
+                  and height.
+            store_dir (str, optional): Directory of the frame store in `'memmap'`
+                mode. The store is kept after export, so rendered frames can be
+                inspected, and an interrupted `generate_from_srt` resumes with
+                the frames that are missing. Defaults to a temporary directory
+                that is removed after export.
+            max_pending_batches (int, optional): Maximum number of batches that
+                are rendering or waiting for their turn in `'frames'` and
+                `'stream'` modes. Bounds memory use, and holds rendering back
+                when the encoder falls behind. Defaults to twice the number of
+                workers.
+            frame_format (str): Image format of the frame files in `'frames'`
+                mode: `'png'` (default) or `'ppm'`. PPM files are uncompressed,
+                so they take much less time to write but much more disk space.
+            png_compress_level (int): Compression level of PNG frame files,
+                from 0 (fastest) to 9 (smallest), defaults to 6
+            writer_threads (int): Number of threads per worker that write frame
+                files in the background while the next frames are rendered
+            backend (str): How frames are rendered in parallel: `'processes'`
+                (default), `'threads'` or `'auto'`
+
+                - `processes`: Every worker is a process with its own copy of
+                  the layout, which is pickled and prepared once per worker
+                - `threads`: Workers are threads sharing one layout, so nothing
+                  is pickled and no process is started, which suits short jobs.
+                  Rendering scales as far as PIL and NumPy release the GIL.
+                - `auto`: Picks the faster backend with a quick calibration
+                  run when `generate_from_srt` plans the frames
+            report_path (str, optional): File to write the `RenderReport` of
+                every render to once `export_video` finishes. A Prometheus
+                textfile for the node exporter if the path ends with `.prom`,
+                and JSON otherwise. The report is always available as `report`.
         """
 
+        if export_mode not in ("frames", "stream", "memmap", "chunked"):
+            raise ValueError(
+                f"Invalid export mode: {export_mode}. "
+                "Choose 'frames', 'stream', 'memmap' or 'chunked'"
+            )
+        if pixel_format not in self.pixel_formats:
+            raise ValueError(
+                f"Invalid pixel format: {pixel_format}. "
+                f"Choose one of: {', '.join(self.pixel_formats)}"
+            )
+        if backend not in self.backends:
+            raise ValueError(
+                f"Invalid backend: {backend}. Choose one of: {', '.join(self.backends)}"
+            )
+
+        if scale is None:
+            scale = self.preview_scale if preview else 1.0
+        if fps is None:
+            fps = self.preview_fps if preview else 30
+
+        # Scale a copy of the layout so the caller's layout stays untouched
+        if scale != 1.0:
+            layout = copy.deepcopy(layout).set_scale(scale)
+            logger.info(
+                f"Rendering at {scale:g}x scale "
+                f"({layout.video_width}x{layout.video_height})"
+            )
+
+        if pixel_format == "yuv420p" and (
+            layout.video_width % 2 or layout.video_height % 2
+        ):
+            raise ValueError(
+                f"Invalid video size: {layout.video_width}x{layout.video_height}. "
+                "The yuv420p pixel format requires an even width and height"
+            )
+
         self.layout = layout
-        self.fps = fps
+        self.preview = preview
+        self.scale = scale
+        self.fps = parse_fps(fps)
         self.batch_size = batch_size
+        self.export_mode = export_mode
+        self.pixel_format = pixel_format
+        self.store_dir = store_dir
+        self.max_pending_batches = max_pending_batches
+        self.backend = backend
+        self.render_backend = "processes" if backend == "auto" else backend
+        self.report_path = report_path
+        self.report = RenderReport()
+        self.frame_writer = FrameWriter(
+            frame_format,
+            compress_level=png_compress_level,
+            threads=writer_threads,
+            max_queued=2 * writer_threads,
+        )
+        self.frame_store = None
+        self.cache_dir = cache_dir
+        self.render_cache = None
         self.audio_path = None
         self.logo_path = None
         self.title = None
         self.temp_dir = None
         self.frame_files = []
+        self.frame_repeats = []
+        self.frame_numbers = []
+        self.frame_slots = []
         self.total_frames = 0
+        self.num_workers = 1
+        self.timeline = None
+        self.window = (0, 0)
+        self.sub_batches = []
 
     def generate_from_srt(
         self,
@@ -77,10 +364,22 @@ class VideoGenerator:
         logo_path=None,
         title=None,
         cpu_core_utilization="most",
+        start=None,
+        end=None,
     ):
         """
         Generate video frames from an SRT file
 
+        In `'stream'` and `'chunked'` export modes, this only plans the subtitle
+        batches. The frames are rendered during `export_video` and piped into
+        FFmpeg.
+
+        With `start` or `end`, only the subtitles within that time window are
+        rendered, which is much faster for checking a layout on a long episode.
+        Subtitles are clipped at the edges of the window, and the audio is
+        trimmed to match during export. Times are in seconds since the first
+        subtitle, which is the first frame of the video.
+
         Args:
             srt_path (str): Path to the SRT file
             audio_path (str, optional): Path to the audio file
@@ -93,8 +392,16 @@ class VideoGenerator:
                 - `half`: Uses half of available CPU cores
                 - `most`: (default) Uses all available CPU cores except one
                 - `max`: Uses all available CPU cores for maximum performance
+
+            start (float, optional): Start of the window to render in seconds,
+                defaults to the start of the video
+            end (float, optional): End of the window to render in seconds,
+                defaults to the end of the video
         """
 
+        # Start the telemetry of the render
+        self.report = RenderReport(export_mode=self.export_mode)
+
         # Store paths for later use
         self.audio_path = audio_path
         self.logo_path = logo_path
@@ -107,147 +414,762 @@ class VideoGenerator:
             self.layout.title = title
 
         # Load SRT file
-        logger.info(f"Loading subtitles from {srt_path}")
-        subs = pysrt.open(srt_path)
-        
-        # Determine if we need to normalize the timestamps
-        # Find the minimum start time (ordinal) from all subtitles
-        min_start_ordinal = min(sub.start.ordinal for sub in subs) if subs else 0
-        logger.info(f"SRT starts at {min_start_ordinal} milliseconds")
-        
-        # Create temporary directory for frame storage
-        self.temp_dir = tempfile.mkdtemp()
+        import pysrt
+
+        with self.report.measure("srt_parsing"):
+            logger.info(f"Loading subtitles from {srt_path}")
+            subs = [
+                Cue(sub.index, sub.start.ordinal, sub.end.ordinal, sub.text)
+                for sub in pysrt.open(srt_path)
+            ]
+
+            # Determine if we need to normalize the timestamps
+            # Find the minimum start time (ordinal) from all subtitles
+            min_start_ordinal = min(sub.start for sub in subs) if subs else 0
+            logger.info(f"SRT starts at {min_start_ordinal} milliseconds")
+
+            # Map every frame to the cue shown on it, with exact timing
+            self.timeline = Timeline(subs, self.fps, time_offset=min_start_ordinal)
+            if self.timeline.overlapping_frames:
+                logger.warning(
+                    f"Subtitles overlap on {self.timeline.overlapping_frames} "
+                    "frames, the most recently started subtitle is shown"
+                )
+
+        self.temp_dir = None
+        self.frame_store = None
         self.frame_files = []
+        self.frame_repeats = []
+        self.frame_numbers = []
+        self.frame_slots = []
         self.total_frames = 0
 
-        # Determine optimal number of workers
+        with self.report.measure("batch_planning"):
+            # Open the render cache after the layout is fully configured,
+            # since cached frames are keyed by the layout configuration
+            self.render_cache = None
+            if self.cache_dir:
+                self.render_cache = RenderCache(self.cache_dir, self.layout, self.fps)
+                logger.info(f"Using render cache in {self.cache_dir}")
+
+            # Determine optimal number of workers
+            self.num_workers = self._get_num_workers(cpu_core_utilization)
+            logger.info(f"Using {self.num_workers} CPU cores for parallel processing")
+
+            # Partition the timeline into batches of roughly equal render cost
+            self._set_window(self.timeline.window(start, end))
+            logger.info(
+                f"Processing subtitle to generate frames in {len(self.sub_batches)} "
+                "batches"
+            )
+
+            if self.backend == "auto":
+                self.render_backend = self._calibrate_render_backend()
+            logger.info(
+                f"Rendering with {self.num_workers} worker {self.render_backend}"
+            )
+            self.report.info.update(
+                backend=self.render_backend, num_workers=self.num_workers
+            )
+
+        # In stream and chunked modes, frames are rendered straight into
+        # the encoder
+        if self.export_mode in ("stream", "chunked"):
+            logger.info(
+                f"Frame generation planned: Total {self.total_frames} frames "
+                "will be streamed to FFmpeg during export"
+            )
+            return self
+
+        # In memmap mode, frames are rendered into a single frame store
+        if self.export_mode == "memmap":
+            self._render_to_frame_store()
+            return self
+
+        from tqdm import tqdm
+
+        # Create temporary directory for frame storage
+        self.temp_dir = tempfile.mkdtemp()
+        frame_entries = []
+        start_time = time.perf_counter()
+
+        # Process subtitles in parallel batches, collecting their frame files
+        # in timeline order
+        with self._create_render_executor(
+            frame_writer=self.frame_writer
+        ) as executor, tqdm(
+            total=len(self.sub_batches), desc="Processing batch", unit="batch"
+        ) as pbar:
+            batch_indices = itertools.count()
+            frames_processed = 0
+
+            def submit(batch):
+                return executor.submit(
+                    self._process_subtitle_batch,
+                    batch.segments,
+                    next(batch_indices),
+                    self.fps,
+                    self.temp_dir,
+                )
+
+            def collect_frames(batch_idx, result):
+                nonlocal frames_processed
+                batch_frames, batch_frame_count, stats = result
+                frame_entries.extend(batch_frames)
+                self.report.add_worker_stats(stats)
+                frames_processed += batch_frame_count
+                pbar.update(1)
+                pbar.set_postfix({"frames processed": frames_processed})
+
+            reassembler = BatchReassembler(
+                submit, collect_frames, window=self._get_pending_batches()
+            )
+            reassembler.run(self.sub_batches)
+            self.report.add_reassembly_stats(
+                reassembler.window, reassembler.peak_waiting
+            )
+
+        self._log_render_stats(time.perf_counter() - start_time)
+
+        self.frame_numbers = [frame_idx for frame_idx, _, _ in frame_entries]
+        self.frame_files = [frame_file for _, frame_file, _ in frame_entries]
+        self.frame_repeats = [repeats for _, _, repeats in frame_entries]
+
+        logger.info(
+            f"Frame generation completed: Total {self.total_frames} frames created "
+            f"from {len(self.frame_files)} rendered frames"
+        )
+        return self
+
+    def _render_to_frame_store(self):
+        """
+        Render all subtitle batches into the frame store (mostly for internal use)
+
+        The store is sized from the planned frames up front, and every batch
+        owns a contiguous range of slots, so workers write their frames without
+        any coordination. Batches that are already complete in a resumed store
+        are not submitted at all.
+        """
+
+        from tqdm import tqdm
+
+        store_dir = self.store_dir
+        if store_dir is None:
+            self.temp_dir = tempfile.mkdtemp()
+            store_dir = self.temp_dir
+
+        # Slots are keyed like cached frames, so a resumed store renders the
+        # frames of edited subtitles again. Nothing is cached in the store.
+        slot_cache = RenderCache(store_dir, self.layout, self.fps)
+
+        # Assign every planned frame its slot, in timeline order
+        batch_slots = []
+        slot_keys = []
+        for batch in self.sub_batches:
+            first_slot = len(self.frame_numbers)
+            for frame_idx, repeats, render_args in self._plan_subtitle_frames(
+                batch.segments, self.layout, self.fps
+            ):
+                self.frame_numbers.append(frame_idx)
+                self.frame_repeats.append(repeats)
+                slot_keys.append(
+                    slot_cache.frame_key(
+                        render_args["sub"],
+                        render_args["kind"],
+                        render_args.get("index", 0),
+                        render_args.get("frames", 0),
+                    )
+                )
+            batch_slots.append(range(first_slot, len(self.frame_numbers)))
+        self.frame_slots = list(range(len(self.frame_numbers)))
+
+        self.frame_store = FrameStore(
+            store_dir,
+            (self.layout.video_width, self.layout.video_height),
+            self.frame_numbers,
+            self.frame_repeats,
+            key=slot_cache.layout_key,
+            slot_keys=slot_keys,
+        )
+
+        pending = [
+            (batch, slots)
+            for batch, slots in zip(self.sub_batches, batch_slots)
+            if not all(self.frame_store.is_done(slot) for slot in slots)
+        ]
+        start_time = time.perf_counter()
+
+        with self._create_render_executor(
+            frame_store=self.frame_store
+        ) as executor, tqdm(
+            total=len(self.frame_store),
+            initial=len(self.frame_store) - self.frame_store.missing(),
+            desc="Rendering frames",
+            unit="frame",
+        ) as pbar:
+            batch_results = [
+                executor.submit(
+                    self._store_subtitle_batch, batch.segments, slots.start, self.fps
+                )
+                for batch, slots in pending
+            ]
+            for future in concurrent.futures.as_completed(batch_results):
+                frame_count, stats = future.result()
+                self.report.add_worker_stats(stats)
+                pbar.update(frame_count)
+
+        self._log_render_stats(time.perf_counter() - start_time)
+
+        logger.info(
+            f"Frame generation completed: Total {self.total_frames} frames created "
+            f"from {len(self.frame_store)} stored frames"
+        )
+
+    def _get_num_workers(self, cpu_core_utilization):
+        """
+        Determine the number of worker processes (mostly for internal use)
+
+        Args:
+            cpu_core_utilization (str): `'single'`, `'half'`, `'most'`, `'max'`
+
+        Returns:
+            int: Number of worker processes
+        """
+
         if cpu_core_utilization == "single":
-            num_workers = 1
+            return 1
         elif cpu_core_utilization == "half":
-            num_workers = max(1, multiprocessing.cpu_count() // 2)
+            return max(1, multiprocessing.cpu_count() // 2)
         elif cpu_core_utilization == "most":
-            num_workers = max(1, multiprocessing.cpu_count() - 1)
+            return max(1, multiprocessing.cpu_count() - 1)
         elif cpu_core_utilization == "max":
-            num_workers = max(1, multiprocessing.cpu_count())
+            return max(1, multiprocessing.cpu_count())
         else:
             raise ValueError(f"Invalid CPU core utilities: {cpu_core_utilization}")
 
-        logger.info(f"Using {num_workers} CPU cores for parallel processing")
-
-        # Process subtitles in parallel batches
-        with concurrent.futures.ProcessPoolExecutor(
-            max_workers=num_workers
-        ) as executor:
-            # Prepare subtitle batches for parallel processing
-            sub_batches = []
-            current_batch = []
-            current_batch_frames = 0
-
-            for sub in subs:
-                # Calculate the frame numbers normalized to start from frame 0
-                # This ensures compatibility with SRTs that start at any timestamp
-                start_frame = (sub.start.ordinal - min_start_ordinal) // (1000 // self.fps)
-                end_frame = (sub.end.ordinal - min_start_ordinal) // (1000 // self.fps)
-                
-                num_frames = (end_frame - start_frame) + min(
-                    15, end_frame - start_frame
-                )  # Including fade frames
+    def _get_pending_batches(self):
+        """
+        Get the maximum number of batches rendering or waiting for their turn
+        (mostly for internal use)
+
+        Returns:
+            int: Number of batches, at least one per worker by default
+        """
+
+        if self.max_pending_batches:
+            return self.max_pending_batches
+        return 2 * self.num_workers
+
+    def _create_render_executor(self, frame_store=None, frame_writer=None):
+        """
+        Create the pool of render workers of the render backend
+        (mostly for internal use)
+
+        The layout is copied and prepared once up front, so configuration errors
+        are raised right here, and the caller's layout keeps allocating its own
+        frames. Worker threads share the prepared copy, and worker processes
+        get a pickled copy of it.
+
+        Args:
+            frame_store (FrameStore, optional): Store to write rendered frames to
+            frame_writer (FrameWriter, optional): Writer of rendered frame files
+
+        Returns:
+            concurrent.futures.Executor: Pool of render workers
+        """
 
-                if (
-                    current_batch_frames + num_frames > self.batch_size
-                    and current_batch
-                ):
-                    sub_batches.append((current_batch, min_start_ordinal))
-                    current_batch = []
-                    current_batch_frames = 0
+        layout = copy.copy(self.layout)
+        _prepare_render_layout(layout, frame_writer)
+
+        if self.render_backend == "threads":
+            return concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.num_workers,
+                thread_name_prefix="Render",
+                initializer=_init_render_thread,
+                initargs=(layout, self.render_cache, frame_store, frame_writer),
+            )
 
-                current_batch.append(sub)
-                current_batch_frames += num_frames
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            initializer=_init_render_worker,
+            initargs=(layout, self.render_cache, frame_store, frame_writer),
+        )
+
+    def _calibrate_render_backend(self):
+        """
+        Pick the faster render backend with a quick calibration run
+        (mostly for internal use)
 
-            # Add the last batch if not empty
-            if current_batch:
-                sub_batches.append((current_batch, min_start_ordinal))
+        Renders the first planned frames on one thread, and then on every
+        worker thread at once. The speedup of the threads tells how much of the
+        rendering runs with the GIL released. Threads are picked if they are
+        estimated to render all planned frames at least as fast as processes,
+        which scale with the number of workers but first pickle and prepare
+        the layout.
 
+        Returns:
+            str: `'threads'` or `'processes'`
+        """
+
+        # Processes have nothing to gain without parallel workers
+        if self.num_workers == 1:
+            return "threads"
+
+        planned_frames = [
+            render_args
+            for batch in self.sub_batches
+            for _, _, render_args in self._plan_subtitle_frames(
+                batch.segments, self.layout, self.fps
+            )
+        ]
+        sample = planned_frames[: self.calibration_frames]
+        if not sample:
+            return "threads"
+
+        # Setup of a worker process, apart from starting it
+        start_time = time.perf_counter()
+        layout = pickle.loads(pickle.dumps(self.layout))
+        _prepare_render_layout(layout)
+        setup_time = time.perf_counter() - start_time
+
+        def render_sample():
+            for render_args in sample:
+                self._render_frame(layout, None, **render_args)
+
+        start_time = time.perf_counter()
+        render_sample()
+        sequential_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(self.num_workers) as executor:
+            for future in [
+                executor.submit(render_sample) for _ in range(self.num_workers)
+            ]:
+                future.result()
+        threaded_time = time.perf_counter() - start_time
+
+        speedup = self.num_workers * sequential_time / max(threaded_time, 1e-9)
+        render_time = sequential_time / len(sample) * len(planned_frames)
+        threads_time = render_time / speedup
+        processes_time = setup_time + render_time / self.num_workers
+
+        backend = "threads" if threads_time <= processes_time else "processes"
+        logger.info(
+            f"Backend calibration: {speedup:.1f}x speedup on {self.num_workers} "
+            f"threads, estimated {threads_time:.1f}s with threads and "
+            f"{processes_time:.1f}s with processes, using {backend}"
+        )
+        return backend
+
+    def _set_window(self, window):
+        """
+        Select the window of the timeline to render (mostly for internal use)
+
+        Args:
+            window (tuple): (first frame, frame after the last frame)
+        """
+
+        self.window = window
+        self.total_frames = self.window[1] - self.window[0]
+        self.sub_batches = self._plan_subtitle_batches(
+            self.timeline.spans(*self.window)
+        )
+
+        if self.window != (0, self.timeline.total_frames):
             logger.info(
-                f"Processing subtitle to generate frames in {len(sub_batches)} batches"
-            )
-
-            # Process each batch in parallel
-            batch_results = []
-            for batch_idx, (batch, offset) in enumerate(sub_batches):
-                batch_results.append(
-                    executor.submit(
-                        self._process_subtitle_batch,
-                        batch,
-                        batch_idx,
-                        self.layout,
-                        self.fps,
-                        self.temp_dir,
-                        offset,
-                    )
-                )
+                f"Rendering the window from {float(self._window_offset()):.2f}s "
+                f"to {float(self.window[1] / self.fps):.2f}s "
+                f"({self.total_frames} of {self.timeline.total_frames} frames)"
+            )
 
-            # Collect results with progress bar
-            with tqdm(
-                total=len(batch_results), desc="Processing batch", unit="batch"
-            ) as pbar:
-                for future in concurrent.futures.as_completed(batch_results):
-                    batch_frame_files, batch_frame_count = future.result()
-                    self.frame_files.extend(batch_frame_files)
-                    self.total_frames += batch_frame_count
-                    pbar.update(1)
-                    pbar.set_postfix({"frames processed": self.total_frames})
-
-        # Sort frame files by frame number to ensure correct sequence
-        self.frame_files.sort(
-            key=lambda x: int(os.path.basename(x).split("_")[1].split(".")[0])
+    def _window_offset(self):
+        """
+        Get the start of the rendered window in seconds (mostly for internal use)
+
+        Returns:
+            Fraction: Time of the first frame of the window since the start of
+                the video
+        """
+
+        return self.window[0] / self.fps
+
+    def _trim_frames_to_window(self, window):
+        """
+        Keep only the generated frame files (or frame store slots) within a window
+        (mostly for internal use)
+
+        Args:
+            window (tuple): (first frame, frame after the last frame), within
+                the window of the generated frames
+        """
+
+        first, last = window
+        kept, frame_repeats, frame_numbers = [], [], []
+        for i, (frame_idx, repeats) in enumerate(
+            zip(self.frame_numbers, self.frame_repeats)
+        ):
+            # Clip held frames that span an edge of the window
+            start, end = max(first, frame_idx), min(last, frame_idx + repeats)
+            if start < end:
+                kept.append(i)
+                frame_numbers.append(start)
+                frame_repeats.append(end - start)
+
+        self.frame_numbers = frame_numbers
+        self.frame_repeats = frame_repeats
+        if self.frame_files:
+            self.frame_files = [self.frame_files[i] for i in kept]
+        if self.frame_slots:
+            self.frame_slots = [self.frame_slots[i] for i in kept]
+
+    def _plan_subtitle_batches(self, spans):
+        """
+        Partition the subtitles into batches of roughly equal render cost
+        (mostly for internal use)
+
+        Args:
+            spans (list): List of Segment of the timeline to render
+
+        Returns:
+            list: List of RenderBatch in timeline order
+        """
+
+        scheduler = RenderScheduler(
+            self.layout, num_workers=self.num_workers, batch_size=self.batch_size
         )
+        sub_batches = scheduler.plan(spans)
 
+        balance = scheduler.estimate_load_balance(sub_batches)
         logger.info(
-            f"Frame generation completed: Total {self.total_frames} frames created"
+            "Estimated load per worker: "
+            + ", ".join(f"{load:.0f}" for load in balance["loads"])
+            + f" frame renders (imbalance {balance['imbalance']:.1%})"
         )
-        return self
 
-    def _process_subtitle_batch(self, subs_batch, batch_index, layout, fps, temp_dir, time_offset=0):
+        return sub_batches
+
+    def _log_render_stats(self, render_time):
+        """
+        Add a finished render to the report, and log its worker utilization
+        and render cache hits (mostly for internal use)
+
+        Args:
+            render_time (float): Wall time of the rendering in seconds
+        """
+
+        self.report.add_render_time(render_time)
+        self._log_worker_utilization(self.report.worker_busy, self.report.render_time)
+        self._log_cache_hits(self.report.cache_hits, self.report.rendered_frames)
+
+    def _log_worker_utilization(self, worker_busy, wall_time):
+        """
+        Log how busy each worker was while rendering (mostly for internal use)
+
+        Args:
+            worker_busy (dict): Busy time in seconds per worker id
+            wall_time (float): Wall time of the rendering in seconds
+        """
+
+        if not worker_busy or wall_time <= 0:
+            return
+
+        busy = list(worker_busy.values())
+        logger.info(
+            "Worker utilization: "
+            + ", ".join(f"{b / wall_time:.0%}" for b in busy)
+            + f" (imbalance {RenderScheduler.imbalance(busy):.1%})"
+        )
+
+    def _log_cache_hits(self, cache_hits, rendered_frames):
         """
-        Process a batch of subtitles in parallel
+        Log how many frames were reused from the render cache
+        (mostly for internal use)
 
         Args:
-            subs_batch (list): List of subtitles to process
+            cache_hits (int): Number of frames found in the render cache
+            rendered_frames (int): Number of distinct frames of the video
+        """
+
+        if self.render_cache is None or rendered_frames <= 0:
+            return
+
+        logger.info(
+            f"Render cache: reused {cache_hits} of {rendered_frames} frames "
+            f"({cache_hits / rendered_frames:.0%})"
+        )
+
+    @staticmethod
+    def _process_subtitle_batch(segments, batch_index, fps, temp_dir):
+        """
+        Process a batch of subtitles in a worker process
+
+        The layout and the frame writer are the ones installed in the worker by
+        the pool initializer.
+
+        Args:
+            segments (list): List of contiguous Segment of cues to process
             batch_index (int): Index of the current batch
-            layout: Layout object to use for frame creation
-            fps (int): Frames per second
+            fps (Fraction): Frames per second
             temp_dir (str): Directory to store temporary files
-            time_offset (int): Time offset in milliseconds to normalize timestamps
 
         Returns:
-            tuple: (list of frame files, number of frames processed)
+            tuple: (list of (frame number, frame file, repeat count) tuples,
+                number of frames processed, dict of worker stats from
+                `_get_worker_stats`)
         """
 
+        start_time = time.perf_counter()
+        timer = StageTimer()
+
         # Create a batch directory
         batch_dir = os.path.join(temp_dir, f"batch_{batch_index}")
         os.makedirs(batch_dir, exist_ok=True)
 
-        frame_files = []
+        frame_entries = []
         frame_count = 0
+        cache_hits = 0
 
-        # Process each subtitle in the batch
-        for sub in subs_batch:
-            # Normalize timestamps to start from time zero
-            start_frame = (sub.start.ordinal - time_offset) // (1000 // fps)
-            end_frame = (sub.end.ordinal - time_offset) // (1000 // fps)
+        try:
+            for (
+                frame_idx,
+                frame,
+                repeats,
+                frame_path,
+            ) in VideoGenerator._render_subtitle_frames(
+                segments, _worker.layout, fps, _worker.cache, timer
+            ):
+                # Cached frames are used straight from the cache directory
+                if frame is None:
+                    cache_hits += 1
+                elif frame_path is None:
+                    frame_path = os.path.join(
+                        batch_dir, f"frame_{frame_idx:08d}{_worker.writer.extension}"
+                    )
+                    # Written in the background while the next frame renders
+                    _worker.writer.write(frame, frame_path)
 
-            # Calculate subtitle duration (in seconds)
-            subtitle_duration = (sub.end.ordinal - sub.start.ordinal) / 1000.0
+                frame_entries.append((frame_idx, frame_path, repeats))
+                frame_count += repeats
+        finally:
+            # All frame files must be complete before the batch is reported
+            # done, and the writer threads stop with the batch, raising the
+            # first error of any failed write
+            _worker.writer.close()
+
+        timer.merge(_worker.writer.timer.collect())
+
+        stats = _get_worker_stats(start_time, timer, len(frame_entries), cache_hits)
+        return frame_entries, frame_count, stats
+
+    @staticmethod
+    def _store_subtitle_batch(segments, first_slot, fps):
+        """
+        Render a batch of subtitles into the frame store
+
+        The layout and the frame store are the ones installed in the worker by
+        the pool initializer. Slots that are already done are skipped.
+
+        Args:
+            segments (list): List of contiguous Segment of cues to process
+            first_slot (int): Slot of the first planned frame of the batch
+            fps (Fraction): Frames per second
+
+        Returns:
+            tuple: (number of frames written, dict of worker stats from
+                `_get_worker_stats`)
+        """
 
-            # Get transition frames count from layout's transition effect
-            transition_frames = 15  # Default
-            if hasattr(layout, "transition_effect") and layout.transition_effect:
-                transition_frames = layout.transition_effect.frames
+        start_time = time.perf_counter()
+        timer = StageTimer()
+        frame_count = 0
+        cache_hits = 0
+
+        for slot, (_, _, render_args) in enumerate(
+            VideoGenerator._plan_subtitle_frames(segments, _worker.layout, fps),
+            first_slot,
+        ):
+            if _worker.store.is_done(slot):
+                continue
+
+            frame, frame_path = VideoGenerator._render_frame(
+                _worker.layout, _worker.cache, timer=timer, **render_args
+            )
+            if frame is None:
+                cache_hits += 1
+                frame = VideoGenerator._read_cached_frame(frame_path, timer)
+            with timer.measure("serialization"):
+                _worker.store.write(slot, frame)
+            frame_count += 1
+
+        stats = _get_worker_stats(start_time, timer, frame_count, cache_hits)
+        return frame_count, stats
+
+    @staticmethod
+    def _render_subtitle_batch(segments, fps, pixel_format="rgb24"):
+        """
+        Render a batch of subtitles to raw frames for streaming
+
+        The layout is the one installed in the worker by the pool initializer.
+
+        Args:
+            segments (list): List of contiguous Segment of cues to process
+            fps (Fraction): Frames per second
+            pixel_format (str): Raw pixel format, `'rgb24'` or `'yuv420p'`
+
+        Returns:
+            tuple: (list of (raw frame bytes, repeat count) tuples in order,
+                dict of worker stats from `_get_worker_stats`)
+        """
+
+        start_time = time.perf_counter()
+        timer = StageTimer()
+        frames = []
+        cache_hits = 0
+        convert = getattr(VideoGenerator, VideoGenerator.pixel_formats[pixel_format])
+
+        for _, frame, repeats, frame_path in VideoGenerator._render_subtitle_frames(
+            segments, _worker.layout, fps, _worker.cache, timer
+        ):
+            if frame is None:
+                cache_hits += 1
+                frame = VideoGenerator._read_cached_frame(frame_path, timer)
+            with timer.measure("serialization"):
+                frames.append((convert(frame), repeats))
+
+        stats = _get_worker_stats(start_time, timer, len(frames), cache_hits)
+        return frames, stats
+
+    @staticmethod
+    def _render_subtitle_frames(segments, layout, fps, render_cache=None, timer=None):
+        """
+        Render the frames of a batch of subtitles (mostly for internal use)
+
+        With a render cache, frames found in the cache are not rendered again.
+        They are yielded as None together with the path of the cached frame file,
+        and newly rendered frames are stored in the cache.
+
+        Args:
+            segments (list): List of contiguous Segment of cues to process
+            layout: Layout object to use for frame creation
+            fps (Fraction): Frames per second
+            render_cache (RenderCache, optional): Cache of rendered frames
+            timer (StageTimer, optional): Timer of the rendering and of the
+                render cache I/O
+
+        Yields:
+            tuple: (frame number, rendered frame or None if cached, number of
+                frames it is shown for, path of the cached frame file or None)
+        """
+
+        for frame_idx, repeats, render_args in VideoGenerator._plan_subtitle_frames(
+            segments, layout, fps
+        ):
+            frame, frame_path = VideoGenerator._render_frame(
+                layout, render_cache, timer=timer, **render_args
+            )
+            yield frame_idx, frame, repeats, frame_path
+
+    @staticmethod
+    def _render_frame(
+        layout, render_cache, sub, kind, index=0, frames=0, timer=None, **kwargs
+    ):
+        """
+        Render a single planned frame, through the render cache if there is one
+        (mostly for internal use)
+
+        Args:
+            layout: Layout object to use for frame creation
+            render_cache (RenderCache): Cache of rendered frames, or None
+            sub: Subtitle cue shown on the frame, None for idle frames
+            kind (str): `'transition'`, `'hold'`, `'frame'` or `'idle'`
+            index (int): Index of the frame within the subtitle
+            frames (int): Length of the transition in frames
+            timer (StageTimer, optional): Timer of the rendering and of the
+                render cache I/O
+            **kwargs: Keyword arguments for `create_frame`
+
+        Returns:
+            tuple: (rendered frame or None if cached, path of the cached frame
+                file or None)
+        """
+
+        if timer is None:
+            timer = StageTimer()
+
+        if render_cache is None:
+            with timer.measure("rendering"):
+                return layout.create_frame(current_sub=sub, **kwargs), None
+
+        key = render_cache.frame_key(sub, kind, index, frames)
+        with timer.measure("disk_io"):
+            cached_path = render_cache.get(key)
+        if cached_path:
+            return None, cached_path
+
+        with timer.measure("rendering"):
+            frame = layout.create_frame(current_sub=sub, **kwargs)
+        with timer.measure("disk_io"):
+            return frame, render_cache.put(key, frame)
+
+    @staticmethod
+    def _read_cached_frame(frame_path, timer):
+        """
+        Read a frame from the render cache (mostly for internal use)
+
+        Args:
+            frame_path (str): Path of the cached frame file
+            timer (StageTimer): Timer of the disk I/O
+
+        Returns:
+            Image: Cached frame in RGB
+        """
+
+        with timer.measure("disk_io"), Image.open(frame_path) as cached_frame:
+            return cached_frame.convert("RGB")
+
+    @staticmethod
+    def _plan_subtitle_frames(segments, layout, fps):
+        """
+        Plan the distinct frames of a batch of subtitles, without rendering them
+        (mostly for internal use)
+
+        Args:
+            segments (list): List of contiguous Segment of cues to process
+            layout: Layout object to use for frame creation
+            fps (Fraction): Frames per second
+
+        Yields:
+            tuple: (frame number, number of frames it is shown for, dict of
+                keyword arguments for `_render_frame`)
+        """
+
+        # Get transition frames count from layout's transition effect
+        transition_frames = get_transition_frames(layout)
+        position_dependent = VideoGenerator._is_position_dependent(layout)
+        fps = float(fps)
+
+        # Process each subtitle segment in the batch
+        for segment in segments:
+            sub = segment.cue
+
+            # Idle frames between subtitles are all the same
+            if sub is None:
+                yield (
+                    segment.start,
+                    segment.end - segment.start,
+                    {"sub": None, "kind": "idle"},
+                )
+                continue
+            start_frame, end_frame = segment.cue_start, segment.cue_end
+
+            # Calculate subtitle duration (in seconds)
+            subtitle_duration = (sub.end - sub.start) / 1000.0
 
             # Add transition frames
             fade_frames = min(transition_frames, end_frame - start_frame)
-            for i in range(fade_frames):
+            hold_start = start_frame + fade_frames
+            for frame_idx in range(segment.start, min(segment.end, hold_start)):
+                i = frame_idx - start_frame
                 # Calculate progress for transition effect
                 progress = i / fade_frames
                 # Convert progress to opacity for backward compatibility
@@ -257,48 +1179,153 @@ class VideoGenerator:
                 subtitle_position = i / fps
 
                 # Create frame with transition effect passing position info as kwargs
-                frame = layout.create_frame(
-                    current_sub=sub,
-                    opacity=opacity,
-                    subtitle_position=subtitle_position,
-                    subtitle_duration=subtitle_duration,
+                yield (
+                    frame_idx,
+                    1,
+                    {
+                        "sub": sub,
+                        "kind": "transition",
+                        "index": i,
+                        "frames": fade_frames,
+                        "opacity": opacity,
+                        "subtitle_position": subtitle_position,
+                        "subtitle_duration": subtitle_duration,
+                    },
                 )
 
-                frame_path = os.path.join(batch_dir, f"frame_{start_frame + i:08d}.png")
-
-                # Convert numpy array to PIL Image and save
-                if isinstance(frame, np.ndarray):
-                    Image.fromarray(frame).save(frame_path)
-                else:
-                    frame.save(frame_path)
-
-                frame_files.append(frame_path)
-                frame_count += 1
-
             # Add main frames
-            for frame_idx in range(start_frame + fade_frames, end_frame):
+            hold_begin = max(segment.start, hold_start)
+            hold_frames = segment.end - hold_begin
+
+            # Without an animated effect, every frame after the transition is
+            # identical, so render the hold once and let the encoder repeat it
+            if hold_frames > 0 and not position_dependent:
+                yield (
+                    hold_begin,
+                    hold_frames,
+                    {
+                        "sub": sub,
+                        "kind": "hold",
+                        "subtitle_position": (hold_begin - start_frame) / fps,
+                        "subtitle_duration": subtitle_duration,
+                    },
+                )
+                continue
+
+            for frame_idx in range(hold_begin, segment.end):
                 # Calculate subtitle position for current frame
                 subtitle_position = (frame_idx - start_frame) / fps
 
                 # Create frame passing position info as kwargs
-                frame = layout.create_frame(
-                    current_sub=sub,
-                    subtitle_position=subtitle_position,
-                    subtitle_duration=subtitle_duration,
+                yield (
+                    frame_idx,
+                    1,
+                    {
+                        "sub": sub,
+                        "kind": "frame",
+                        "index": frame_idx - start_frame,
+                        "subtitle_position": subtitle_position,
+                        "subtitle_duration": subtitle_duration,
+                    },
                 )
 
-                frame_path = os.path.join(batch_dir, f"frame_{frame_idx:08d}.png")
+    @staticmethod
+    def _is_position_dependent(layout):
+        """
+        Check whether the layout renders different frames within a subtitle hold
+        (mostly for internal use)
+
+        Layouts that do not implement the check are assumed to be position
+        dependent, so every frame is rendered.
+
+        Args:
+            layout: Layout object to use for frame creation
+
+        Returns:
+            bool: True if every frame of a hold must be rendered
+        """
 
-                # Convert numpy array to PIL Image and save
-                if isinstance(frame, np.ndarray):
-                    Image.fromarray(frame).save(frame_path)
-                else:
-                    frame.save(frame_path)
+        check = getattr(layout, "is_position_dependent", None)
+        return check() if callable(check) else True
 
-                frame_files.append(frame_path)
-                frame_count += 1
+    @staticmethod
+    def _frame_to_rgb24(frame):
+        """
+        Convert a rendered frame to raw rgb24 bytes (mostly for internal use)
 
-        return frame_files, frame_count
+        The alpha channel is dropped, just like FFmpeg does when it converts
+        RGBA frame files to `yuv420p`.
+
+        Args:
+            frame: Rendered frame (numpy array or PIL Image)
+
+        Returns:
+            bytes: Raw frame data in rgb24 pixel format
+        """
+
+        return frame_to_rgb24(frame)
+
+    @staticmethod
+    def _frame_to_yuv420p(frame):
+        """
+        Convert a rendered frame to raw planar yuv420p bytes
+        (mostly for internal use)
+
+        Uses the limited range BT.601 matrix, like FFmpeg's default RGB to
+        `yuv420p` conversion, with the chroma of each 2x2 block of pixels
+        computed from their average color. The alpha channel is dropped.
+
+        Args:
+            frame: Rendered frame (numpy array or PIL Image), with an even
+                width and height
+
+        Returns:
+            bytes: Raw frame data in yuv420p pixel format, the full resolution
+                Y plane followed by the half resolution U and V planes
+        """
+
+        if not isinstance(frame, np.ndarray):
+            frame = np.asarray(frame.convert("RGB"))
+        height, width = frame.shape[:2]
+        if height % 2 or width % 2:
+            raise ValueError(
+                f"Invalid frame size: {width}x{height}. "
+                "yuv420p requires an even width and height"
+            )
+
+        # Everything is computed in 16 bits, the chroma coefficients sum to 0
+        # so inverting the negatively weighted channels keeps all terms positive
+        red, green, blue = frame[:, :, 0], frame[:, :, 1], frame[:, :, 2]
+        luma = np.multiply(red, 66, dtype=np.uint16)
+        luma += np.multiply(green, 129, dtype=np.uint16)
+        luma += np.multiply(blue, 25, dtype=np.uint16)
+        luma += 128
+        luma >>= 8
+        luma += 16
+
+        # Average each 2x2 block of pixels, with rounding
+        blocks = np.add(frame[0::2, 0::2, :3], frame[0::2, 1::2, :3], dtype=np.uint16)
+        blocks += frame[1::2, 0::2, :3]
+        blocks += frame[1::2, 1::2, :3]
+        blocks += 2
+        blocks >>= 2
+        red, green, blue = blocks[:, :, 0], blocks[:, :, 1], blocks[:, :, 2]
+        inverted = 255 - blocks
+
+        # ((112 * b - 38 * r - 74 * g + 128) >> 8) + 128
+        u = blue * 112
+        u += inverted[:, :, 0] * 38
+        u += inverted[:, :, 1] * 74
+        # ((112 * r - 94 * g - 18 * b + 128) >> 8) + 128
+        v = red * 112
+        v += inverted[:, :, 1] * 94
+        v += inverted[:, :, 2] * 18
+        for chroma in (u, v):
+            chroma += 240
+            chroma >>= 8
+            chroma += 16
+
+        return b"".join(plane.astype(np.uint8).tobytes() for plane in (luma, u, v))
 
     def export_video(
         self,
@@ -308,15 +1335,22 @@ class VideoGenerator:
         audio_codec=None,
         video_bitrate="8M",
         audio_bitrate="192k",
-        preset="medium",
+        preset=None,
         crf=23,
         threads=None,
         gpu_acceleration=True,
         extra_ffmpeg_args=None,
+        start=None,
+        end=None,
     ):
         """
         Export the generated frames as a video
 
+        With `start` or `end`, only that time window of the video is exported,
+        and the audio is trimmed to match. In `'frames'` and `'memmap'` export
+        modes the window must lie within the frames generated by
+        `generate_from_srt`.
+
         Args:
             output_path (str): Path for the output video file
             encoder (str): Encoding method to use:
@@ -336,7 +1370,8 @@ class VideoGenerator:
 
             video_bitrate (str, optional): Video bitrate (default: `'8M'`)
             audio_bitrate (str, optional): Audio bitrate (default: `'192k'`)
-            preset (str, optional): Encoding preset (default: `'medium'`)
+            preset (str, optional): Encoding preset
+                (default: `'medium'`, or `'ultrafast'` for previews)
                 
                 For CPU encoding (libx264):
                     Options: `'ultrafast'`, `'superfast'`, `'veryfast'`, `'faster'`,
@@ -366,18 +1401,46 @@ class VideoGenerator:
             threads (int, optional): Number of encoding threads (default: CPU count - 1)
             gpu_acceleration (bool, optional): Whether to use GPU acceleration
                 if available (default: `True`)
-            extra_ffmpeg_args (list, optional): Additional FFmpeg arguments as a list
+            extra_ffmpeg_args (list, optional): Additional FFmpeg arguments as a list.
+                Video filters passed with `-vf` are applied after the filter
+                that sets the frame rate.
 
                 - See [FFmpeg Documentation](https://ffmpeg.org/ffmpeg.html) for all
                   available options
+
+            start (float, optional): Start of the window to export in seconds
+                since the first subtitle, defaults to the start of the window
+                passed to `generate_from_srt`
+            end (float, optional): End of the window to export in seconds
+                since the first subtitle, defaults to the end of the window
+                passed to `generate_from_srt`
         """
 
+        # Drafts are encoded as fast as possible
+        if preset is None:
+            preset = "ultrafast" if self.preview else "medium"
+
+        # Narrow down the window of the video to export
+        if start is not None or end is not None:
+            window = self.timeline.window(
+                float(self._window_offset()) if start is None else start,
+                float(self.window[1] / self.fps) if end is None else end,
+            )
+            if self.export_mode in ("frames", "memmap"):
+                if window[0] < self.window[0] or window[1] > self.window[1]:
+                    raise ValueError(
+                        f"Invalid window: {start} to {end} seconds is outside of "
+                        "the frames generated by generate_from_srt"
+                    )
+                self._trim_frames_to_window(window)
+            self._set_window(window)
+
         logger.info(
             f"Starting video generation process with {self.total_frames} frames"
         )
 
         # Calculate video duration
-        video_duration = self.total_frames / self.fps
+        video_duration = float(self.total_frames / self.fps)
 
         # Determine audio duration if provided
         audio_duration = None
@@ -387,7 +1450,7 @@ class VideoGenerator:
                 from moviepy.editor import AudioFileClip
 
                 audio = AudioFileClip(self.audio_path)
-                audio_duration = audio.duration
+                audio_duration = audio.duration - float(self._window_offset())
                 audio.close()
             except Exception as e:
                 logger.warning(f"Could not determine audio duration: {e}")
@@ -402,15 +1465,19 @@ class VideoGenerator:
         else:
             logger.info(f"Video duration: {final_duration:.2f}s")
 
-        # Sort frames by number to ensure correct sequence
-        self.frame_files.sort(
-            key=lambda x: int(os.path.basename(x).split("_")[1].split(".")[0])
-        )
-
         # Set default threads if not specified
         if threads is None:
             threads = max(4, os.cpu_count() - 1)
 
+        # Raw frames can only be consumed by FFmpeg
+        if self.export_mode != "frames" and encoder in ("auto", "ffmpeg"):
+            encoder = "ffmpeg"
+        elif self.export_mode != "frames":
+            raise ValueError(
+                f"Invalid encoder for {self.export_mode} export mode: {encoder}. "
+                "Choose 'ffmpeg' or 'auto'"
+            )
+
         # Determine which encoder to use
         if encoder == "auto":
             try:
@@ -476,62 +1543,282 @@ class VideoGenerator:
                 f"Invalid encoder: {encoder}. Choose 'ffmpeg', 'moviepy', or 'auto'"
             )
 
-        # Clean up temporary files
-        try:
-            shutil.rmtree(self.temp_dir)
-            logger.info(f"Cleaned up temporary files in {self.temp_dir}")
-        except Exception as e:
-            logger.warning(f"Could not clean up temporary files: {e}")
+        # Clean up temporary files
+        if self.temp_dir:
+            with self.report.measure("cleanup"):
+                try:
+                    shutil.rmtree(self.temp_dir)
+                    logger.info(f"Cleaned up temporary files in {self.temp_dir}")
+                except Exception as e:
+                    logger.warning(f"Could not clean up temporary files: {e}")
+
+        self._finish_report()
+
+        logger.info(f"Video generation completed! Exported to: {output_path}")
+        return output_path
+
+    def _finish_report(self):
+        """
+        Finish the render report, log it and write it to the report file
+        (mostly for internal use)
+        """
+
+        self.report.finish(self.total_frames)
+        logger.info(f"Render report: {self.report.summary()}")
+
+        if self.report_path:
+            try:
+                self.report.write(self.report_path)
+                logger.info(f"Render report written to {self.report_path}")
+            except OSError as e:
+                logger.warning(f"Could not write the render report: {e}")
+
+    def _export_video_with_ffmpeg(
+        self,
+        output_path,
+        duration,
+        video_codec=None,
+        audio_codec=None,
+        video_bitrate="8M",
+        audio_bitrate="192k",
+        preset="medium",
+        crf=23,
+        threads=None,
+        gpu_acceleration=True,
+        extra_args=None,
+    ):
+        """
+        Export video using FFmpeg directly with potential GPU acceleration
+
+        Args:
+            output_path (str): Path for the output video file
+            duration (float): Duration of the video in seconds
+            video_codec (str, optional): Video codec to use
+            audio_codec (str, optional): Audio codec to use
+            video_bitrate (str, optional): Video bitrate
+            audio_bitrate (str, optional): Audio bitrate
+            preset (str, optional): Encoding preset
+            crf (int, optional): Constant Rate Factor for quality
+            threads (int, optional): Number of encoding threads
+            gpu_acceleration (bool): Whether to use GPU acceleration
+            extra_args (list, optional): Additional FFmpeg arguments
+        """
+
+        # Prepare output directory
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        # Set default threads if not specified
+        if threads is None:
+            threads = max(4, os.cpu_count() - 1)
+
+        # Encode every chunk of the video in parallel and join them afterwards
+        if self.export_mode == "chunked":
+            self._export_video_in_chunks(
+                output_path,
+                duration,
+                video_codec,
+                audio_codec,
+                video_bitrate,
+                audio_bitrate,
+                preset,
+                crf,
+                threads,
+                gpu_acceleration,
+                extra_args,
+            )
+            logger.info(f"Video successfully encoded to {output_path}")
+            return
+
+        # Choose the video input, either raw frames piped into FFmpeg (as they
+        # are rendered, or from the frame store) or a list of the frame files
+        # written to disk
+        if self.export_mode == "stream":
+            input_args = self._get_raw_video_input_args(self.pixel_format)
+        elif self.export_mode == "memmap":
+            input_args = self._get_raw_video_input_args("rgb24")
+        else:
+            frames_list_file = self._write_frames_list()
+            input_args = ["-f", "concat", "-safe", "0", "-i", frames_list_file]
+
+        # Base FFmpeg command with improved sync options
+        ffmpeg_cmd = [
+            "ffmpeg",
+            "-y",
+            *input_args,
+            "-vsync",
+            "cfr",  # Constant frame rate for better sync
+            "-t",
+            str(duration),
+            *self._get_audio_input_args(duration),
+            *self._get_video_codec_args(
+                video_codec, video_bitrate, preset, crf, threads, gpu_acceleration
+            ),
+        ]
+
+        # Add audio encoding settings if audio is provided
+        if self.audio_path:
+            # Set default audio codec if not specified
+            if audio_codec is None:
+                audio_codec = "aac"
+
+            ffmpeg_cmd.extend(["-c:a", audio_codec, "-b:a", audio_bitrate])
+
+        # Add output format settings with improved sync options,
+        # the fps filter expands held frames back into constant frame rate
+        video_filter, extra_args = self._merge_video_filters(
+            f"fps={self.fps}", extra_args
+        )
+        ffmpeg_cmd.extend(
+            [
+                "-vf",
+                video_filter,
+                "-pix_fmt",
+                "yuv420p",
+                "-movflags",
+                "+faststart",
+            ]
+        )
+
+        # Add any extra arguments
+        if extra_args:
+            ffmpeg_cmd.extend(extra_args)
+
+        # Add output path
+        ffmpeg_cmd.append(output_path)
+
+        # Run FFmpeg
+        logger.info("Starting FFmpeg encoding process")
+        logger.debug(f"FFmpeg command: {' '.join(ffmpeg_cmd)}")
+
+        # Stream the frames into FFmpeg while rendering them
+        if self.export_mode == "stream":
+            self._stream_frames_to_ffmpeg(ffmpeg_cmd)
+            logger.info(f"Video successfully encoded to {output_path}")
+            return
+
+        # Pipe the frames from the frame store into FFmpeg
+        if self.export_mode == "memmap":
+            with self.report.measure("encoding", children=True):
+                self._pipe_frame_store_to_ffmpeg(ffmpeg_cmd)
+            logger.info(f"Video successfully encoded to {output_path}")
+            return
+
+        # Run FFmpeg with progress indication
+        from tqdm import tqdm
+
+        with self.report.measure("encoding", children=True):
+            process = subprocess.Popen(
+                ffmpeg_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+            )
+
+            # Simple progress indicator since FFmpeg output is complex
+            with tqdm(total=100, desc="Encoding video", unit="%") as pbar:
+                last_progress = 0
+                for line in process.stdout:
+                    # Try to extract progress information from FFmpeg output
+                    if "time=" in line:
+                        try:
+                            time_str = line.split("time=")[1].split()[0]
+                            h, m, s = time_str.split(":")
+                            current_time = float(h) * 3600 + float(m) * 60 + float(s)
+                            progress = min(int(current_time / duration * 100), 100)
+                            if progress > last_progress:
+                                pbar.update(progress - last_progress)
+                                last_progress = progress
+                        except Exception:
+                            pass
+
+            process.wait()
 
-        logger.info(f"Video generation completed! Exported to: {output_path}")
-        return output_path
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, ffmpeg_cmd)
 
-    def _export_video_with_ffmpeg(
-        self,
-        output_path,
-        duration,
-        video_codec=None,
-        audio_codec=None,
-        video_bitrate="8M",
-        audio_bitrate="192k",
-        preset="medium",
-        crf=23,
-        threads=None,
-        gpu_acceleration=True,
-        extra_args=None,
-    ):
+        logger.info(f"Video successfully encoded to {output_path}")
+
+    @staticmethod
+    def _merge_video_filters(video_filter, extra_args):
         """
-        Export video using FFmpeg directly with potential GPU acceleration
+        Merge a video filter with the video filters of extra FFmpeg arguments
+        (mostly for internal use)
+
+        FFmpeg only applies the last video filter option of an output, so the
+        filter chains passed with `-vf` or `-filter:v` in the extra arguments
+        are appended to the filter instead.
 
         Args:
-            output_path (str): Path for the output video file
-            duration (float): Duration of the video in seconds
-            video_codec (str, optional): Video codec to use
-            audio_codec (str, optional): Audio codec to use
-            video_bitrate (str, optional): Video bitrate
-            audio_bitrate (str, optional): Audio bitrate
-            preset (str, optional): Encoding preset
-            crf (int, optional): Constant Rate Factor for quality
-            threads (int, optional): Number of encoding threads
-            gpu_acceleration (bool): Whether to use GPU acceleration
-            extra_args (list, optional): Additional FFmpeg arguments
+            video_filter (str): Video filter chain, applied first
+            extra_args (list): Additional FFmpeg arguments, or None
+
+        Returns:
+            tuple: (merged video filter chain, extra arguments without their
+                video filter options)
         """
 
-        # Prepare output directory
-        output_dir = os.path.dirname(output_path)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        filters = [video_filter]
+        remaining_args = []
+        args = iter(extra_args or [])
+        for arg in args:
+            if arg in ("-vf", "-filter:v"):
+                user_filter = next(args, None)
+                if user_filter is None:
+                    raise ValueError(f"Missing filter after {arg} in extra arguments")
+                filters.append(user_filter)
+            else:
+                remaining_args.append(arg)
+
+        return ",".join(filters), remaining_args
+
+    def _get_raw_video_input_args(self, pixel_format):
+        """
+        Get the FFmpeg arguments reading raw video from stdin
+        (mostly for internal use)
 
-        # Create a temporary file listing all frames with precise timing
-        frames_list_file = os.path.join(self.temp_dir, "frames_list.txt")
-        frame_duration = 1.0 / self.fps
+        Args:
+            pixel_format (str): Raw pixel format, `'rgb24'` or `'yuv420p'`
 
-        logger.info("Preparing frame list for FFmpeg")
-        with open(frames_list_file, "w") as f:
-            for i, frame_file in enumerate(self.frame_files):
-                f.write(f"file '{frame_file}'\n")
-                # Use exact frame duration to prevent drift
-                f.write(f"duration {frame_duration}\n")
+        Returns:
+            list: FFmpeg input arguments
+        """
+
+        return [
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            pixel_format,
+            "-s",
+            f"{self.layout.video_width}x{self.layout.video_height}",
+            "-framerate",
+            str(self.fps),
+            "-i",
+            "-",
+        ]
+
+    @staticmethod
+    def _get_video_codec_args(
+        video_codec, video_bitrate, preset, crf, threads, gpu_acceleration
+    ):
+        """
+        Get the FFmpeg video encoding arguments (mostly for internal use)
+
+        Uses NVENC if GPU acceleration is requested and an NVIDIA GPU is
+        available, and the CPU codec otherwise.
+
+        Args:
+            video_codec (str): Video codec to use, or None for the default
+            video_bitrate (str): Video bitrate
+            preset (str): Encoding preset (x264 preset names)
+            crf (int): Constant Rate Factor for quality
+            threads (int): Number of encoding threads
+            gpu_acceleration (bool): Whether to use GPU acceleration
+
+        Returns:
+            list: FFmpeg output arguments for the video stream
+        """
 
         # Check for NVIDIA GPU with NVENC support if GPU acceleration is requested
         has_nvidia = False
@@ -547,42 +1834,7 @@ class VideoGenerator:
             except FileNotFoundError:
                 pass
 
-        # Set default threads if not specified
-        if threads is None:
-            threads = max(4, os.cpu_count() - 1)
-
-        # Base FFmpeg command with improved sync options
-        ffmpeg_cmd = [
-            "ffmpeg",
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            frames_list_file,
-            "-vsync",
-            "cfr",  # Constant frame rate for better sync
-            "-t",
-            str(duration),
-        ]
-
-        # Add audio if provided
-        if self.audio_path:
-            ffmpeg_cmd.extend(
-                [
-                    "-i",
-                    self.audio_path,
-                    "-t",
-                    str(duration),
-                    "-map",
-                    "0:v",
-                    "-map",
-                    "1:a",
-                    "-async",
-                    "1",  # Better audio sync
-                ]
-            )
+        codec_args = []
 
         # Determine if we should use GPU encoding
         use_gpu = (
@@ -608,7 +1860,7 @@ class VideoGenerator:
             elif preset in ["veryfast", "superfast", "ultrafast"]:
                 nvenc_preset = "p7"  # Fastest encoding
 
-            ffmpeg_cmd.extend(
+            codec_args.extend(
                 [
                     "-c:v",
                     video_codec,
@@ -631,7 +1883,7 @@ class VideoGenerator:
                 video_codec = "libx264"
 
             # For CPU encoding, use the x264 preset directly
-            ffmpeg_cmd.extend(
+            codec_args.extend(
                 [
                     "-c:v",
                     video_codec,
@@ -646,61 +1898,417 @@ class VideoGenerator:
 
             # Add tune parameter only for libx264
             if video_codec == "libx264":
-                ffmpeg_cmd.extend(["-tune", "film"])
+                codec_args.extend(["-tune", "film"])
 
-        # Add audio encoding settings if audio is provided
-        if self.audio_path:
-            # Set default audio codec if not specified
-            if audio_codec is None:
-                audio_codec = "aac"
+        return codec_args
 
-            ffmpeg_cmd.extend(["-c:a", audio_codec, "-b:a", audio_bitrate])
+    def _get_audio_input_args(self, duration):
+        """
+        Get the FFmpeg arguments adding the audio, starting at the rendered window
+        (mostly for internal use)
 
-        # Add output format settings with improved sync options
-        ffmpeg_cmd.extend(["-pix_fmt", "yuv420p", "-movflags", "+faststart"])
+        Args:
+            duration (float): Duration of the video in seconds
 
-        # Add any extra arguments
-        if extra_args:
-            ffmpeg_cmd.extend(extra_args)
+        Returns:
+            list: FFmpeg arguments for the audio input and stream mapping, empty
+                without audio
+        """
 
-        # Add output path
-        ffmpeg_cmd.append(output_path)
+        if not self.audio_path:
+            return []
+
+        audio_args = []
+        if self.window[0]:
+            audio_args.extend(["-ss", str(float(self._window_offset()))])
+        audio_args.extend(
+            [
+                "-i",
+                self.audio_path,
+                "-t",
+                str(duration),
+                "-map",
+                "0:v",
+                "-map",
+                "1:a",
+                "-async",
+                "1",  # Better audio sync
+            ]
+        )
+        return audio_args
 
-        # Run FFmpeg
-        logger.info("Starting FFmpeg encoding process")
+    def _write_frames_list(self):
+        """
+        Write the FFmpeg concat list of all frame files (mostly for internal use)
+
+        Returns:
+            str: Path to the frame list file
+        """
+
+        # Create a temporary file listing all frames with precise timing
+        frames_list_file = os.path.join(self.temp_dir, "frames_list.txt")
+
+        logger.info("Preparing frame list for FFmpeg")
+        with open(frames_list_file, "w") as f:
+            frame_position = 0
+            for frame_file, repeats in zip(self.frame_files, self.frame_repeats):
+                f.write(f"file '{frame_file}'\n")
+                # Read images at the output frame rate, otherwise the image
+                # demuxer rounds timestamps to its default 25 fps time base
+                f.write(f"option framerate {self.fps}\n")
+                # Held frames stay on screen for all of their repeats.
+                # Durations are taken between exact frame timestamps
+                # (in microseconds) to prevent drift.
+                start_us = round(frame_position * 1_000_000 / self.fps)
+                frame_position += repeats
+                end_us = round(frame_position * 1_000_000 / self.fps)
+                f.write(f"duration {end_us - start_us}us\n")
+
+            # The concat demuxer ignores the duration of the last entry
+            # unless the file is listed once more
+            if self.frame_files:
+                f.write(f"file '{self.frame_files[-1]}'\n")
+                f.write(f"option framerate {self.fps}\n")
+
+        return frames_list_file
+
+    def _stream_frames_to_ffmpeg(self, ffmpeg_cmd):
+        """
+        Render all subtitle batches and pipe the raw frames into FFmpeg
+        (mostly for internal use)
+
+        Batches are rendered in parallel, but only a small window of them is in
+        flight at any time, so memory use does not grow with the episode length.
+        Frames are written to FFmpeg strictly in timeline order, and rendering
+        is held back while FFmpeg falls behind.
+
+        Args:
+            ffmpeg_cmd (list): FFmpeg command reading raw video from stdin
+        """
+
+        from tqdm import tqdm
+
+        process, ffmpeg_output, output_reader = self._start_ffmpeg_pipe(ffmpeg_cmd)
+
+        start_time = time.perf_counter()
+
+        try:
+            with self._create_render_executor() as executor, tqdm(
+                total=self.total_frames, desc="Rendering and encoding", unit="frame"
+            ) as pbar:
+
+                def submit(batch):
+                    return executor.submit(
+                        self._render_subtitle_batch,
+                        batch.segments,
+                        self.fps,
+                        self.pixel_format,
+                    )
+
+                def write_frames(batch_idx, result):
+                    frames, stats = result
+                    self.report.add_worker_stats(stats)
+                    with self.report.measure("encoding"):
+                        for frame_bytes, repeats in frames:
+                            for _ in range(repeats):
+                                process.stdin.write(frame_bytes)
+                            pbar.update(repeats)
+
+                reassembler = BatchReassembler(
+                    submit, write_frames, window=self._get_pending_batches()
+                )
+                reassembler.run(self.sub_batches)
+                self.report.add_reassembly_stats(
+                    reassembler.window, reassembler.peak_waiting
+                )
+        except BrokenPipeError:
+            logger.error("FFmpeg stopped accepting frames")
+        finally:
+            self._close_ffmpeg_input(process)
+
+        with self.report.measure("encoding", children=True):
+            self._wait_for_ffmpeg(process, ffmpeg_output, output_reader, ffmpeg_cmd)
+
+        self._log_render_stats(time.perf_counter() - start_time)
+
+    def _export_video_in_chunks(
+        self,
+        output_path,
+        duration,
+        video_codec=None,
+        audio_codec=None,
+        video_bitrate="8M",
+        audio_bitrate="192k",
+        preset="medium",
+        crf=23,
+        threads=None,
+        gpu_acceleration=True,
+        extra_args=None,
+    ):
+        """
+        Render and encode every subtitle batch into its own video segment, then
+        join the segments and add the audio (mostly for internal use)
+
+        All segments are encoded with identical parameters and closed GOPs, and
+        every segment starts with a keyframe, so they are joined by stream copy.
+        The encoding threads are shared between the workers.
+
+        Args:
+            output_path (str): Path for the output video file
+            duration (float): Duration of the video in seconds
+            video_codec (str, optional): Video codec to use
+            audio_codec (str, optional): Audio codec to use
+            video_bitrate (str, optional): Video bitrate
+            audio_bitrate (str, optional): Audio bitrate
+            preset (str, optional): Encoding preset
+            crf (int, optional): Constant Rate Factor for quality
+            threads (int, optional): Number of encoding threads
+            gpu_acceleration (bool): Whether to use GPU acceleration
+            extra_args (list, optional): Additional FFmpeg arguments for the
+                segment encoders
+        """
+
+        from tqdm import tqdm
+
+        self.temp_dir = tempfile.mkdtemp()
+        codec_args = self._get_video_codec_args(
+            video_codec,
+            video_bitrate,
+            preset,
+            crf,
+            max(1, threads // self.num_workers),
+            gpu_acceleration,
+        )
+        segment_paths = [
+            os.path.join(self.temp_dir, f"segment_{batch_idx:06d}.mp4")
+            for batch_idx in range(len(self.sub_batches))
+        ]
+
+        start_time = time.perf_counter()
+
+        logger.info(
+            f"Encoding {len(segment_paths)} segments with {self.num_workers} workers"
+        )
+        with self._create_render_executor() as executor, tqdm(
+            total=self.total_frames, desc="Rendering and encoding", unit="frame"
+        ) as pbar:
+            batch_results = [
+                executor.submit(
+                    self._encode_subtitle_batch,
+                    batch.segments,
+                    self.fps,
+                    [
+                        "ffmpeg",
+                        "-y",
+                        *self._get_raw_video_input_args(self.pixel_format),
+                        *codec_args,
+                        "-flags",
+                        "+cgop",
+                        "-pix_fmt",
+                        "yuv420p",
+                        *(extra_args or []),
+                        segment_path,
+                    ],
+                    self.pixel_format,
+                )
+                for batch, segment_path in zip(self.sub_batches, segment_paths)
+            ]
+            for future in concurrent.futures.as_completed(batch_results):
+                frame_count, stats = future.result()
+                self.report.add_worker_stats(stats)
+                pbar.update(frame_count)
+
+        self._log_render_stats(time.perf_counter() - start_time)
+
+        # Join the segments in timeline order without re-encoding them
+        segments_list_file = os.path.join(self.temp_dir, "segments_list.txt")
+        with open(segments_list_file, "w") as f:
+            for segment_path in segment_paths:
+                f.write(f"file '{segment_path}'\n")
+
+        ffmpeg_cmd = [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            segments_list_file,
+            "-t",
+            str(duration),
+            *self._get_audio_input_args(duration),
+            "-c:v",
+            "copy",
+        ]
+        if self.audio_path:
+            ffmpeg_cmd.extend(["-c:a", audio_codec or "aac", "-b:a", audio_bitrate])
+        ffmpeg_cmd.extend(["-movflags", "+faststart", output_path])
+
+        logger.info("Joining the encoded segments")
         logger.debug(f"FFmpeg command: {' '.join(ffmpeg_cmd)}")
+        with self.report.measure("encoding", children=True):
+            result = subprocess.run(
+                ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+        if result.returncode != 0:
+            logger.error(
+                "FFmpeg output:\n" + result.stdout.decode(errors="replace")[-4000:]
+            )
+            raise subprocess.CalledProcessError(result.returncode, ffmpeg_cmd)
+
+    @staticmethod
+    def _encode_subtitle_batch(segments, fps, ffmpeg_cmd, pixel_format="rgb24"):
+        """
+        Render a batch of subtitles and encode it into a video segment
+
+        The layout is the one installed in the worker by the pool initializer.
+        Frames are piped into the encoder as they are rendered.
+
+        Args:
+            segments (list): List of contiguous Segment of cues to process
+            fps (Fraction): Frames per second
+            ffmpeg_cmd (list): FFmpeg command reading raw video from stdin and
+                writing the segment
+            pixel_format (str): Raw pixel format, `'rgb24'` or `'yuv420p'`
+
+        Returns:
+            tuple: (number of frames encoded, dict of worker stats from
+                `_get_worker_stats`)
+        """
+
+        start_time = time.perf_counter()
+        timer = StageTimer()
+        frame_count = 0
+        rendered_frames = 0
+        cache_hits = 0
+        convert = getattr(VideoGenerator, VideoGenerator.pixel_formats[pixel_format])
+
+        process, ffmpeg_output, output_reader = VideoGenerator._start_ffmpeg_pipe(
+            ffmpeg_cmd
+        )
+        try:
+            for _, frame, repeats, frame_path in VideoGenerator._render_subtitle_frames(
+                segments, _worker.layout, fps, _worker.cache, timer
+            ):
+                if frame is None:
+                    cache_hits += 1
+                    frame = VideoGenerator._read_cached_frame(frame_path, timer)
+                with timer.measure("serialization"):
+                    frame_bytes = convert(frame)
+                with timer.measure("encoding"):
+                    for _ in range(repeats):
+                        process.stdin.write(frame_bytes)
+                rendered_frames += 1
+                frame_count += repeats
+        except BrokenPipeError:
+            logger.error("FFmpeg stopped accepting frames")
+        finally:
+            VideoGenerator._close_ffmpeg_input(process)
+
+        with timer.measure("encoding", children=True):
+            VideoGenerator._wait_for_ffmpeg(
+                process, ffmpeg_output, output_reader, ffmpeg_cmd
+            )
+
+        stats = _get_worker_stats(start_time, timer, rendered_frames, cache_hits)
+        return frame_count, stats
+
+    def _pipe_frame_store_to_ffmpeg(self, ffmpeg_cmd):
+        """
+        Pipe the frames of the frame store into FFmpeg (mostly for internal use)
+
+        Frames are written straight from the memory map, held frames once for
+        every frame they are shown for.
+
+        Args:
+            ffmpeg_cmd (list): FFmpeg command reading raw video from stdin
+        """
+
+        from tqdm import tqdm
+
+        process, ffmpeg_output, output_reader = self._start_ffmpeg_pipe(ffmpeg_cmd)
+
+        try:
+            with tqdm(total=self.total_frames, desc="Encoding", unit="frame") as pbar:
+                for slot, repeats in zip(self.frame_slots, self.frame_repeats):
+                    frame = self.frame_store.read(slot)
+                    for _ in range(repeats):
+                        process.stdin.write(frame)
+                    pbar.update(repeats)
+        except BrokenPipeError:
+            logger.error("FFmpeg stopped accepting frames")
+        finally:
+            self._close_ffmpeg_input(process)
+
+        self._wait_for_ffmpeg(process, ffmpeg_output, output_reader, ffmpeg_cmd)
+
+    @staticmethod
+    def _start_ffmpeg_pipe(ffmpeg_cmd):
+        """
+        Start FFmpeg reading raw video from stdin (mostly for internal use)
+
+        FFmpeg output is drained in the background so that it never blocks on
+        a full pipe, and the last lines are kept for error reporting.
+
+        Args:
+            ffmpeg_cmd (list): FFmpeg command reading raw video from stdin
+
+        Returns:
+            tuple: (FFmpeg process, deque of its last output lines, thread
+                reading its output)
+        """
 
-        # Run FFmpeg with progress indication
         process = subprocess.Popen(
             ffmpeg_cmd,
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            universal_newlines=True,
         )
 
-        # Simple progress indicator since FFmpeg output is complex
-        with tqdm(total=100, desc="Encoding video", unit="%") as pbar:
-            last_progress = 0
-            for line in process.stdout:
-                # Try to extract progress information from FFmpeg output
-                if "time=" in line:
-                    try:
-                        time_str = line.split("time=")[1].split()[0]
-                        h, m, s = time_str.split(":")
-                        current_time = float(h) * 3600 + float(m) * 60 + float(s)
-                        progress = min(int(current_time / duration * 100), 100)
-                        if progress > last_progress:
-                            pbar.update(progress - last_progress)
-                            last_progress = progress
-                    except Exception:
-                        pass
+        ffmpeg_output = collections.deque(maxlen=20)
+        output_reader = threading.Thread(
+            target=lambda: ffmpeg_output.extend(
+                line.decode(errors="replace").rstrip() for line in process.stdout
+            ),
+            daemon=True,
+        )
+        output_reader.start()
+        return process, ffmpeg_output, output_reader
+
+    @staticmethod
+    def _close_ffmpeg_input(process):
+        """
+        Close the input of FFmpeg, so it finishes encoding
+        (mostly for internal use)
+
+        Args:
+            process: FFmpeg process started by `_start_ffmpeg_pipe`
+        """
+
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    @staticmethod
+    def _wait_for_ffmpeg(process, ffmpeg_output, output_reader, ffmpeg_cmd):
+        """
+        Wait for FFmpeg to finish encoding (mostly for internal use)
+
+        Args:
+            process: FFmpeg process started by `_start_ffmpeg_pipe`
+            ffmpeg_output (deque): Last output lines of FFmpeg
+            output_reader (Thread): Thread reading the output of FFmpeg
+            ffmpeg_cmd (list): FFmpeg command, for error reporting
+        """
 
         process.wait()
+        output_reader.join()
         if process.returncode != 0:
+            logger.error("FFmpeg output:\n" + "\n".join(ffmpeg_output))
             raise subprocess.CalledProcessError(process.returncode, ffmpeg_cmd)
 
-        logger.info(f"Video successfully encoded to {output_path}")
-
     def _export_video_with_moviepy(
         self,
         output_path,
@@ -740,8 +2348,10 @@ class VideoGenerator:
             threads = max(4, os.cpu_count() - 1)
 
         logger.info("Loading frames for MoviePy")
-        # Convert frames to video using the saved frame files
-        video = ImageSequenceClip(self.frame_files, fps=self.fps)
+        # Convert frames to video using the saved frame files,
+        # held frames stay on screen for all of their repeats
+        durations = [repeats / self.fps for repeats in self.frame_repeats]
+        video = ImageSequenceClip(self.frame_files, durations=durations)
 
         # Trim video to match duration
         video = video.subclip(0, duration)
@@ -753,7 +2363,8 @@ class VideoGenerator:
 
             logger.info(f"Adding audio from {self.audio_path}")
             audio = AudioFileClip(self.audio_path)
-            audio = audio.subclip(0, duration)
+            audio_offset = float(self._window_offset())
+            audio = audio.subclip(audio_offset, audio_offset + duration)
             video = video.set_audio(audio)
 
         # Prepare ffmpeg parameters for MoviePy
@@ -765,13 +2376,14 @@ class VideoGenerator:
 
         # Export video
         logger.info(f"Starting MoviePy encoding with {video_codec} codec")
-        video.write_videofile(
-            output_path,
-            codec=video_codec,
-            fps=self.fps,
-            threads=threads,
-            audio_codec=audio_codec,
-            bitrate=video_bitrate,
-            ffmpeg_params=ffmpeg_params,
-            logger="bar",
-        )
+        with self.report.measure("encoding", children=True):
+            video.write_videofile(
+                output_path,
+                codec=video_codec,
+                fps=float(self.fps),
+                threads=threads,
+                audio_codec=audio_codec,
+                bitrate=video_bitrate,
+                ffmpeg_params=ffmpeg_params,
+                logger="bar",
+            )
@@ -6,11 +6,18 @@ during video generation. Highlights are used to emphasize important parts of the
 content.
 """
 
+import collections
 import math
+import threading
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFilter
 
+from .. import compositor
+
+# Guards the sprite caches, which render threads share
+_sprites_lock = threading.Lock()
+
 
 class BaseHighlight:
     """Base class for all highlight effects (internal use only)"""
@@ -56,8 +63,15 @@ class Highlight:
     - "underline": Simple underline highlight
     - "box": Box around the highlighted area
     - "none": No highlight effect
+
+    Highlights are rendered as small sprites, cached by their shape, size, color,
+    blur radius and animation state, and composited in place only into their
+    bounding box of the frame.
     """
 
+    # Maximum number of cached highlight sprites
+    max_sprites = 64
+
     def __init__(self, effect_type="none", **kwargs):
         """
         Initialize a highlight effect
@@ -93,7 +107,30 @@ class Highlight:
         # Line-based effect parameters
         self.thickness = kwargs.get("thickness", 3)
 
-    def apply(self, frame, area, progress=0.0, **kwargs):
+        # Cache of rendered highlight sprites
+        self._sprites = collections.OrderedDict()
+
+    def __getstate__(self):
+        """
+        Get the state for pickling, without the cached sprites
+        """
+
+        state = self.__dict__.copy()
+        state["_sprites"] = collections.OrderedDict()
+        return state
+
+    @property
+    def is_animated(self):
+        """
+        Whether the effect changes with the animation progress
+
+        Static effects ("underline", "box" and "none") render identically on every
+        frame of a subtitle, which lets the engine render a subtitle hold only once.
+        """
+
+        return self.effect_type not in ("underline", "box", "none")
+
+    def apply(self, frame, area, progress=0.0, in_place=False, **kwargs):
         """
         Apply the selected highlight effect to a specific area
 
@@ -101,20 +138,29 @@ class Highlight:
             frame: The frame to apply the effect to (PIL Image or numpy array)
             area (tuple): Area to highlight as (x1, y1, x2, y2)
             progress (float): Animation progress from 0.0 to 1.0
+            in_place (bool): Whether to draw into the frame itself instead of
+                a copy, only RGBA frames can be modified in place
             **kwargs: Additional arguments
 
         Returns:
             The modified frame with the highlight effect applied
         """
-        # Convert numpy array to PIL if needed
+        # Other numpy frames are highlighted on an RGBA image
         original_type = type(frame)
-        if isinstance(frame, np.ndarray):
+        if isinstance(frame, np.ndarray) and (frame.ndim != 3 or frame.shape[2] != 4):
             frame = Image.fromarray(frame)
 
-        # If not a PIL image, return unchanged
-        if not isinstance(frame, Image.Image):
+        # If not a frame, return unchanged
+        if not isinstance(frame, (Image.Image, np.ndarray)):
             return frame
 
+        # Ensure we're working with an RGBA frame, and never modify the
+        # original unless asked to
+        if isinstance(frame, Image.Image) and frame.mode != "RGBA":
+            frame = frame.convert("RGBA")
+        elif not in_place:
+            frame = frame.copy()
+
         # Handle different effect types
         if self.effect_type == "pulse":
             result = self._apply_pulse(frame, area, progress)
@@ -131,22 +177,13 @@ class Highlight:
             result = self._apply_pulse(frame, area, progress)
 
         # Convert back to numpy array if input was numpy
-        if original_type == np.ndarray:
+        if original_type == np.ndarray and isinstance(result, Image.Image):
             return np.array(result)
 
         return result
 
     def _apply_pulse(self, frame, area, progress):
         """Apply pulse highlight effect"""
-        # Ensure we're working with an RGBA image
-        if frame.mode != "RGBA":
-            frame = frame.convert("RGBA")
-
-        # Create a copy to avoid modifying the original
-        result = frame.copy()
-        overlay = Image.new("RGBA", frame.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-
         # Calculate pulse size
         # Use sine wave to create smooth oscillation between min and max size
         pulse_factor = self.min_size + (self.max_size - self.min_size) * (
@@ -166,29 +203,17 @@ class Highlight:
         new_x2 = center_x + new_width / 2 + self.padding
         new_y2 = center_y + new_height / 2 + self.padding
 
-        # Draw the highlight
-        draw.rectangle((new_x1, new_y1, new_x2, new_y2), fill=self.color, outline=None)
-
-        # Apply blur if requested
-        if self.blur_radius > 0:
-            overlay = overlay.filter(ImageFilter.GaussianBlur(self.blur_radius))
-
-        # Composite the overlay with the original frame
-        result = Image.alpha_composite(result, overlay)
-
-        return result
+        # Draw the (blurred) highlight and composite it within its bounding box
+        sprite, x, y = self._get_sprite(
+            (new_x1, new_y1, new_x2, new_y2),
+            self.color,
+            self.blur_radius,
+            compositor.frame_size(frame),
+        )
+        return compositor.alpha_composite(frame, sprite, x, y)
 
     def _apply_glow(self, frame, area, progress):
         """Apply glow highlight effect"""
-        # Ensure we're working with an RGBA image
-        if frame.mode != "RGBA":
-            frame = frame.convert("RGBA")
-
-        # Create a copy to avoid modifying the original
-        result = frame.copy()
-        overlay = Image.new("RGBA", frame.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-
         # Animate the glow opacity if needed
         alpha = self.color[3]
         if progress is not None:
@@ -205,51 +230,33 @@ class Highlight:
         x2 += self.padding
         y2 += self.padding
 
-        # Draw the highlight
-        draw.rectangle((x1, y1, x2, y2), fill=glow_color)
-
-        # Apply blur
-        overlay = overlay.filter(ImageFilter.GaussianBlur(self.blur_radius))
-
-        # Composite the overlay with the original frame
-        result = Image.alpha_composite(result, overlay)
-
-        return result
+        # Draw the blurred highlight and composite it within its bounding box,
+        # the glow opacity only takes integer values, so it needs no quantizing
+        sprite, x, y = self._get_sprite(
+            (x1, y1, x2, y2),
+            glow_color,
+            self.blur_radius,
+            compositor.frame_size(frame),
+        )
+        return compositor.alpha_composite(frame, sprite, x, y)
 
     def _apply_underline(self, frame, area):
         """Apply underline highlight effect"""
-        # Ensure we're working with an RGBA image
-        if frame.mode != "RGBA":
-            frame = frame.convert("RGBA")
-
-        # Create a copy to avoid modifying the original
-        result = frame.copy()
-        overlay = Image.new("RGBA", frame.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-
         # Get the underline position (bottom of the area)
         x1, y1, x2, y2 = area
 
-        # Draw the underline with specified thickness
-        for i in range(self.thickness):
-            draw.line((x1, y2 + i, x2, y2 + i), fill=self.color)
-
-        # Composite the overlay with the original frame
-        result = Image.alpha_composite(result, overlay)
-
-        return result
+        # Draw the underline with specified thickness below the area
+        sprite, x, y = self._get_sprite(
+            (x1, y2, x2, y2 + self.thickness - 1),
+            self.color,
+            0,
+            compositor.frame_size(frame),
+            shape="underline",
+        )
+        return compositor.alpha_composite(frame, sprite, x, y)
 
     def _apply_box(self, frame, area):
         """Apply box highlight effect"""
-        # Ensure we're working with an RGBA image
-        if frame.mode != "RGBA":
-            frame = frame.convert("RGBA")
-
-        # Create a copy to avoid modifying the original
-        result = frame.copy()
-        overlay = Image.new("RGBA", frame.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-
         # Apply padding to the area
         x1, y1, x2, y2 = area
         x1 -= self.padding
@@ -258,9 +265,76 @@ class Highlight:
         y2 += self.padding
 
         # Draw the box
-        draw.rectangle((x1, y1, x2, y2), outline=self.color, width=self.thickness)
+        sprite, x, y = self._get_sprite(
+            (x1, y1, x2, y2),
+            self.color,
+            0,
+            compositor.frame_size(frame),
+            shape="box",
+        )
+        return compositor.alpha_composite(frame, sprite, x, y)
 
-        # Composite the overlay with the original frame
-        result = Image.alpha_composite(result, overlay)
+    def _get_sprite(self, rect, color, blur_radius, frame_size, shape="fill"):
+        """
+        Get the sprite of a highlight shape (mostly for internal use)
 
-        return result
+        The sprite includes a transparent margin wide enough for the blur, and is
+        clipped to the frame, so it matches drawing the shape on a full
+        transparent frame. The animated rectangle is quantized to whole pixels,
+        just like PIL draws it, so the frames of a pulse cycle share the sprites
+        of equal size. Sprites are cached by the rectangle within the sprite,
+        the sprite size, the shape, its color and the blur radius.
+
+        Args:
+            rect (tuple): Bounding rectangle of the shape in frame coordinates
+                as (x1, y1, x2, y2)
+            color (tuple): RGBA color
+            blur_radius (float): Radius of the Gaussian blur, 0 for none
+            frame_size (tuple): Width and height of the frame
+            shape (str): `'fill'` for a filled rectangle, `'box'` for its outline
+                and `'underline'` for horizontal lines, both `thickness` wide
+
+        Returns:
+            tuple: (Sprite, x, y) with the frame position of the sprite
+        """
+
+        x1, y1, x2, y2 = (math.floor(v) for v in rect)
+        margin = 3 * (math.ceil(blur_radius) + 1) if blur_radius > 0 else 1
+
+        # Bounding box of the (blurred) shape, clipped to the frame
+        x = max(0, min(x1, x2) - margin)
+        y = max(0, min(y1, y2) - margin)
+        size = (
+            max(1, min(frame_size[0], max(x1, x2) + margin + 1) - x),
+            max(1, min(frame_size[1], max(y1, y2) + margin + 1) - y),
+        )
+        local_rect = (x1 - x, y1 - y, x2 - x, y2 - y)
+
+        key = (local_rect, size, shape, tuple(color), blur_radius)
+        with _sprites_lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                return sprite, x, y
+
+        image = Image.new("RGBA", size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        if shape == "underline":
+            left, top, right, _ = local_rect
+            for i in range(self.thickness):
+                draw.line((left, top + i, right, top + i), fill=color)
+        elif shape == "box":
+            draw.rectangle(local_rect, outline=color, width=self.thickness)
+        else:
+            draw.rectangle(local_rect, fill=color, outline=None)
+        if blur_radius > 0:
+            image = image.filter(ImageFilter.GaussianBlur(blur_radius))
+        sprite = compositor.Sprite(image)
+
+        # Drop the least recently used sprite to keep memory use bounded
+        with _sprites_lock:
+            if len(self._sprites) >= self.max_sprites:
+                self._sprites.popitem(last=False)
+            self._sprites[key] = sprite
+
+        return sprite, x, y
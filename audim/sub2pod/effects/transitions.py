@@ -6,9 +6,13 @@ generation. Transitions are used for fade-in, fade-out, dissolve and other simil
 effects between frames.
 """
 
+import functools
+
 import numpy as np
 from PIL import Image
 
+from .. import compositor
+
 
 class BaseTransition:
     """Base class for all transition effects (internal use only)"""
@@ -73,12 +77,22 @@ class Transition:
         """
         Apply the selected transition effect to a frame
 
+        Frames are modified in place and returned, except RGBA PIL images that
+        slide, which are returned as new images.
+
+        Frames with an alpha channel are faded by clamping their alpha. Opaque
+        frames (RGB, or RGBX PIL images) are faded by blending them against a
+        background color instead, which is then also shown where a slide has
+        not covered the frame yet.
+
         Args:
             frame: The frame to apply the effect to (PIL Image or numpy array)
             progress (float): Progress of the transition, from 0.0 to 1.0
             **kwargs: Additional arguments that may include:
                 opacity_only (bool): If True, just return the opacity value
                 (for fade effect)
+                background (tuple): RGB color to blend opaque frames against,
+                defaults to black
 
         Returns:
             The modified frame with the transition effect applied
@@ -89,6 +103,9 @@ class Transition:
         elif self.effect_type == "slide":
             return self._apply_slide(frame, progress, **kwargs)
         elif self.effect_type == "none":
+            # Without a transition, subtitles are fully opaque right away
+            if kwargs.get("opacity_only", False):
+                return 255
             return frame
         else:
             # Default to fade if unknown effect type
@@ -112,23 +129,26 @@ class Transition:
         if kwargs.get("opacity_only", False):
             return opacity
 
+        background = tuple(kwargs.get("background") or (0, 0, 0))
+
         # Handle different frame types
         if isinstance(frame, np.ndarray):
-            # For numpy arrays, apply opacity to alpha channel
             if frame.shape[2] == 4:  # Has alpha channel
-                frame[:, :, 3] = np.minimum(frame[:, :, 3], opacity)
+                # For numpy arrays, clamp the alpha channel in place
+                alpha = frame[:, :, 3]
+                np.minimum(alpha, opacity, out=alpha)
+            else:
+                # Blend opaque frames against the background in place
+                frame[:] = _blend_background(frame, background, opacity)
             return frame
         elif isinstance(frame, Image.Image):
-            # For PIL images, use putalpha or convert as needed
             if frame.mode == "RGBA":
-                # Get alpha channel, apply opacity, and put it back
-                alpha = frame.split()[3]
-                alpha = Image.eval(alpha, lambda a: min(a, opacity))
-                frame.putalpha(alpha)
-            elif frame.mode == "RGB":
-                # Convert to RGBA and add alpha channel
-                frame = frame.convert("RGBA")
-                frame.putalpha(opacity)
+                # For PIL images, map the alpha channel through a lookup table
+                frame.putalpha(frame.getchannel("A").point(_fade_lut(opacity)))
+            elif frame.mode in ("RGB", "RGBX"):
+                # Blend opaque frames against the background in place, through
+                # a lookup table per band
+                frame.paste(frame.point(_blend_lut(background, opacity, frame.mode)))
             return frame
 
         # Unknown frame type, return unchanged
@@ -138,6 +158,11 @@ class Transition:
         """
         Apply slide-in effect to a frame
 
+        The frame is faded in and shifted by array slicing. Frames with an alpha
+        channel get their colors premultiplied by the faded alpha, leaving the
+        uncovered area transparent. Opaque frames are blended against the
+        background, which also fills the uncovered area.
+
         Args:
             frame: The frame to apply the effect to (PIL Image or numpy array)
             progress (float): Progress of the transition, from 0.0 to 1.0
@@ -155,23 +180,102 @@ class Transition:
         if frame is None:
             return int(progress * 255)
 
-        # Convert numpy array to PIL if needed
-        if isinstance(frame, np.ndarray):
-            frame = Image.fromarray(frame)
+        # Slide opaque PIL images in place, work on a numpy copy of other images
+        is_image = isinstance(frame, Image.Image)
+        if is_image and frame.mode in ("RGB", "RGBX"):
+            return self._slide_image(frame, progress, **kwargs)
+        if is_image:
+            frame = np.array(frame.convert("RGBA"))
 
-        # If not a PIL image, return unchanged
-        if not isinstance(frame, Image.Image):
+        # If not a frame buffer, return unchanged
+        if not isinstance(frame, np.ndarray):
             return frame
 
-        # Ensure we're working with an RGBA image
-        if frame.mode != "RGBA":
-            frame = frame.convert("RGBA")
+        # Opaque frames are blended against the background,
+        # other frames are faded through their alpha channel
+        opaque = frame.shape[2] == 3
+        background = tuple(kwargs.get("background") or (0, 0, 0))
+        fill = background if opaque else 0
+
+        # Calculate offset based on direction and progress
+        height, width = frame.shape[:2]
+        offset_x, offset_y = self._slide_offset(progress, width, height)
+
+        # Also apply a fade-in effect with the slide for smoother transition
+        opacity = int(progress * 255)
+
+        if abs(offset_x) >= width or abs(offset_y) >= height:
+            frame[:] = fill
+        else:
+            src_x, dst_x = _shifted_slices(offset_x, width)
+            src_y, dst_y = _shifted_slices(offset_y, height)
+            if opaque:
+                visible = _blend_background(frame[src_y, src_x], background, opacity)
+            else:
+                visible = compositor.premultiply(frame[src_y, src_x], opacity)
+
+            frame[dst_y, dst_x] = visible
+
+            # Clear the area uncovered by the slide
+            if offset_x > 0:
+                frame[:, :offset_x] = fill
+            elif offset_x < 0:
+                frame[:, offset_x:] = fill
+            if offset_y > 0:
+                frame[:offset_y] = fill
+            elif offset_y < 0:
+                frame[offset_y:] = fill
+
+        if is_image:
+            return Image.fromarray(frame)
+        return frame
+
+    def _slide_image(self, frame, progress, **kwargs):
+        """
+        Apply slide-in effect to an opaque PIL image in place
 
-        # Create a blank frame
+        Matches the slide of opaque numpy frames, with the visible part blended
+        through a lookup table and moved with PIL.
+
+        Args:
+            frame (Image): RGB or RGBX image to apply the effect to
+            progress (float): Progress of the transition, from 0.0 to 1.0
+            **kwargs: Additional arguments
+
+        Returns:
+            Image: The same image with slide-in effect applied
+        """
+        background = tuple(kwargs.get("background") or (0, 0, 0))
         width, height = frame.size
-        result = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        offset_x, offset_y = self._slide_offset(progress, width, height)
+        opacity = int(progress * 255)
 
-        # Calculate offset based on direction and progress
+        if abs(offset_x) >= width or abs(offset_y) >= height:
+            frame.paste(background, (0, 0, width, height))
+            return frame
+
+        src_x, dst_x = _shifted_slices(offset_x, width)
+        src_y, dst_y = _shifted_slices(offset_y, height)
+        visible = frame.crop((src_x.start, src_y.start, src_x.stop, src_y.stop))
+        visible = visible.point(_blend_lut(background, opacity, frame.mode))
+
+        # Clear the whole frame, then put the visible part at its new position
+        frame.paste(background, (0, 0, width, height))
+        frame.paste(visible, (dst_x.start, dst_y.start))
+        return frame
+
+    def _slide_offset(self, progress, width, height):
+        """
+        Offset of a sliding frame (mostly for internal use)
+
+        Args:
+            progress (float): Progress of the transition, from 0.0 to 1.0
+            width (int): Width of the frame
+            height (int): Height of the frame
+
+        Returns:
+            tuple: Horizontal and vertical offset in pixels
+        """
         offset_x, offset_y = 0, 0
         if self.direction == "left":
             offset_x = int((1.0 - progress) * width)
@@ -181,22 +285,88 @@ class Transition:
             offset_y = int((1.0 - progress) * height)
         elif self.direction == "down":
             offset_y = int((progress - 1.0) * height)
+        return offset_x, offset_y
 
-        # Also apply a fade-in effect with the slide for smoother transition
-        opacity = int(progress * 255)
-        frame_copy = frame.copy()
 
-        # Apply opacity to the frame
-        if frame_copy.mode == "RGBA":
-            alpha = frame_copy.split()[3]
-            alpha = Image.eval(alpha, lambda a: min(a, opacity))
-            frame_copy.putalpha(alpha)
+@functools.lru_cache(maxsize=256)
+def _fade_lut(opacity):
+    """
+    Lookup table clamping alpha values to an opacity (mostly for internal use)
+
+    Args:
+        opacity (int): Opacity of the transition (0-255)
+
+    Returns:
+        list: 256 entry lookup table for `Image.point`
+    """
+
+    return [min(a, opacity) for a in range(256)]
+
+
+@functools.lru_cache(maxsize=256)
+def _blend_lut(background, opacity, mode="RGB"):
+    """
+    Lookup table blending opaque pixels against a background color
+    (mostly for internal use)
+
+    Gives the same results as `_blend_background`, since blending against a
+    single color maps every band value on its own.
 
-        # Paste the frame at the offset position
-        result.paste(frame_copy, (offset_x, offset_y), frame_copy)
+    Args:
+        background (tuple): RGB background color
+        opacity (int): Opacity of the pixels over the background (0-255)
+        mode (str): Mode of the image, `'RGB'` or `'RGBX'`
+
+    Returns:
+        list: Lookup table with 256 entries per band for `Image.point`
+    """
+
+    values = np.arange(256, dtype=np.uint8)[:, None]
+    lut = []
+    for color in background:
+        lut.extend(_blend_background(values, (color,), opacity)[:, 0].tolist())
+    if mode == "RGBX":
+        # Keep the padding band fully opaque
+        lut.extend([255] * 256)
+    return lut
+
+
+def _shifted_slices(offset, size):
+    """
+    Source and destination slices for shifting an axis by an offset
+    (mostly for internal use)
+
+    Args:
+        offset (int): Offset in pixels, smaller than the size
+        size (int): Size of the axis in pixels
+
+    Returns:
+        tuple: (source slice, destination slice)
+    """
+
+    if offset >= 0:
+        return slice(0, size - offset), slice(offset, size)
+    return slice(-offset, size), slice(0, size + offset)
+
+
+def _blend_background(pixels, background, opacity):
+    """
+    Blend opaque RGB pixels against a background color (mostly for internal use)
+
+    Args:
+        pixels (np.ndarray): RGB pixels
+        background (tuple): RGB background color
+        opacity (int): Opacity of the pixels over the background (0-255)
+
+    Returns:
+        np.ndarray: New array with the blended RGB pixels
+    """
 
-        # Convert back to numpy array if input was numpy
-        if isinstance(kwargs.get("original_frame"), np.ndarray):
-            return np.array(result)
+    blended = np.multiply(pixels, np.uint16(opacity), dtype=np.uint16)
+    blended += np.array(background, dtype=np.uint16) * np.uint16(255 - opacity)
 
-        return result
+    # Integer division by 255 with rounding
+    blended += 128
+    blended += blended >> 8
+    blended >>= 8
+    return blended.astype(np.uint8)
@@ -1,5 +1,4 @@
-from PIL import Image
-
+from .. import assets, compositor
 from .text import TextRenderer
 
 
@@ -12,7 +11,7 @@ class Header:
     host profile, guest profile, etc.
     """
 
-    def __init__(self, height=150, background_color=(30, 30, 30)):
+    def __init__(self, height=150, background_color=(30, 30, 30), font_path=None):
         """
         Initialize the layout header
 
@@ -23,13 +22,17 @@ class Header:
                                           defaults to a new instance
             logo (Image): optional logo image, defaults to None
             logo_size (tuple): optional size of the logo, defaults to (100, 100)
+            font_path (str, optional): Path of a font file (like a `.ttf`),
+                defaults to the default sans-serif font of the system
         """
 
         self.height = height
         self.background_color = background_color
-        self.text_renderer = TextRenderer()
+        self.text_renderer = TextRenderer(font_path)
         self.logo = None
         self.logo_size = (100, 100)
+        self.logo_margin = 50
+        self.title_font_size = 60
 
     def set_logo(self, logo_path, size=(100, 100)):
         """
@@ -41,9 +44,8 @@ class Header:
         """
 
         if logo_path:
-            self.logo = Image.open(logo_path).convert("RGBA")
             self.logo_size = size
-            self.logo = self.logo.resize(self.logo_size)
+            self.logo = assets.load_image(logo_path, self.logo_size)
         return self
 
     def draw(self, frame, draw, width, title="My Podcast", opacity=255):
@@ -63,13 +65,11 @@ class Header:
 
         # Add logo if available
         if self.logo:
-            frame.paste(
-                self.logo,
-                (
-                    width - self.logo_size[0] - 50,
-                    (self.height - self.logo_size[1]) // 2,
-                ),
+            compositor.paste(
+                frame,
                 self.logo,
+                width - self.logo_size[0] - self.logo_margin,
+                (self.height - self.logo_size[1]) // 2,
             )
 
         # Add title
@@ -77,7 +77,7 @@ class Header:
             draw,
             title,
             (width // 2, self.height // 2),
-            font_size=60,
+            font_size=self.title_font_size,
             color=(255, 255, 255, opacity),
             anchor="mm",
         )
@@ -1,5 +1,7 @@
 from PIL import Image, ImageDraw
 
+from .. import assets
+
 
 class ProfilePicture:
     """
@@ -34,8 +36,8 @@ class ProfilePicture:
             Image: Processed profile image
         """
 
-        img = Image.open(self.image_path).convert("RGBA")
-        img = img.resize(self.size)
+        # The decoded image is shared, so apply the mask to a copy
+        img = assets.load_image(self.image_path, self.size).copy()
 
         if self.shape == "circle":
             mask = self._create_circular_mask()
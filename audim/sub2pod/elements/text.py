@@ -1,5 +1,17 @@
-from matplotlib import font_manager
-from PIL import ImageFont
+import collections
+import math
+import threading
+
+from PIL import Image, ImageDraw
+
+from .. import fonts
+
+# Wrapped text rasterized once, with the masks of its lines as (x, y, mask) and
+# its bounding box, relative to the position of the text
+TextLayout = collections.namedtuple("TextLayout", ["lines", "masks", "bbox"])
+
+# Guards the text layout caches, which render threads share
+_text_layouts_lock = threading.Lock()
 
 
 class TextRenderer:
@@ -10,27 +22,60 @@ class TextRenderer:
     and wrapping. It can handle different fonts, sizes, colors, and anchor points.
     """
 
-    def __init__(self):
+    # Maximum number of cached wrapped text layouts
+    max_text_layouts = 256
+
+    # Distance from the maximum width, as a fraction of the font size, within
+    # which wrapped lines are measured exactly to account for kerning
+    kerning_tolerance = 0.25
+
+    def __init__(self, font_path=None):
         """
         Initialize the text renderer with default fonts
+
+        Args:
+            font_path (str, optional): Path of a font file (like a `.ttf`),
+                defaults to the default sans-serif font of the system
         """
 
-        self.font_path = font_manager.findfont(
-            font_manager.FontProperties(family=["sans"])
+        self.font_path = (
+            fonts.check_font(font_path) if font_path else fonts.find_font()
         )
-        self.fonts = {}
+        self._text_layouts = collections.OrderedDict()
+        self._word_widths = {}
+
+    def __getstate__(self):
+        """
+        Get the state for pickling, without the cached text layouts and widths
+        """
+
+        state = self.__dict__.copy()
+        state["_text_layouts"] = collections.OrderedDict()
+        state["_word_widths"] = {}
+        return state
+
+    def set_font(self, font_path):
+        """
+        Set the font used for all text
+
+        Args:
+            font_path (str): Path of a font file (like a `.ttf`)
+        """
+
+        self.font_path = fonts.check_font(font_path)
+        return self
 
     def get_font(self, size):
         """
         Get or create a font of the specified size
 
+        Fonts are shared by all text renderers in the process.
+
         Args:
             size (int): Size of the font
         """
 
-        if size not in self.fonts:
-            self.fonts[size] = ImageFont.truetype(self.font_path, size)
-        return self.fonts[size]
+        return fonts.get_font(self.font_path, size)
 
     def draw_text(
         self,
@@ -73,6 +118,9 @@ class TextRenderer:
         """
         Draw text with word wrapping
 
+        The wrapped text is rasterized once and cached (see `layout_wrapped_text`),
+        so drawing the same text again only blits its line masks in the color.
+
         Args:
             draw (ImageDraw): Draw object to draw on the frame
             text (str): Text to draw
@@ -83,33 +131,170 @@ class TextRenderer:
             anchor (str): Anchor of the text (from PIL library), defaults to "lm".
                           See [pillow docs: text anchors](https://pillow.readthedocs.io/en/latest/handbook/text-anchors.html)
                           for all possible options.
+
+        Returns:
+            tuple | None: Bounding box of the drawn text as (x1, y1, x2, y2),
+                None if nothing was drawn
         """
 
-        font = self.get_font(font_size)
         color = self._sanitize_color(color)
+        layout = self.layout_wrapped_text(text, position, max_width, font_size, anchor)
 
-        # Get font metrics for dynamic calculations
-        font_ascent, font_descent = font.getmetrics()
-        line_height = font_ascent + font_descent
-        line_spacing = line_height * 0.5  # 50% of line height for spacing
-        total_line_height = line_height + line_spacing
+        x, y = int(position[0]), int(position[1])
+        for mask_x, mask_y, mask in layout.masks:
+            draw.bitmap((x + mask_x, y + mask_y), mask, fill=color)
+
+        return self._offset_bbox(layout.bbox, x, y)
+
+    def get_wrapped_text_bbox(
+        self, text, position, max_width, font_size=40, anchor="lm"
+    ):
+        """
+        Get the bounding box of text drawn with word wrapping
+
+        Args:
+            text (str): Text to measure
+            position (tuple): Position of the text
+            max_width (int): Maximum width of the text before wrapping
+            font_size (int): Size of the font, defaults to 40
+            anchor (str): Anchor of the text (from PIL library), defaults to "lm"
+
+        Returns:
+            tuple | None: Bounding box of the text as (x1, y1, x2, y2),
+                None for text without any visible characters
+        """
+
+        layout = self.layout_wrapped_text(text, position, max_width, font_size, anchor)
+        return self._offset_bbox(layout.bbox, int(position[0]), int(position[1]))
+
+    def layout_wrapped_text(
+        self, text, position, max_width, font_size=40, anchor="lm"
+    ):
+        """
+        Wrap and rasterize text, or get the cached result
+
+        Text is rasterized exactly like `ImageDraw.text` draws it, which depends on
+        the position only through its fractional part. Layouts are cached by the
+        text, the font, its size, the maximum width, the anchor and that
+        fractional part of the position.
+
+        Args:
+            text (str): Text to lay out
+            position (tuple): Position of the text
+            max_width (int): Maximum width of the text before wrapping
+            font_size (int): Size of the font, defaults to 40
+            anchor (str): Anchor of the text (from PIL library), defaults to "lm"
+
+        Returns:
+            TextLayout: Lines, line masks and bounding box (None without any
+                visible characters), relative to the integer part of the position
+        """
+
+        fraction = (math.modf(position[0])[0], math.modf(position[1])[0])
+        key = (text, self.font_path, font_size, max_width, anchor, fraction)
+        with _text_layouts_lock:
+            layout = self._text_layouts.get(key)
+            if layout is not None:
+                self._text_layouts.move_to_end(key)
+                return layout
+
+        layout = self._create_text_layout(text, fraction, max_width, font_size, anchor)
+
+        # Drop the least recently used layout to keep memory use bounded
+        with _text_layouts_lock:
+            if len(self._text_layouts) >= self.max_text_layouts:
+                self._text_layouts.popitem(last=False)
+            self._text_layouts[key] = layout
+
+        return layout
+
+    def wrap_text(self, text, max_width, font_size=40, kerning_check=True):
+        """
+        Break text into lines no wider than a maximum width
+
+        Words are measured once per font and memoized, and lines are filled
+        greedily by adding up the word and space widths, in time linear in the
+        number of words. Kerning can make a line slightly wider or narrower than
+        the sum of its words, so lines whose estimated width is within
+        `kerning_tolerance` of the maximum width are measured as a whole.
+
+        A single word wider than the maximum width gets a line of its own.
+
+        Args:
+            text (str): Text to wrap
+            max_width (int): Maximum width of a line
+            font_size (int): Size of the font, defaults to 40
+            kerning_check (bool): Whether to measure lines close to the maximum
+                width exactly, defaults to True
+
+        Returns:
+            list: Lines of the text
+        """
+
+        font = self.get_font(font_size)
+        widths = self._word_widths.setdefault((self.font_path, font_size), {})
+        if " " not in widths:
+            widths[" "] = font.getlength(" ")
+        space_width = widths[" "]
+        tolerance = self.kerning_tolerance * font_size if kerning_check else 0
 
-        # Word wrap
-        words = text.split()
         lines = []
         current_line = []
+        line_width = 0
+
+        for word in text.split():
+            word_width = widths.get(word)
+            if word_width is None:
+                word_width = widths[word] = font.getlength(word)
+
+            if not current_line:
+                current_line.append(word)
+                line_width = word_width
+                continue
+
+            width = line_width + space_width + word_width
+            if kerning_check and abs(width - max_width) <= tolerance:
+                width = font.getlength(" ".join(current_line) + " " + word)
 
-        for word in words:
-            current_line.append(word)
-            w = draw.textlength(" ".join(current_line), font=font)
-            if w > max_width:
-                current_line.pop()
+            if width > max_width:
                 lines.append(" ".join(current_line))
                 current_line = [word]
+                line_width = word_width
+            else:
+                current_line.append(word)
+                line_width = width
         lines.append(" ".join(current_line))
 
+        return lines
+
+    def _create_text_layout(self, text, fraction, max_width, font_size, anchor):
+        """
+        Wrap and rasterize text (mostly for internal use)
+
+        Args:
+            text (str): Text to lay out
+            fraction (tuple): Fractional part of the position of the text
+            max_width (int): Maximum width of the text before wrapping
+            font_size (int): Size of the font
+            anchor (str): Anchor of the text
+
+        Returns:
+            TextLayout: Lines, line masks and bounding box, relative to the
+                integer part of the position
+        """
+
+        font = self.get_font(font_size)
+
+        # Get font metrics for dynamic calculations
+        font_ascent, font_descent = font.getmetrics()
+        line_height = font_ascent + font_descent
+        line_spacing = line_height * 0.5  # 50% of line height for spacing
+        total_line_height = line_height + line_spacing
+
+        lines = self.wrap_text(text, max_width, font_size)
+
         # Calculate vertical offset for multiple lines to maintain center alignment
-        text_x, text_y = position
+        text_x, text_y = fraction
         total_text_height = len(lines) * total_line_height
 
         if anchor == "lm":
@@ -117,10 +302,60 @@ class TextRenderer:
         else:
             text_start_y = text_y
 
-        # Draw each line
+        # Rasterize each line into a mask on a canvas with a margin, at the same
+        # fractional position as on the frame
+        masks = []
+        bbox = None
         for i, line in enumerate(lines):
+            if not line:
+                continue
+
             line_y = text_start_y + (i * total_line_height)
-            draw.text((text_x, line_y), line, fill=color, font=font, anchor=anchor)
+            left, top, right, bottom = font.getbbox(line, anchor=anchor)
+            pad_x, pad_y = 1 + max(0, -left), 1 + max(0, -top)
+            origin_x = pad_x - math.floor(text_x)
+            origin_y = pad_y - math.floor(line_y)
+
+            mask = Image.new(
+                "L", (pad_x + max(0, right) + 2, pad_y + max(0, bottom) + 2), 0
+            )
+            ImageDraw.Draw(mask).text(
+                (origin_x + text_x, origin_y + line_y),
+                line,
+                fill=255,
+                font=font,
+                anchor=anchor,
+            )
+
+            line_bbox = mask.getbbox()
+            if line_bbox is None:
+                continue
+            mask = mask.crop(line_bbox)
+            mask_x, mask_y = line_bbox[0] - origin_x, line_bbox[1] - origin_y
+            masks.append((mask_x, mask_y, mask))
+
+            line_bbox = (mask_x, mask_y, mask_x + mask.width, mask_y + mask.height)
+            bbox = line_bbox if bbox is None else self._union_bbox(bbox, line_bbox)
+
+        return TextLayout(lines, masks, bbox)
+
+    @staticmethod
+    def _union_bbox(a, b):
+        """
+        Bounding box of two bounding boxes (mostly for internal use)
+        """
+
+        return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+    @staticmethod
+    def _offset_bbox(bbox, x, y):
+        """
+        Move a bounding box by an offset (mostly for internal use)
+        """
+
+        if bbox is None:
+            return None
+        return (bbox[0] + x, bbox[1] + y, bbox[2] + x, bbox[3] + y)
 
     def _sanitize_color(self, color):
         """
@@ -17,7 +17,8 @@ class Watermark:
         color=(255, 255, 255),
         opacity=150,
         font_size=20,
-        margin=10
+        margin=10,
+        font_path=None,
     ):
         """
         Initialize the watermark
@@ -30,6 +31,8 @@ class Watermark:
             opacity (int): Opacity of the watermark (0-255)
             font_size (int): Font size of the watermark text
             margin (int): Margin from the edges in pixels
+            font_path (str, optional): Path of a font file (like a `.ttf`),
+                defaults to the default sans-serif font of the system
         """
 
         self.text = text
@@ -38,7 +41,7 @@ class Watermark:
         self.opacity = opacity
         self.font_size = font_size
         self.margin = margin
-        self.text_renderer = TextRenderer()
+        self.text_renderer = TextRenderer(font_path)
         
     def set_text(self, text):
         """
@@ -0,0 +1,162 @@
+"""
+Font registry for videos
+
+This module locates fonts and loads them once per process, so that all text
+renderers share the same font objects. Locating the default font with matplotlib's
+font manager is slow on a cold cache, so the resolved font file is persisted on
+disk, and later runs skip font discovery (and importing matplotlib) entirely.
+"""
+
+import json
+import logging
+import os
+import tempfile
+
+from PIL import ImageFont
+
+logger = logging.getLogger("VideoGenerator")
+
+# Font family used when no font file is given
+DEFAULT_FONT_FAMILY = "sans"
+
+# Resolved font files by family, and loaded fonts by file and size
+_font_paths = {}
+_fonts = {}
+
+
+def get_registry_path():
+    """
+    Get the path of the file persisting resolved fonts
+
+    Uses `$XDG_CACHE_HOME/audim/fonts.json`, falling back to `~/.cache`.
+
+    Returns:
+        str: Path of the registry file
+    """
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "audim", "fonts.json")
+
+
+def find_font(family=DEFAULT_FONT_FAMILY):
+    """
+    Find the font file of a font family
+
+    The font file is resolved once per process. It is looked up in the registry
+    file first, and only discovered with matplotlib's font manager if it is not
+    registered there yet (or the registered file no longer exists).
+
+    Args:
+        family (str): Font family, defaults to `DEFAULT_FONT_FAMILY`
+
+    Returns:
+        str: Path of the font file
+    """
+
+    font_path = _font_paths.get(family)
+    if font_path is not None:
+        return font_path
+
+    registry = _load_registry()
+    font_path = registry.get(family)
+    if not font_path or not os.path.isfile(font_path):
+        # Only import matplotlib when the font has to be discovered
+        from matplotlib import font_manager
+
+        font_path = font_manager.findfont(
+            font_manager.FontProperties(family=[family])
+        )
+        registry[family] = font_path
+        _save_registry(registry)
+
+    _font_paths[family] = font_path
+    return font_path
+
+
+def check_font(font_path):
+    """
+    Check that a font file exists
+
+    Args:
+        font_path (str): Path of the font file
+
+    Returns:
+        str: Path of the font file
+    """
+
+    if not os.path.isfile(font_path):
+        raise ValueError(f"Font file not found: {font_path}")
+    return font_path
+
+
+def get_font(font_path, size):
+    """
+    Get a font loaded from a file, shared by all callers in the process
+
+    Args:
+        font_path (str): Path of the font file
+        size (int): Size of the font
+
+    Returns:
+        FreeTypeFont: Font of the given size
+    """
+
+    key = (font_path, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts.setdefault(key, ImageFont.truetype(font_path, size))
+    return font
+
+
+def clear():
+    """
+    Forget all resolved and loaded fonts, including the registry file
+
+    Use this after installing new fonts, to discover the default font again.
+    """
+
+    _font_paths.clear()
+    _fonts.clear()
+    try:
+        os.remove(get_registry_path())
+    except FileNotFoundError:
+        pass
+
+
+def _load_registry():
+    """
+    Load the resolved fonts from the registry file (mostly for internal use)
+    """
+
+    try:
+        with open(get_registry_path(), encoding="utf-8") as f:
+            registry = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return registry if isinstance(registry, dict) else {}
+
+
+def _save_registry(registry):
+    """
+    Save the resolved fonts to the registry file (mostly for internal use)
+
+    The file is written to a temporary file first and then moved in place,
+    so concurrent processes never see a partially written registry. Failing
+    to save only means the font is discovered again next time.
+    """
+
+    path = get_registry_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".json", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(registry, f, indent=2)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError as e:
+        logger.debug(f"Could not save the font registry to {path}: {e}")
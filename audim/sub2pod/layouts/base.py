@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 
 from PIL import Image, ImageDraw
 
+from audim.sub2pod.buffers import FrameBuffer, FramePool
 from audim.sub2pod.effects import Highlight, Transition
 from audim.sub2pod.elements.watermark import Watermark
 
@@ -14,7 +15,13 @@ class BaseLayout(ABC):
     It provides a common interface for adding speakers and creating frames and scenes.
     """
 
-    def __init__(self, video_width=1920, video_height=1080, content_horizontal_offset=0):
+    def __init__(
+        self,
+        video_width=1920,
+        video_height=1080,
+        content_horizontal_offset=0,
+        font_path=None,
+    ):
         """
         Initialize the base layout
 
@@ -25,20 +32,32 @@ class BaseLayout(ABC):
                 (positive values move content right, negative values move content left).
                 This allows shifting the main content (display pictures and subtitles)
                 within the frame while keeping the header fixed.
+            font_path (str, optional): Path of a font file (like a `.ttf`) for all
+                text, defaults to the default sans-serif font of the system
         """
 
         self.video_width = video_width
         self.video_height = video_height
         self.content_horizontal_offset = content_horizontal_offset
+        self.font_path = font_path
+
+        # Factor all sizes have been scaled by, see `set_scale`
+        self.scale = 1.0
 
         # Default transition effect
         self.transition_effect = Transition("fade")
 
         # No default highlight effect
         self.highlight_effect = None
+
+        # Render opaque RGB frames flattened onto the background, see `set_opaque`
+        self.opaque = True
+
+        # Reused buffers frames are rendered into, see `set_frame_pool`
+        self.frame_pool = None
         
         # Default watermark (enabled)
-        self.watermark = Watermark()
+        self.watermark = Watermark(font_path=self.font_path)
         self.show_watermark = True
 
     def set_transition_effect(self, effect_type, **kwargs):
@@ -80,6 +99,40 @@ class BaseLayout(ABC):
 
         self.highlight_effect = Highlight(effect_type, **kwargs)
 
+    def set_opaque(self, opaque=True):
+        """
+        Set whether frames are rendered opaque
+
+        Opaque frames (the default) are flattened onto the background color and
+        created as RGB, and transitions blend them against the background.
+        Otherwise frames are created as RGBA, and transitions fade them in
+        through their alpha channel, which is only visible when the frames are
+        composited over something else later on.
+
+        Args:
+            opaque (bool): Whether to render opaque RGB frames
+        """
+
+        self.opaque = opaque
+        return self
+
+    def set_frame_pool(self, size=1):
+        """
+        Render frames into a pool of reused frame buffers
+
+        Instead of allocating a new frame every time, `create_frame` draws into
+        the next buffer of the pool and returns a view of it. A returned frame
+        is overwritten once `size` more frames have been created, so the size
+        has to cover all frames the caller holds on to at the same time.
+
+        Args:
+            size (int): Number of buffers in the pool, 0 to allocate a new
+                frame every time
+        """
+
+        self.frame_pool = FramePool(size) if size else None
+        return self
+
     def set_content_offset(self, offset):
         """
         Set horizontal offset for the main content area
@@ -97,6 +150,76 @@ class BaseLayout(ABC):
         self.content_horizontal_offset = offset
         return self
 
+    def set_font(self, font_path):
+        """
+        Set the font used for all text of the layout
+
+        Args:
+            font_path (str): Path of a font file (like a `.ttf`)
+        """
+
+        self.font_path = font_path
+        for text_renderer in self._get_text_renderers():
+            text_renderer.set_font(font_path)
+        return self
+
+    def set_scale(self, scale):
+        """
+        Scale all sizes of the layout by a factor
+
+        Scales the video size together with every element and effect, so the
+        frames look the same at a different resolution. Useful for rendering
+        quick low resolution drafts of a layout.
+
+        Args:
+            scale (float): Factor to scale all sizes by, e.g. `0.5` for half
+                the width and height
+        """
+
+        if scale <= 0:
+            raise ValueError(f"Invalid scale: {scale}. Must be greater than 0")
+
+        # Keep the video size even, as required by yuv420p encoding
+        self.video_width = max(2, round(self.video_width * scale / 2) * 2)
+        self.video_height = max(2, round(self.video_height * scale / 2) * 2)
+        self.content_horizontal_offset = round(self.content_horizontal_offset * scale)
+
+        if self.watermark is not None:
+            self.watermark.font_size = self._scale_size(self.watermark.font_size, scale)
+            self.watermark.margin = self._scale_size(self.watermark.margin, scale)
+
+        if self.highlight_effect is not None:
+            self.highlight_effect.padding = self._scale_size(
+                self.highlight_effect.padding, scale
+            )
+            self.highlight_effect.blur_radius = self._scale_size(
+                self.highlight_effect.blur_radius, scale
+            )
+            self.highlight_effect.thickness = self._scale_size(
+                self.highlight_effect.thickness, scale
+            )
+
+        self.scale *= scale
+        return self
+
+    @staticmethod
+    def _scale_size(size, scale):
+        """
+        Scale a size in pixels, keeping it at least 1 pixel
+        (mostly for internal use)
+
+        Args:
+            size (int | tuple): Size or tuple of sizes in pixels
+            scale (float): Factor to scale by
+
+        Returns:
+            int | tuple: Scaled size or tuple of sizes
+        """
+
+        if isinstance(size, tuple):
+            return tuple(BaseLayout._scale_size(s, scale) for s in size)
+        return max(1, round(size * scale))
+
     def enable_watermark(self, show=True):
         """
         Enable or disable the watermark
@@ -107,7 +230,7 @@ class BaseLayout(ABC):
 
         self.show_watermark = show
         if show and self.watermark is None:
-            self.watermark = Watermark()
+            self.watermark = Watermark(font_path=self.font_path)
         return self
 
     def set_watermark_text(self, text):
@@ -119,7 +242,7 @@ class BaseLayout(ABC):
         """
 
         if self.watermark is None:
-            self.watermark = Watermark(text=text)
+            self.watermark = Watermark(text=text, font_path=self.font_path)
         else:
             self.watermark.set_text(text)
         return self
@@ -134,7 +257,7 @@ class BaseLayout(ABC):
         """
 
         if self.watermark is None:
-            self.watermark = Watermark(position=position)
+            self.watermark = Watermark(position=position, font_path=self.font_path)
         else:
             self.watermark.set_position(position)
         return self
@@ -148,7 +271,7 @@ class BaseLayout(ABC):
         """
 
         if self.watermark is None:
-            self.watermark = Watermark(color=color)
+            self.watermark = Watermark(color=color, font_path=self.font_path)
         else:
             self.watermark.set_color(color)
         return self
@@ -162,7 +285,7 @@ class BaseLayout(ABC):
         """
 
         if self.watermark is None:
-            self.watermark = Watermark(opacity=opacity)
+            self.watermark = Watermark(opacity=opacity, font_path=self.font_path)
         else:
             self.watermark.set_opacity(opacity)
         return self
@@ -182,7 +305,7 @@ class BaseLayout(ABC):
         """
 
         if self.watermark is None:
-            self.watermark = Watermark(**kwargs)
+            self.watermark = Watermark(**kwargs, font_path=self.font_path)
         else:
             if "text" in kwargs:
                 self.watermark.set_text(kwargs["text"])
@@ -211,17 +334,102 @@ class BaseLayout(ABC):
         pass
 
     @abstractmethod
-    def create_frame(self, current_sub=None, opacity=255):
+    def create_frame(self, current_sub=None, opacity=255, out=None):
         """
         Create a frame with the current subtitle
 
+        Layouts render into the buffer from `_get_frame_buffer` and return a
+        view of it, see `_get_frame_view`, so that frames can be rendered into
+        a caller-supplied buffer or the frame pool without any copy.
+
         Args:
             current_sub (str): Current subtitle
             opacity (int): Opacity of the subtitle
+            out (np.ndarray | FrameBuffer, optional): Buffer to render the frame
+                into, a uint8 array of shape (height, width, 4). Defaults to the
+                next buffer of the frame pool, or a new buffer without a pool.
+        """
+
+        pass
+
+    def prepare(self):
+        """
+        Prepare the layout for rendering
+
+        Called once in every worker process before any frame is created.
+        Layouts can override it to decode assets and warm up their caches,
+        instead of doing that work lazily while rendering the first frames.
         """
 
         pass
 
+    def is_position_dependent(self):
+        """
+        Check whether frames depend on the position within the current subtitle
+
+        Once the transition of a subtitle has finished, a layout renders the same
+        frame for every remaining position of that subtitle unless an animated
+        highlight effect is set. The core engine uses this to render such holds
+        only once and repeat the frame in the encoder.
+
+        Returns:
+            bool: True if frames change with `subtitle_position`
+        """
+
+        return bool(self.highlight_effect and self.highlight_effect.is_animated)
+
+    def _get_text_renderers(self):
+        """
+        Get the text renderers of the layout and its elements
+        (mostly for internal use)
+        """
+
+        if self.watermark:
+            return [self.watermark.text_renderer]
+        return []
+
+    def _get_frame_buffer(self, out=None):
+        """
+        Get the buffer to render the next frame into (mostly for internal use)
+
+        Args:
+            out (np.ndarray | FrameBuffer, optional): Caller-supplied buffer
+
+        Returns:
+            FrameBuffer: Caller-supplied buffer, the next buffer of the frame
+                pool, or a new buffer
+        """
+
+        frame_size = (self.video_width, self.video_height)
+        if isinstance(out, FrameBuffer):
+            if out.size != frame_size:
+                raise ValueError(
+                    f"Invalid frame buffer size: {out.size[0]}x{out.size[1]}. "
+                    f"Expected {frame_size[0]}x{frame_size[1]}"
+                )
+            return out
+        if out is not None:
+            return FrameBuffer(frame_size, out)
+        if self.frame_pool is not None:
+            return self.frame_pool.take(frame_size)
+        return FrameBuffer(frame_size)
+
+    def _get_frame_view(self, buffer, frame):
+        """
+        Get a rendered frame as a view of its buffer (mostly for internal use)
+
+        Args:
+            buffer (FrameBuffer): Buffer the frame was rendered into
+            frame: Image or RGBA array the frame was rendered into, copied into
+                the buffer if it does not map it
+
+        Returns:
+            np.ndarray: RGB view of the buffer if the layout is opaque, the RGBA
+                buffer otherwise
+        """
+
+        return buffer.view(frame, channels=3 if self.opaque else 4)
+
     def _create_base_frame(self, background_color=(20, 20, 20)):
         """
         Create a base frame with the specified background color
@@ -236,3 +444,21 @@ class BaseLayout(ABC):
         )
         draw = ImageDraw.Draw(frame)
         return frame, draw
+
+    @staticmethod
+    def _flatten(frame, background_color=(20, 20, 20)):
+        """
+        Flatten an RGBA frame onto a background color (mostly for internal use)
+
+        Args:
+            frame (Image): RGBA frame
+            background_color (tuple): Background color in RGB format
+
+        Returns:
+            Image: Opaque RGBA frame, with the same colors as the frame
+                composited over the background
+        """
+
+        flattened = Image.new("RGBA", frame.size, tuple(background_color) + (255,))
+        flattened.alpha_composite(frame)
+        return flattened
@@ -1,5 +1,8 @@
-import numpy as np
+import threading
 
+from PIL import ImageDraw
+
+from .. import compositor
 from ..elements.header import Header
 from ..elements.profile import ProfilePicture
 from ..elements.text import TextRenderer
@@ -14,8 +17,14 @@ class PodcastLayout(BaseLayout):
     This layout is designed for standard podcast videos with a header section,
     profile pictures, and subtitles. It provides a flexible structure for adding
     speakers and creating frames with customizable parameters.
+
+    Creating frames is reentrant: all per-frame state is passed along
+    explicitly, so several threads can render frames with one layout.
     """
 
+    # Guards the static layer caches, which render threads share
+    _static_layers_lock = threading.Lock()
+
     def __init__(
         self,
         video_width=1920,
@@ -25,6 +34,7 @@ class PodcastLayout(BaseLayout):
         show_speaker_names=True,
         content_horizontal_offset=0,
         show_watermark=True,
+        font_path=None,
     ):
         """
         Initialize podcast layout
@@ -39,28 +49,34 @@ class PodcastLayout(BaseLayout):
                 (positive values move content right,
                 negative values move content left)
             show_watermark (bool): Whether to show the watermark
+            font_path (str, optional): Path of a font file (like a `.ttf`) for all
+                text, defaults to the default sans-serif font of the system
         """
 
-        super().__init__(video_width, video_height)
+        super().__init__(video_width, video_height, font_path=font_path)
 
         # Layout parameters
         self.header_height = header_height
         self.dp_size = dp_size
         self.show_speaker_names = show_speaker_names
         self.dp_margin_left = 40
+        self.dp_min_spacing = 40
+        self.dp_highlight_width = 3
         self.text_margin = 50
         self.name_margin = 30
+        self.subtitle_font_size = 40
+        self.name_font_size = 30
         self.content_horizontal_offset = content_horizontal_offset
 
         # Initialize components
-        self.header = Header(height=header_height)
-        self.text_renderer = TextRenderer()
+        self.header = Header(height=header_height, font_path=font_path)
+        self.text_renderer = TextRenderer(font_path)
         
         # Initialize watermark
         self.show_watermark = show_watermark
         if show_watermark:
             # Opposite of background color (which is typically dark)
-            self.watermark = Watermark(color=(255, 255, 255))
+            self.watermark = Watermark(color=(255, 255, 255), font_path=font_path)
 
         # Store profile pictures and positions
         self.speakers = {}
@@ -68,8 +84,23 @@ class PodcastLayout(BaseLayout):
         self.logo_path = None
         self.title = "My Podcast"
 
-        # Store the active subtitle area for highlighting
-        self.active_subtitle_area = None
+        # Cache of pre-composited static layers, keyed by opacity
+        self._static_layers = {}
+        self._static_layers_signature = None
+        self.max_static_layers = 32
+
+    def __getstate__(self):
+        """
+        Get the state for pickling, without the cached static layers
+
+        Cached layers are large and rebuilt on demand, so they are not sent along
+        when the layout is shipped to worker processes.
+        """
+
+        state = self.__dict__.copy()
+        state["_static_layers"] = {}
+        state["_static_layers_signature"] = None
+        return state
 
     def set_content_offset(self, offset):
         """
@@ -96,7 +127,9 @@ class PodcastLayout(BaseLayout):
         """
 
         num_speakers = len(self.speakers)
-        spacing, start_y = self._calculate_layout(num_speakers)
+        spacing, start_y = self._calculate_layout(
+            num_speakers, min_spacing=self.dp_min_spacing
+        )
 
         for i, speaker in enumerate(self.speakers.keys()):
             y_pos = start_y + (i * (self.dp_size[1] + spacing))
@@ -161,7 +194,11 @@ class PodcastLayout(BaseLayout):
             highlight_color = (255, 200, 0)
             speaker_pos = self.dp_positions[speaker]
             self.speakers[speaker].highlight(
-                draw, speaker_pos, color=highlight_color, opacity=opacity
+                draw,
+                speaker_pos,
+                color=highlight_color,
+                width=self.dp_highlight_width,
+                opacity=opacity,
             )
 
             # Calculate text position
@@ -181,28 +218,20 @@ class PodcastLayout(BaseLayout):
                     self.video_width - self.text_margin * 2
                 )
 
-            # Store text area for possible highlight effects
-            estimated_text_height = 100  # Approximate height for highlighting
-            self.active_subtitle_area = (
-                text_x,
-                text_y - estimated_text_height / 2,
-                text_x + text_width,
-                text_y + estimated_text_height / 2,
-            )
-
-            # Draw the subtitle text
-            self.text_renderer.draw_wrapped_text(
+            # Draw the subtitle text, and keep its bounding box for possible
+            # highlight effects
+            subtitle_area = self.text_renderer.draw_wrapped_text(
                 draw,
                 text,
                 (text_x, text_y),
                 max_width=text_width,
-                font_size=40,
+                font_size=self.subtitle_font_size,
                 color=(255, 255, 255, opacity),
                 anchor="lm",
             )
 
             # Apply highlight effect if configured
-            if self.highlight_effect and self.active_subtitle_area:
+            if self.highlight_effect and subtitle_area:
                 # Get progress value from subtitle_info or use a default
                 progress = 0.0
                 if (
@@ -217,13 +246,198 @@ class PodcastLayout(BaseLayout):
                         else 0.0
                     )
 
-                # Apply the highlight effect
+                # Apply the highlight effect in place, within its bounding box
                 frame = self.highlight_effect.apply(
-                    frame, self.active_subtitle_area, progress=progress
+                    frame, subtitle_area, progress=progress, in_place=True
+                )
+
+        return frame
+
+    def prepare(self, background_color=(20, 20, 20)):
+        """
+        Prepare the layout for rendering
+
+        Loads the logo and builds the fully opaque static layer up front,
+        so that worker processes do it once when they start.
+
+        Args:
+            background_color (tuple): Background color in RGB format,
+                                      defaults to (20, 20, 20)
+        """
+
+        self._get_static_layer(255, background_color)
+
+    def _get_static_layer(self, opacity, background_color):
+        """
+        Get the pre-composited static layer for an opacity level
+        (mostly for internal use)
+
+        The static layer holds everything that does not change within a subtitle
+        and is drawn under the subtitle: the background, header, and speaker
+        pictures and names.
+        One layer is built per opacity level, and the engine only produces one
+        level per transition frame, so the cache stays small. The cache is
+        rebuilt whenever the layout configuration changes.
+
+        Args:
+            opacity (int): Opacity of the transition (0-255)
+            background_color (tuple): Background color in RGB format
+
+        Returns:
+            Image: Cached static layer, copy it before drawing on it
+        """
+
+        # Layers are only built once, even when several threads ask at once
+        with self._static_layers_lock:
+            signature = self._static_layer_signature(background_color)
+            if signature != self._static_layers_signature:
+                self._static_layers = {}
+                self._static_layers_signature = signature
+
+                # Load the logo once per configuration instead of once per frame
+                if self.logo_path:
+                    self.header.set_logo(self.logo_path, size=self.header.logo_size)
+
+            layer = self._static_layers.get(opacity)
+            if layer is None:
+                # Drop the oldest layer to keep memory use bounded
+                if len(self._static_layers) >= self.max_static_layers:
+                    self._static_layers.pop(next(iter(self._static_layers)))
+                layer = self._create_static_layer(opacity, background_color)
+                if self.opaque:
+                    layer = self._flatten(layer, background_color)
+                self._static_layers[opacity] = layer
+            return layer
+
+    def _static_layer_signature(self, background_color):
+        """
+        Describe the configuration that the static layers depend on
+        (mostly for internal use)
+
+        Args:
+            background_color (tuple): Background color in RGB format
+
+        Returns:
+            tuple: Hashable description of the static layer configuration
+        """
+
+        speakers = tuple(
+            (speaker, self.dp_positions[speaker], id(profile.image))
+            for speaker, profile in self.speakers.items()
+        )
+
+        return (
+            self.video_width,
+            self.video_height,
+            tuple(background_color),
+            self.header.height,
+            tuple(self.header.background_color),
+            self.header.logo_size,
+            self.header.logo_margin,
+            self.header.title_font_size,
+            self.header.text_renderer.font_path,
+            self.logo_path,
+            self.title,
+            self.dp_size,
+            self.show_speaker_names,
+            self.name_margin,
+            self.name_font_size,
+            self.text_renderer.font_path,
+            speakers,
+            self.opaque,
+        )
+
+    def _create_static_layer(self, opacity, background_color):
+        """
+        Draw the static layer for an opacity level (mostly for internal use)
+
+        Args:
+            opacity (int): Opacity of the transition (0-255)
+            background_color (tuple): Background color in RGB format
+
+        Returns:
+            Image: Static layer with background, header and speakers
+        """
+
+        # Create base frame
+        frame, draw = self._create_base_frame(background_color)
+
+        # Draw header
+        self.header.draw(frame, draw, self.video_width, self.title, opacity)
+
+        # Add all speaker DPs and names
+        for speaker, profile in self.speakers.items():
+            pos = self.dp_positions[speaker]
+            compositor.paste(frame, profile.image, *pos)
+
+            # Draw speaker name if enabled
+            if self.show_speaker_names:
+                name_y = pos[1] + self.dp_size[1] + self.name_margin
+                self.text_renderer.draw_text(
+                    draw,
+                    speaker,
+                    (pos[0] + self.dp_size[0] // 2, name_y),
+                    font_size=self.name_font_size,
+                    color=(200, 200, 200, opacity),
+                    anchor="mm",
                 )
 
         return frame
 
+    def _get_text_renderers(self):
+        """
+        Get the text renderers of the layout and its elements
+        (mostly for internal use)
+        """
+
+        return [
+            *super()._get_text_renderers(),
+            self.header.text_renderer,
+            self.text_renderer,
+        ]
+
+    def set_scale(self, scale):
+        """
+        Scale all sizes of the layout by a factor
+
+        Scales the video size, header, profile pictures, margins and font sizes
+        together, so the frames look the same at a different resolution.
+
+        Args:
+            scale (float): Factor to scale all sizes by, e.g. `0.5` for half
+                the width and height
+        """
+
+        super().set_scale(scale)
+
+        self.header_height = self._scale_size(self.header_height, scale)
+        self.dp_size = self._scale_size(tuple(self.dp_size), scale)
+        self.dp_margin_left = self._scale_size(self.dp_margin_left, scale)
+        self.dp_min_spacing = self._scale_size(self.dp_min_spacing, scale)
+        self.dp_highlight_width = self._scale_size(self.dp_highlight_width, scale)
+        self.text_margin = self._scale_size(self.text_margin, scale)
+        self.name_margin = self._scale_size(self.name_margin, scale)
+        self.subtitle_font_size = self._scale_size(self.subtitle_font_size, scale)
+        self.name_font_size = self._scale_size(self.name_font_size, scale)
+
+        self.header.height = self.header_height
+        self.header.logo_size = self._scale_size(tuple(self.header.logo_size), scale)
+        self.header.logo_margin = self._scale_size(self.header.logo_margin, scale)
+        self.header.title_font_size = self._scale_size(
+            self.header.title_font_size, scale
+        )
+        if self.header.logo is not None:
+            self.header.logo = self.header.logo.resize(self.header.logo_size)
+
+        # Reload the profile pictures at their new size
+        for name, profile in self.speakers.items():
+            self.speakers[name] = ProfilePicture(
+                profile.image_path, self.dp_size, profile.shape
+            )
+        self._calculate_positions()
+
+        return self
+
     def add_speaker(self, name, image_path, shape="circle"):
         """
         Add a speaker to the layout
@@ -242,7 +456,12 @@ class PodcastLayout(BaseLayout):
         return self
 
     def create_frame(
-        self, current_sub=None, opacity=255, background_color=(20, 20, 20), **kwargs
+        self,
+        current_sub=None,
+        opacity=255,
+        background_color=(20, 20, 20),
+        out=None,
+        **kwargs,
     ):
         """
         Create a frame with the podcast layout
@@ -252,9 +471,15 @@ class PodcastLayout(BaseLayout):
             opacity (int): Opacity of the subtitle
             background_color (tuple): Background color in RGB format,
                                       defaults to (20, 20, 20)
+            out (np.ndarray | FrameBuffer, optional): Buffer to render the frame
+                into, defaults to the next buffer of the frame pool
             **kwargs: Additional keyword arguments:
                 subtitle_position (float): Current position within subtitle in seconds
                 subtitle_duration (float): Total duration of subtitle in seconds
+
+        Returns:
+            np.ndarray: RGB frame if the layout is opaque, RGBA frame otherwise,
+                as a view of the buffer it was rendered into
         """
         # Instead of modifying the subtitle object, we'll add the position and duration
         # to a local dictionary that we'll use in _draw_subtitle
@@ -280,52 +505,50 @@ class PodcastLayout(BaseLayout):
                     None, progress, opacity_only=True
                 )
 
-        # Create base frame
-        frame, draw = self._create_base_frame(background_color)
-
-        # Draw header
-        if self.logo_path:
-            self.header.set_logo(self.logo_path)
-        self.header.draw(frame, draw, self.video_width, self.title, opacity)
-
-        # Add all speaker DPs and names
-        for speaker, profile in self.speakers.items():
-            pos = self.dp_positions[speaker]
-            frame.paste(profile.image, pos, profile.image)
+        # Opaque frames are drawn fully opaque, and the transition then blends
+        # the whole frame against the background
+        draw_opacity = 255 if self.opaque else opacity
 
-            # Draw speaker name if enabled
-            if self.show_speaker_names:
-                name_y = pos[1] + self.dp_size[1] + self.name_margin
-                self.text_renderer.draw_text(
-                    draw,
-                    speaker,
-                    (pos[0] + self.dp_size[0] // 2, name_y),
-                    font_size=30,
-                    color=(200, 200, 200, opacity),
-                    anchor="mm",
-                )
+        # Start from the cached static layer (background, header and speakers)
+        # and only draw what changes per frame on top of it, right in the frame
+        # buffer
+        buffer = self._get_frame_buffer(out)
+        frame = buffer.image
+        frame.paste(self._get_static_layer(draw_opacity, background_color))
+        draw = ImageDraw.Draw(frame)
 
         # Add subtitle if there's a current subtitle
         if current_sub:
             # Pass the subtitle_info dictionary as an additional parameter
             frame = self._draw_subtitle(
-                frame, draw, current_sub, opacity, subtitle_info
+                frame, draw, current_sub, draw_opacity, subtitle_info
             )
 
-        # Draw watermark if enabled
+        # Draw watermark if enabled, on top of the subtitle and its highlight
         if self.show_watermark and self.watermark:
             self.watermark.draw(
-                frame, draw, self.video_width, self.video_height, opacity
+                frame,
+                ImageDraw.Draw(frame),
+                self.video_width,
+                self.video_height,
+                draw_opacity,
             )
 
         # If we have a transition effect and opacity is not max,
-        # apply the full transition effect to the frame
+        # apply the full transition effect to the frame buffer in place
         if (
             hasattr(self, "transition_effect")
             and self.transition_effect
             and opacity != 255
         ):
+            # Opaque frames are blended against the background through an RGBX
+            # image of the buffer, other frames are faded through their alpha
+            self._get_frame_view(buffer, frame)
+            frame = buffer.get_image("RGBX") if self.opaque else buffer.array
             progress = opacity / 255.0
-            frame = self.transition_effect.apply(frame, progress)
+            frame = self.transition_effect.apply(
+                frame, progress, background=background_color
+            )
 
-        return np.array(frame)
+        # The flattened frame is fully opaque, so only its colors are kept
+        return self._get_frame_view(buffer, frame)
@@ -0,0 +1,92 @@
+"""
+In-order reassembly of rendered batches
+
+Workers finish their batches in any order, but frames have to reach the encoder
+in timeline order. This module hands the results of the batches to a sink, like
+an encoder pipe or a frame list writer, strictly in timeline order. Only a
+bounded window of batches is ever submitted or waiting for the sink, so memory
+use does not grow with the episode length, and workers are held back when the
+sink falls behind.
+"""
+
+import concurrent.futures
+
+
+class BatchReassembler:
+    """
+    Releases the results of batches to a sink in submission order
+
+    The window bounds the number of batches that are rendering or finished but
+    not yet released. A finished batch that waits for an earlier one still
+    counts towards the window, so when the sink (or a single slow batch) falls
+    behind, no new batches are submitted until it catches up.
+    """
+
+    def __init__(self, submit, sink, window=4):
+        """
+        Initialize the batch reassembler
+
+        Args:
+            submit (callable): Function submitting a batch to the workers,
+                returning a `concurrent.futures.Future` of its result
+            sink (callable): Function called with the index and the result of
+                every batch, in order
+            window (int): Maximum number of batches submitted or waiting to be
+                released at any time
+        """
+
+        if window < 1:
+            raise ValueError(f"Invalid window: {window}. Must be at least 1")
+
+        self.submit = submit
+        self.sink = sink
+        self.window = window
+
+        # Most batches that were ever finished but waiting for the sink
+        self.peak_waiting = 0
+
+    def run(self, batches):
+        """
+        Submit all batches and release their results to the sink in order
+
+        Args:
+            batches (iterable): Batches to submit, in timeline order
+
+        Returns:
+            int: Number of batches released to the sink
+        """
+
+        batches = enumerate(batches)
+        running = {}
+        finished = {}
+        next_index = 0
+
+        def fill():
+            while len(running) + len(finished) < self.window:
+                index, batch = next(batches, (None, None))
+                if index is None:
+                    return
+                running[self.submit(batch)] = index
+
+        try:
+            fill()
+            while running or finished:
+                # Release the next batch as soon as it is available
+                if next_index in finished:
+                    self.sink(next_index, finished.pop(next_index))
+                    next_index += 1
+                    fill()
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    finished[running.pop(future)] = future.result()
+                waiting = len(finished) - (next_index in finished)
+                self.peak_waiting = max(self.peak_waiting, waiting)
+        finally:
+            for future in running:
+                future.cancel()
+
+        return next_index
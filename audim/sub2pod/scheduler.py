@@ -0,0 +1,288 @@
+"""
+Render scheduling for videos
+
+This module partitions the timeline of a video into contiguous frame ranges of
+roughly equal estimated render cost, so that the work can be spread evenly across
+worker processes.
+"""
+
+import collections
+import heapq
+
+# A batch of contiguous segments with its estimated render cost
+RenderBatch = collections.namedtuple("RenderBatch", ["segments", "cost"])
+
+
+def get_transition_frames(layout, default=15):
+    """
+    Get the number of transition frames used by a layout
+
+    Args:
+        layout: Layout object that defines the visual arrangement
+        default (int): Number of frames if the layout has no transition effect
+
+    Returns:
+        int: Number of transition frames at the start of every cue
+    """
+
+    transition_effect = getattr(layout, "transition_effect", None)
+    if transition_effect:
+        return transition_effect.frames
+    return default
+
+
+class RenderScheduler:
+    """
+    Partitions the timeline into batches of roughly equal render cost
+
+    The cost model is expressed in units of one plain rendered frame. It accounts
+    for the transition frames at the start of every cue, for highlight effects,
+    and for subtitle holds that are rendered once and then only repeated.
+    Long cues are split across batches when needed, so a single long monologue
+    does not end up on one core while the other workers sit idle.
+    """
+
+    # Relative cost of rendering one frame
+    frame_cost = 1.0
+
+    # Extra cost of applying the transition effect to a frame
+    transition_cost = 0.5
+
+    # Cost of repeating an already rendered frame of a subtitle hold
+    repeat_cost = 0.02
+
+    # Minimum cost of a batch, smaller batches are not worth their overhead
+    min_batch_cost = 30.0
+
+    # Extra cost of the highlight effects per rendered frame
+    highlight_costs = {
+        "pulse": 2.0,
+        "glow": 2.0,
+        "underline": 0.2,
+        "box": 0.2,
+        "none": 0.0,
+    }
+
+    def __init__(self, layout, num_workers=1, batch_size=300, batches_per_worker=4):
+        """
+        Initialize the render scheduler
+
+        Args:
+            layout: Layout object that defines the visual arrangement
+            num_workers (int): Number of worker processes rendering the batches
+            batch_size (int): Maximum cost of a batch, in rendered frames
+            batches_per_worker (int): Minimum number of batches per worker,
+                smaller batches balance the load better at the end of the job
+        """
+
+        self.layout = layout
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.batches_per_worker = batches_per_worker
+
+    def plan(self, spans):
+        """
+        Partition the timeline into batches of contiguous frame ranges
+
+        Args:
+            spans (list): List of Segment in timeline order, as returned by
+                `Timeline.spans`
+
+        Returns:
+            list: List of RenderBatch in timeline order
+        """
+
+        runs = list(self._iter_runs(spans))
+        total_cost = sum(self._run_cost(run, run.end - run.start) for run in runs)
+
+        # Aim for enough batches to keep every worker busy until the end,
+        # but never more than `batch_size` frames worth of work per batch
+        target_cost = total_cost / max(1, self.num_workers * self.batches_per_worker)
+        target_cost = max(self.min_batch_cost, min(self.batch_size, target_cost))
+
+        batches = []
+        segments = []
+        batch_cost = 0.0
+
+        for run in runs:
+            start = run.start
+            while start < run.end:
+                remaining = run._replace(start=start)
+                frames = self._frames_within(remaining, target_cost - batch_cost)
+
+                # Always make progress on an empty batch
+                if frames == 0 and not segments:
+                    frames = 1
+
+                if frames == 0:
+                    batches.append(RenderBatch(self._merge(segments), batch_cost))
+                    segments = []
+                    batch_cost = 0.0
+                    continue
+
+                segment = remaining._replace(end=start + frames)
+                segments.append(segment)
+                batch_cost += self._run_cost(segment, frames)
+                start += frames
+
+                if batch_cost >= target_cost:
+                    batches.append(RenderBatch(self._merge(segments), batch_cost))
+                    segments = []
+                    batch_cost = 0.0
+
+        if segments:
+            batches.append(RenderBatch(self._merge(segments), batch_cost))
+
+        return batches
+
+    def estimate_load_balance(self, batches):
+        """
+        Estimate how the batches spread across the workers
+
+        Simulates the process pool handing the next batch in timeline order to
+        the first worker that becomes idle.
+
+        Args:
+            batches (list): List of RenderBatch
+
+        Returns:
+            dict: Estimated cost per worker (`loads`), and the `imbalance` as the
+                ratio of the busiest worker to the average minus one
+        """
+
+        workers = [(0.0, i) for i in range(max(1, self.num_workers))]
+        for batch in batches:
+            load, worker = heapq.heappop(workers)
+            heapq.heappush(workers, (load + batch.cost, worker))
+
+        loads = [load for load, _ in sorted(workers, key=lambda w: w[1])]
+        return {"loads": loads, "imbalance": self.imbalance(loads)}
+
+    @staticmethod
+    def imbalance(loads):
+        """
+        Measure the imbalance of a set of worker loads
+
+        Args:
+            loads (list): Load (cost or busy time) per worker
+
+        Returns:
+            float: Ratio of the busiest worker to the average minus one,
+                0.0 for a perfectly balanced load
+        """
+
+        mean = sum(loads) / len(loads) if loads else 0.0
+        return max(loads) / mean - 1.0 if mean > 0 else 0.0
+
+    def _iter_runs(self, spans):
+        """
+        Split spans into transition and hold segments (mostly for internal use)
+
+        Args:
+            spans (list): List of Segment in timeline order
+
+        Yields:
+            Segment: Transition, hold and idle segments in timeline order
+        """
+
+        transition_frames = get_transition_frames(self.layout)
+        for span in spans:
+            if span.cue is None:
+                yield span
+                continue
+
+            hold_start = span.cue_start + min(
+                transition_frames, span.cue_end - span.cue_start
+            )
+            if hold_start > span.start:
+                yield span._replace(end=min(span.end, hold_start))
+            if span.end > hold_start:
+                yield span._replace(start=max(span.start, hold_start))
+
+    def _is_static_hold(self, run):
+        """
+        Check whether a run is a hold rendered once and repeated
+        (mostly for internal use)
+        """
+
+        # Idle frames without a cue never change
+        if run.cue is None:
+            return True
+
+        hold_start = run.cue_start + min(
+            get_transition_frames(self.layout), run.cue_end - run.cue_start
+        )
+        check = getattr(self.layout, "is_position_dependent", None)
+        position_dependent = check() if callable(check) else True
+        return run.start >= hold_start and not position_dependent
+
+    def _render_cost(self, transition=False):
+        """
+        Cost of rendering one frame (mostly for internal use)
+        """
+
+        cost = self.frame_cost
+        if transition:
+            cost += self.transition_cost
+
+        highlight_effect = getattr(self.layout, "highlight_effect", None)
+        if highlight_effect:
+            cost += self.highlight_costs.get(
+                highlight_effect.effect_type, self.highlight_costs["pulse"]
+            )
+        return cost
+
+    def _run_cost(self, run, frames):
+        """
+        Estimated cost of rendering the first frames of a run
+        (mostly for internal use)
+        """
+
+        if frames <= 0:
+            return 0.0
+        if self._is_static_hold(run):
+            return self._render_cost() + (frames - 1) * self.repeat_cost
+
+        hold_start = run.cue_start + min(
+            get_transition_frames(self.layout), run.cue_end - run.cue_start
+        )
+        return frames * self._render_cost(transition=run.start < hold_start)
+
+    def _frames_within(self, run, budget):
+        """
+        Number of frames of a run that fit into a cost budget
+        (mostly for internal use)
+        """
+
+        frames = run.end - run.start
+        if self._run_cost(run, frames) <= budget:
+            return frames
+        if budget <= 0:
+            return 0
+
+        if self._is_static_hold(run):
+            first_cost = self._render_cost()
+            if budget < first_cost:
+                return 0
+            return min(frames, 1 + int((budget - first_cost) / self.repeat_cost))
+
+        return min(frames, int(budget / self._run_cost(run, 1)))
+
+    @staticmethod
+    def _merge(segments):
+        """
+        Merge adjacent segments of the same cue (mostly for internal use)
+        """
+
+        merged = []
+        for segment in segments:
+            if (
+                merged
+                and merged[-1].cue is segment.cue
+                and merged[-1].cue_start == segment.cue_start
+                and merged[-1].end == segment.start
+            ):
+                merged[-1] = merged[-1]._replace(end=segment.end)
+            else:
+                merged.append(segment)
+        return merged
@@ -0,0 +1,349 @@
+"""
+Memory-mapped frame store for videos
+
+This module stores rendered frames as raw RGB pixels in a single preallocated,
+memory-mapped file, as an alternative to writing one PNG file per frame. Workers
+write their frames straight into their own slots in any order, the encoder reads
+them back without decoding anything, and any rendered frame can be inspected by
+random access. Finished slots are marked in a separate file, so an interrupted
+render resumes where it stopped.
+"""
+
+import bisect
+import json
+import logging
+import os
+
+import numpy as np
+from PIL import Image
+
+from audim.sub2pod.buffers import frame_to_rgb24
+
+logger = logging.getLogger("VideoGenerator")
+
+
+class FrameStore:
+    """
+    Memory-mapped store of raw rendered frames
+
+    The store is a directory with three files:
+
+    - `frames.rgb`: All frames as one uint8 array of shape (N, H, W, 3)
+    - `done`: One byte per slot, set once the slot holds its rendered frame
+    - `index.json`: Size of the frames, the video frame number, repeat count
+      and content key of every slot, and a key describing everything the frames
+      depend on
+
+    A store is reused when it is opened again with the same index, and reset
+    otherwise, so resuming an interrupted render only renders missing slots.
+    Slots whose content key changed, like the frames of an edited subtitle,
+    are rendered again.
+    Frames are always stored opaque, the alpha channel of RGBA frames is
+    dropped, just like FFmpeg does when it encodes them.
+    """
+
+    def __init__(
+        self,
+        store_dir,
+        frame_size,
+        frame_numbers,
+        frame_repeats,
+        key="",
+        slot_keys=None,
+    ):
+        """
+        Open a frame store, creating it or resetting it if needed
+
+        Args:
+            store_dir (str): Directory to keep the store in
+            frame_size (tuple): Width and height of the frames
+            frame_numbers (list): Video frame number each slot is first shown at,
+                in increasing order
+            frame_repeats (list): Number of video frames each slot is shown for
+            key (str): Description of everything the frames depend on, like the
+                layout configuration
+            slot_keys (list): Description of the content of every slot, like the
+                text of its subtitle
+        """
+
+        self.store_dir = store_dir
+        self.frame_size = tuple(frame_size)
+        self.frame_numbers = list(frame_numbers)
+        self.frame_repeats = list(frame_repeats)
+        self.key = key
+        if slot_keys is None:
+            slot_keys = [""] * len(self.frame_numbers)
+        self.slot_keys = list(slot_keys)
+        self._frames = None
+        self._done = None
+
+        if len(self.frame_numbers) != len(self.frame_repeats):
+            raise ValueError(
+                "Invalid frame store index: frame numbers and repeats differ in "
+                f"length ({len(self.frame_numbers)} and {len(self.frame_repeats)})"
+            )
+        if len(self.slot_keys) != len(self.frame_numbers):
+            raise ValueError(
+                "Invalid frame store index: expected one key per slot, got "
+                f"{len(self.slot_keys)} keys for {len(self.frame_numbers)} slots"
+            )
+
+        os.makedirs(store_dir, exist_ok=True)
+        index = self._load_index()
+        old_slot_keys = (
+            index.pop("slot_keys", None) if isinstance(index, dict) else None
+        )
+        new_index = self._index()
+        del new_index["slot_keys"]
+        if index != new_index:
+            self._create()
+        else:
+            self._reset_changed_slots(old_slot_keys)
+            logger.info(
+                f"Resuming frame store in {store_dir} "
+                f"({len(self) - self.missing()} of {len(self)} frames done)"
+            )
+
+    def __len__(self):
+        return len(self.frame_numbers)
+
+    def __getstate__(self):
+        # Memory maps are opened again in every process
+        state = self.__dict__.copy()
+        state["_frames"] = None
+        state["_done"] = None
+        return state
+
+    @property
+    def frames(self):
+        """
+        Get all frames as a memory-mapped array of shape (N, H, W, 3)
+        """
+
+        if self._frames is None:
+            self._open()
+        return self._frames
+
+    @property
+    def nbytes(self):
+        """
+        Get the size of all frames in bytes
+        """
+
+        width, height = self.frame_size
+        return len(self) * height * width * 3
+
+    def write(self, slot, frame):
+        """
+        Write a rendered frame into its slot and mark the slot as done
+
+        Args:
+            slot (int): Index of the slot
+            frame: Rendered frame (numpy array or PIL Image)
+        """
+
+        if isinstance(frame, Image.Image) or not (
+            frame.shape[2] == 3 and frame.flags.c_contiguous
+        ):
+            # Packed by PIL, much faster than copying strided channels
+            frame = np.frombuffer(frame_to_rgb24(frame), dtype=np.uint8).reshape(
+                self.frames.shape[1:]
+            )
+        self.frames[slot] = frame
+        self._done[slot] = 1
+
+    def read(self, slot):
+        """
+        Read the frame of a slot
+
+        Args:
+            slot (int): Index of the slot
+
+        Returns:
+            np.ndarray: RGB frame, a view into the store
+        """
+
+        return self.frames[slot]
+
+    def frame_at(self, frame_number):
+        """
+        Read the frame shown at a video frame number
+
+        Args:
+            frame_number (int): Frame number within the video
+
+        Returns:
+            np.ndarray: RGB frame, a view into the store
+        """
+
+        slot = bisect.bisect_right(self.frame_numbers, frame_number) - 1
+        if slot < 0 or frame_number >= (
+            self.frame_numbers[slot] + self.frame_repeats[slot]
+        ):
+            raise ValueError(f"Frame {frame_number} is not in the frame store")
+        return self.read(slot)
+
+    def is_done(self, slot):
+        """
+        Check whether a slot holds its rendered frame
+
+        Args:
+            slot (int): Index of the slot
+
+        Returns:
+            bool: True if the slot was written
+        """
+
+        if self._done is None:
+            self._open()
+        return bool(self._done[slot])
+
+    def missing(self):
+        """
+        Count the slots that do not hold their rendered frame yet
+
+        Returns:
+            int: Number of missing frames
+        """
+
+        if self._done is None:
+            self._open()
+        return len(self) - int(np.count_nonzero(self._done))
+
+    def flush(self):
+        """
+        Write all changes of this process back to the store files
+        """
+
+        if self._frames is not None and len(self):
+            self._frames.flush()
+            self._done.flush()
+
+    def _index(self):
+        """
+        Describe the layout of the store (mostly for internal use)
+        """
+
+        return {
+            "key": self.key,
+            "frame_size": list(self.frame_size),
+            "frame_numbers": self.frame_numbers,
+            "frame_repeats": self.frame_repeats,
+            "slot_keys": self.slot_keys,
+        }
+
+    def _path(self, name):
+        """
+        Get the path of a store file (mostly for internal use)
+        """
+
+        return os.path.join(self.store_dir, name)
+
+    def _load_index(self):
+        """
+        Load the index of an existing store (mostly for internal use)
+        """
+
+        try:
+            with open(self._path("index.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _create(self):
+        """
+        Preallocate the store files (mostly for internal use)
+
+        The space for all frames is reserved up front where the platform
+        supports it, since running out of disk space while writing to a memory
+        map crashes the writing process.
+        """
+
+        # Remove the index first, so a failure leaves no store to resume from
+        try:
+            os.remove(self._path("index.json"))
+        except FileNotFoundError:
+            pass
+
+        logger.info(
+            f"Allocating frame store of {len(self)} frames "
+            f"({self.nbytes / 1e9:.2f} GB) in {self.store_dir}"
+        )
+        for name, size in (("frames.rgb", self.nbytes), ("done", len(self))):
+            with open(self._path(name), "wb") as f:
+                if size and hasattr(os, "posix_fallocate"):
+                    try:
+                        os.posix_fallocate(f.fileno(), 0, size)
+                    except OSError as e:
+                        raise ValueError(
+                            f"Could not allocate {size / 1e9:.2f} GB for the frame "
+                            f"store in {self.store_dir}: {e}"
+                        )
+                f.truncate(size)
+
+        self._write_index()
+
+        self._frames = None
+        self._done = None
+
+    def _reset_changed_slots(self, slot_keys):
+        """
+        Mark the slots whose content changed as missing (mostly for internal use)
+
+        Args:
+            slot_keys (list | None): Content keys of the slots in the existing
+                store, None if they are unknown
+        """
+
+        if slot_keys == self.slot_keys:
+            return
+
+        if slot_keys is None or len(slot_keys) != len(self):
+            slot_keys = [None] * len(self)
+        changed = [
+            slot
+            for slot, (old_key, new_key) in enumerate(zip(slot_keys, self.slot_keys))
+            if old_key != new_key
+        ]
+
+        # Reset the slots before the index, so a failure never marks a slot done
+        # for content it does not hold
+        if changed:
+            if self._done is None:
+                self._open()
+            self._done[changed] = 0
+            self.flush()
+            logger.info(
+                f"Frame store in {self.store_dir}: {len(changed)} frames changed "
+                "since the last render"
+            )
+        self._write_index()
+
+    def _write_index(self):
+        """
+        Write the index of the store (mostly for internal use)
+        """
+
+        with open(self._path("index.json"), "w", encoding="utf-8") as f:
+            json.dump(self._index(), f)
+
+    def _open(self):
+        """
+        Map the store files into memory (mostly for internal use)
+        """
+
+        width, height = self.frame_size
+        shape = (len(self), height, width, 3)
+
+        # Empty files cannot be memory-mapped
+        if not len(self):
+            self._frames = np.zeros(shape, dtype=np.uint8)
+            self._done = np.zeros(0, dtype=np.uint8)
+            return
+
+        self._frames = np.memmap(
+            self._path("frames.rgb"), dtype=np.uint8, mode="r+", shape=shape
+        )
+        self._done = np.memmap(
+            self._path("done"), dtype=np.uint8, mode="r+", shape=(len(self),)
+        )
@@ -0,0 +1,526 @@
+"""
+Render telemetry for videos
+
+This module records where the time of a render goes. Every stage of the
+pipeline, from parsing the subtitles to cleaning up, is timed in wall and CPU
+time by whichever process or thread runs it. Together with the frame rates,
+the utilization of every render worker and the peak memory use, the stage times
+make up a `RenderReport`, which can be written as JSON or as a Prometheus
+textfile for the node exporter, so job dashboards can track render speed.
+"""
+
+import collections
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Stages of the render pipeline, in order
+STAGES = (
+    "srt_parsing",  # Loading the subtitles and mapping them to frames
+    "batch_planning",  # Partitioning the timeline into render batches
+    "rendering",  # Drawing frames with the layout
+    "serialization",  # Packing frames into raw bytes or image file data
+    "disk_io",  # Reading and writing frame files and cached frames
+    "encoding",  # Encoding the video, including the encoder's own CPU time
+    "cleanup",  # Removing temporary files
+)
+
+# CPU time of finished child processes already counted by a stage, so that no
+# child is counted by two stages measuring at the same time
+_children_lock = threading.Lock()
+_children_counted = 0.0
+
+
+def get_peak_rss():
+    """
+    Get the peak resident set size of the current process
+
+    Returns:
+        int | None: Peak RSS in bytes, None where it cannot be measured
+    """
+
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, and in kilobytes everywhere else
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _get_children_cpu_time():
+    """
+    Get the CPU time of all finished child processes (mostly for internal use)
+
+    Returns:
+        float: User and system time in seconds of all child processes that
+            were waited for, 0 where it cannot be measured
+    """
+
+    if resource is None:
+        return 0.0
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _count_children_cpu_time(since):
+    """
+    Count the CPU time of child processes finished since a point in time
+    (mostly for internal use)
+
+    Args:
+        since (float): CPU time of all finished child processes at that point,
+            from `_get_children_cpu_time`
+
+    Returns:
+        float: CPU time in seconds of the child processes finished since then,
+            which no other stage has counted yet
+    """
+
+    global _children_counted
+
+    with _children_lock:
+        children_time = _get_children_cpu_time()
+        counted, _children_counted = _children_counted, children_time
+    return max(0.0, children_time - max(since, counted))
+
+
+def _escape_label(value):
+    """
+    Escape a Prometheus label value (mostly for internal use)
+
+    Args:
+        value: Label value
+
+    Returns:
+        str: Label value with backslashes, quotes and newlines escaped
+    """
+
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StageTimer:
+    """
+    Accumulates the wall and CPU time spent in each stage
+
+    CPU time is the time of the measuring thread, so threads measuring their
+    stages at the same time never count each other's work. A timer can be
+    shared by several threads.
+    """
+
+    def __init__(self):
+        """
+        Initialize the stage timer
+        """
+
+        self.times = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks cannot be pickled, every process gets a lock of its own
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self, stage, children=False):
+        """
+        Measure the time spent in a stage
+
+        Args:
+            stage (str): Name of the stage
+            children (bool): Also count the CPU time of child processes that
+                are waited for during the stage, like an FFmpeg encoder. A child
+                finishing while several such stages run at the same time is
+                counted by the first of them to finish.
+        """
+
+        children_time = _get_children_cpu_time() if children else 0.0
+        wall_time, cpu_time = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            cpu_time = time.thread_time() - cpu_time
+            if children:
+                cpu_time += _count_children_cpu_time(children_time)
+            self.add(stage, time.perf_counter() - wall_time, cpu_time)
+
+    def add(self, stage, wall_time, cpu_time):
+        """
+        Add time spent in a stage
+
+        Args:
+            stage (str): Name of the stage
+            wall_time (float): Wall time in seconds
+            cpu_time (float): CPU time in seconds
+        """
+
+        with self._lock:
+            times = self.times.setdefault(stage, [0.0, 0.0])
+            times[0] += wall_time
+            times[1] += cpu_time
+
+    def merge(self, times):
+        """
+        Add the times measured by another timer
+
+        Args:
+            times (dict): [wall time, CPU time] in seconds by stage
+        """
+
+        for stage, (wall_time, cpu_time) in times.items():
+            self.add(stage, wall_time, cpu_time)
+
+    def collect(self):
+        """
+        Get the times measured so far, and start over
+
+        Returns:
+            dict: [wall time, CPU time] in seconds by stage
+        """
+
+        with self._lock:
+            times, self.times = self.times, {}
+        return times
+
+
+class RenderReport:
+    """
+    Telemetry of a render, from parsing the subtitles to cleaning up
+
+    Stages run by the render workers (rendering, serialization and disk I/O,
+    and encoding in `'chunked'` export mode) are summed over all workers, so
+    they can add up to more than the elapsed time of the render. Encoding
+    includes the CPU time of the FFmpeg processes, where it can be measured.
+    """
+
+    def __init__(self, **info):
+        """
+        Initialize the render report, which starts the clock of the render
+
+        Args:
+            **info: Settings of the render to report along with the telemetry,
+                like the export mode or the render backend
+        """
+
+        self.info = info
+        self.stages = StageTimer()
+        self.frames = 0
+        self.rendered_frames = 0
+        self.cache_hits = 0
+        self.render_time = 0.0
+        self.worker_busy = collections.Counter()
+        self.reassembly_window = None
+        self.peak_waiting_batches = 0
+        self.elapsed = 0.0
+        self.peak_rss = None
+        self._start_time = time.perf_counter()
+
+    def measure(self, stage, children=False):
+        """
+        Measure the time spent in a stage on the current thread
+
+        Args:
+            stage (str): Name of the stage, one of `STAGES`
+            children (bool): Also count the CPU time of child processes that
+                are waited for during the stage
+
+        Returns:
+            Context manager timing the stage
+        """
+
+        return self.stages.measure(stage, children)
+
+    def add_worker_stats(self, stats):
+        """
+        Add the stats a render worker reported for a batch
+
+        Args:
+            stats (dict): Worker stats with the `worker` id, the `busy` time in
+                seconds, the number of `rendered_frames` and `cache_hits`, the
+                times of the worker's `stages`, and its `peak_rss`
+        """
+
+        self.worker_busy[stats["worker"]] += stats["busy"]
+        self.rendered_frames += stats["rendered_frames"]
+        self.cache_hits += stats["cache_hits"]
+        self.stages.merge(stats["stages"])
+        self._update_peak_rss(stats["peak_rss"])
+
+    def add_reassembly_stats(self, window, peak_waiting):
+        """
+        Add the stats of releasing rendered batches in order
+
+        Args:
+            window (int): Maximum number of batches submitted or waiting to be
+                released at any time
+            peak_waiting (int): Most finished batches that waited for an
+                earlier one at the same time
+        """
+
+        self.reassembly_window = window
+        self.peak_waiting_batches = max(self.peak_waiting_batches, peak_waiting)
+
+    def add_render_time(self, render_time):
+        """
+        Add the elapsed time of rendering frames in parallel
+
+        Args:
+            render_time (float): Wall time in seconds from submitting the first
+                batch to collecting the last one
+        """
+
+        self.render_time += render_time
+
+    def finish(self, frames):
+        """
+        Stop the clock of the render
+
+        Args:
+            frames (int): Number of frames of the exported video
+        """
+
+        self.frames = frames
+        self.elapsed = time.perf_counter() - self._start_time
+        self._update_peak_rss(get_peak_rss())
+
+    @property
+    def fps(self):
+        """
+        Get the frames of video exported per second of the whole render
+        """
+
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def render_fps(self):
+        """
+        Get the distinct frames rendered per second while rendering
+        """
+
+        return self.rendered_frames / self.render_time if self.render_time > 0 else 0.0
+
+    @property
+    def worker_utilization(self):
+        """
+        Get the share of the render time every worker was busy, by worker id
+        """
+
+        if self.render_time <= 0:
+            return {}
+        return {
+            worker: busy / self.render_time for worker, busy in self.worker_busy.items()
+        }
+
+    def to_dict(self):
+        """
+        Get the report as a dictionary of plain values, ready for JSON
+
+        Returns:
+            dict: Settings, stage times, frame counts and rates, worker
+                utilization, batches waiting for reassembly and peak RSS of the
+                render
+        """
+
+        times = self.stages.times
+        stages = {
+            stage: {"wall_time": wall_time, "cpu_time": cpu_time}
+            for stage in STAGES + tuple(sorted(set(times) - set(STAGES)))
+            for wall_time, cpu_time in [times.get(stage, (0.0, 0.0))]
+        }
+        utilization = self.worker_utilization
+
+        return {
+            **self.info,
+            "elapsed": self.elapsed,
+            "stages": stages,
+            "frames": self.frames,
+            "rendered_frames": self.rendered_frames,
+            "cache_hits": self.cache_hits,
+            "render_time": self.render_time,
+            "fps": self.fps,
+            "render_fps": self.render_fps,
+            "workers": [
+                {
+                    "pid": pid,
+                    "thread": thread,
+                    "busy_time": self.worker_busy[pid, thread],
+                    "utilization": utilization.get((pid, thread), 0.0),
+                }
+                for pid, thread in sorted(self.worker_busy)
+            ],
+            "reassembly_window": self.reassembly_window,
+            "peak_waiting_batches": self.peak_waiting_batches,
+            "peak_rss": self.peak_rss,
+        }
+
+    def to_prometheus(self, prefix="audim_render"):
+        """
+        Get the report in the Prometheus text exposition format
+
+        Workers are labelled by their index, so the series stay the same from
+        one render to the next.
+
+        Args:
+            prefix (str): Prefix of all metric names
+
+        Returns:
+            str: Metrics of the render, one gauge per value
+        """
+
+        report = self.to_dict()
+        metrics = []
+
+        def gauge(name, help_text, samples):
+            metrics.append(f"# HELP {prefix}_{name} {help_text}")
+            metrics.append(f"# TYPE {prefix}_{name} gauge")
+            for labels, value in samples:
+                labels = ",".join(
+                    f'{key}="{_escape_label(label)}"' for key, label in labels.items()
+                )
+                labels = f"{{{labels}}}" if labels else ""
+                metrics.append(f"{prefix}_{name}{labels} {value:.9g}")
+
+        gauge("info", "Settings of the render", [(self.info, 1)])
+        gauge(
+            "elapsed_seconds",
+            "Wall time of the whole render",
+            [({}, report["elapsed"])],
+        )
+        gauge(
+            "stage_wall_seconds",
+            "Wall time spent in each stage, summed over all workers",
+            [
+                ({"stage": stage}, t["wall_time"])
+                for stage, t in report["stages"].items()
+            ],
+        )
+        gauge(
+            "stage_cpu_seconds",
+            "CPU time spent in each stage, summed over all workers",
+            [
+                ({"stage": stage}, t["cpu_time"])
+                for stage, t in report["stages"].items()
+            ],
+        )
+        gauge("frames", "Frames of the exported video", [({}, report["frames"])])
+        gauge(
+            "rendered_frames",
+            "Distinct frames rendered or reused from the render cache",
+            [({}, report["rendered_frames"])],
+        )
+        gauge(
+            "cache_hits",
+            "Frames reused from the render cache",
+            [({}, report["cache_hits"])],
+        )
+        gauge(
+            "frames_per_second",
+            "Frames of video exported per second of the whole render",
+            [({}, report["fps"])],
+        )
+        gauge(
+            "render_frames_per_second",
+            "Distinct frames rendered per second while rendering",
+            [({}, report["render_fps"])],
+        )
+        gauge(
+            "worker_utilization_ratio",
+            "Share of the render time each worker was busy",
+            [
+                ({"worker": str(index)}, worker["utilization"])
+                for index, worker in enumerate(report["workers"])
+            ],
+        )
+        if report["reassembly_window"] is not None:
+            gauge(
+                "reassembly_window_batches",
+                "Most batches rendering or waiting to be released in order",
+                [({}, report["reassembly_window"])],
+            )
+            gauge(
+                "peak_waiting_batches",
+                "Most finished batches waiting for an earlier one to be released",
+                [({}, report["peak_waiting_batches"])],
+            )
+        if report["peak_rss"] is not None:
+            gauge(
+                "peak_rss_bytes",
+                "Peak resident set size of the largest render process",
+                [({}, report["peak_rss"])],
+            )
+
+        return "\n".join(metrics) + "\n"
+
+    def write(self, path):
+        """
+        Write the report to a file
+
+        The file is written to a temporary file first and then moved in place,
+        so a collector never reads a partially written report.
+
+        Args:
+            path (str): Path of the report file, a Prometheus textfile for the
+                node exporter if it ends with `.prom`, and JSON otherwise
+        """
+
+        if path.endswith(".prom"):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.to_dict(), indent=2) + "\n"
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Created with the mode of any new file, as restricted by the umask,
+        # since collectors like the node exporter often run as another user,
+        # while tempfile makes files only readable by their owner
+        temp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def summary(self):
+        """
+        Get a one-line summary of the report, for logging
+
+        Returns:
+            str: Elapsed time, frame rates and the wall time of every stage
+        """
+
+        times = self.stages.times
+        return (
+            f"{self.elapsed:.1f}s elapsed, {self.fps:.1f} fps overall, "
+            f"{self.render_fps:.1f} fps rendering; "
+            + ", ".join(
+                f"{stage} {times[stage][0]:.1f}s" for stage in STAGES if stage in times
+            )
+        )
+
+    def _update_peak_rss(self, peak_rss):
+        """
+        Keep the largest peak RSS of any render process (mostly for internal use)
+
+        Args:
+            peak_rss (int | None): Peak RSS of a process in bytes
+        """
+
+        if peak_rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, peak_rss)
@@ -0,0 +1,258 @@
+"""
+Timeline of videos
+
+This module maps every frame of a video to the subtitle cue shown on it, using
+exact rational timing. It is built once from the subtitles, after which the state
+of any frame can be looked up in constant time, so arbitrary frame ranges can be
+rendered deterministically by any worker.
+"""
+
+import bisect
+import collections
+import math
+from fractions import Fraction
+
+import numpy as np
+
+# Compact subtitle data, with `start` and `end` in milliseconds
+Cue = collections.namedtuple("Cue", ["index", "start", "end", "text"])
+
+# A contiguous range of frames [start, end) of one cue, which spans the frames
+# [cue_start, cue_end) of the timeline. Idle ranges without any cue have no
+# `cue`, and span just their own frames.
+Segment = collections.namedtuple(
+    "Segment", ["cue", "cue_start", "cue_end", "start", "end"]
+)
+
+# State of a single frame, `cue` is None for idle frames
+FrameState = collections.namedtuple(
+    "FrameState", ["frame", "cue", "cue_start", "cue_end"]
+)
+
+# Exact NTSC frame rates for their customary decimal spellings
+NTSC_FRAME_RATES = {
+    "23.976": Fraction(24000, 1001),
+    "29.97": Fraction(30000, 1001),
+    "59.94": Fraction(60000, 1001),
+}
+
+
+def parse_fps(fps):
+    """
+    Parse a frame rate into an exact fraction
+
+    Args:
+        fps (int | float | str | Fraction): Frame rate, like `30`, `29.97`,
+            `'30000/1001'` or `Fraction(30000, 1001)`. The decimal NTSC rates
+            `23.976`, `29.97` and `59.94` are read as their exact fractions.
+
+    Returns:
+        Fraction: Frame rate in frames per second
+    """
+
+    if isinstance(fps, Fraction):
+        rate = fps
+    elif isinstance(fps, float) and f"{fps:g}" in NTSC_FRAME_RATES:
+        rate = NTSC_FRAME_RATES[f"{fps:g}"]
+    elif isinstance(fps, str) and fps.strip() in NTSC_FRAME_RATES:
+        rate = NTSC_FRAME_RATES[fps.strip()]
+    else:
+        try:
+            rate = Fraction(fps)
+        except (TypeError, ValueError, ZeroDivisionError):
+            raise ValueError(f"Invalid frame rate: {fps}")
+
+    if rate <= 0:
+        raise ValueError(f"Invalid frame rate: {fps}")
+    return rate
+
+
+class Timeline:
+    """
+    Frame-exact index of the cues of a video
+
+    Frame `n` covers the time from `n / fps` up to `(n + 1) / fps` seconds, and
+    shows the cue that is active at the start of that time. A cue starting or
+    ending within a frame is therefore shown from the frame containing its start
+    up to, but excluding, the frame containing its end.
+
+    Frames without any active cue are idle. Where cues overlap, the cue that
+    started last is shown, and an earlier cue that is still active is shown again
+    once the later one has ended.
+    """
+
+    def __init__(self, cues, fps, time_offset=0):
+        """
+        Initialize the timeline
+
+        Args:
+            cues (list): List of cues with `start` and `end` in milliseconds
+            fps (int | float | str | Fraction): Frames per second
+            time_offset (int): Time in milliseconds shown on the first frame
+        """
+
+        self.fps = parse_fps(fps)
+        self.time_offset = time_offset
+
+        # Later starting cues are painted over earlier ones,
+        # cues starting together keep their order
+        self.cues = sorted(cues, key=lambda cue: cue.start)
+        self._cue_starts = [self.frame_at(cue.start) for cue in self.cues]
+        self._cue_ends = [self.frame_at(cue.end) for cue in self.cues]
+
+        self.total_frames = max(self._cue_ends, default=0)
+        self._frame_cues = np.full(self.total_frames, -1, dtype=np.int32)
+        self.overlapping_frames = 0
+        for i, (start, end) in enumerate(zip(self._cue_starts, self._cue_ends)):
+            start = max(0, start)
+            if end <= start:
+                continue
+            self.overlapping_frames += int(
+                np.count_nonzero(self._frame_cues[start:end] >= 0)
+            )
+            self._frame_cues[start:end] = i
+
+        # Boundaries of the runs of frames showing the same cue (or idle)
+        changes = np.flatnonzero(np.diff(self._frame_cues)) + 1
+        self._run_starts = [0, *changes.tolist()] if self.total_frames else []
+
+    def __len__(self):
+        return self.total_frames
+
+    def frame_at(self, time_ms):
+        """
+        Get the frame showing a point in time
+
+        Args:
+            time_ms (int): Time in milliseconds
+
+        Returns:
+            int: Frame number, negative before the start of the timeline
+        """
+
+        return math.floor(Fraction(time_ms - self.time_offset, 1000) * self.fps)
+
+    def window(self, start=None, end=None):
+        """
+        Get the frame range of a time window
+
+        Args:
+            start (float, optional): Start of the window in seconds since the
+                start of the timeline, defaults to the start of the timeline
+            end (float, optional): End of the window in seconds since the start
+                of the timeline, defaults to the end of the timeline
+
+        Returns:
+            tuple: (first frame, frame after the last frame), clamped to the
+                timeline
+        """
+
+        first = 0
+        if start is not None:
+            first = max(0, self.frame_at(self.time_offset + round(start * 1000)))
+
+        last = self.total_frames
+        if end is not None:
+            last = min(last, self.frame_at(self.time_offset + round(end * 1000)))
+
+        if first >= last:
+            raise ValueError(
+                f"Invalid window: {start} to {end} seconds contains no frames "
+                f"of the {float(self.time_of(self.total_frames)):.2f}s timeline"
+            )
+        return first, last
+
+    def time_of(self, frame):
+        """
+        Get the exact start time of a frame
+
+        Args:
+            frame (int): Frame number
+
+        Returns:
+            Fraction: Time in seconds since the start of the timeline
+        """
+
+        return frame / self.fps
+
+    def cue_at(self, frame):
+        """
+        Get the cue shown on a frame
+
+        Args:
+            frame (int): Frame number
+
+        Returns:
+            Cue | None: Cue shown on the frame, None for idle frames
+        """
+
+        return self.state_at(frame).cue
+
+    def state_at(self, frame):
+        """
+        Get the state of a frame in constant time
+
+        Args:
+            frame (int): Frame number
+
+        Returns:
+            FrameState: The frame, its cue and the frame range of that cue,
+                the cue and its range are None for idle frames
+        """
+
+        if not 0 <= frame < self.total_frames:
+            raise ValueError(
+                f"Frame {frame} is outside of the timeline "
+                f"(0 to {self.total_frames - 1})"
+            )
+
+        i = int(self._frame_cues[frame])
+        if i < 0:
+            return FrameState(frame, None, None, None)
+        return FrameState(frame, self.cues[i], self._cue_starts[i], self._cue_ends[i])
+
+    def spans(self, start=0, end=None):
+        """
+        Split a range of frames into runs showing the same cue
+
+        Args:
+            start (int): First frame of the range
+            end (int, optional): Frame after the end of the range,
+                defaults to the end of the timeline
+
+        Returns:
+            list: List of Segment in timeline order, idle runs have no cue
+        """
+
+        end = self.total_frames if end is None else min(end, self.total_frames)
+        start = max(0, start)
+        if start >= end:
+            return []
+
+        spans = []
+        run = bisect.bisect_right(self._run_starts, start) - 1
+        while run < len(self._run_starts) and self._run_starts[run] < end:
+            run_start = self._run_starts[run]
+            run_end = (
+                self._run_starts[run + 1]
+                if run + 1 < len(self._run_starts)
+                else self.total_frames
+            )
+
+            i = int(self._frame_cues[run_start])
+            if i < 0:
+                cue, cue_start, cue_end = None, run_start, run_end
+            else:
+                cue, cue_start, cue_end = (
+                    self.cues[i],
+                    self._cue_starts[i],
+                    self._cue_ends[i],
+                )
+            spans.append(
+                Segment(
+                    cue, cue_start, cue_end, max(start, run_start), min(end, run_end)
+                )
+            )
+            run += 1
+
+        return spans
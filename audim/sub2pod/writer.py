@@ -0,0 +1,157 @@
+"""
+Pipelined frame writer for videos
+
+This module saves rendered frames to image files on a small pool of background
+threads, so that a render worker can render the next frame while the previous
+ones are still being compressed and written. Pillow releases the GIL while it
+encodes images, so compressing and rendering run in parallel.
+"""
+
+import collections
+import concurrent.futures
+import io
+
+from PIL import Image
+
+from audim.sub2pod.buffers import frame_to_image, frame_to_rgb24
+from audim.sub2pod.telemetry import StageTimer
+
+# Image formats frames can be written in, by file extension
+FRAME_FORMATS = {
+    "png": "PNG",  # Compressed, small files
+    "ppm": "PPM",  # Uncompressed raw RGB, fastest to write and read
+}
+
+
+class FrameWriter:
+    """
+    Writes frames to image files on background threads
+
+    Only a bounded number of frames is queued at any time. Once the queue is
+    full, `write` waits for the oldest frame to be written, so a render worker
+    never gets more than a few frames ahead of the disk.
+
+    The writer threads time encoding the frames (serialization) and writing
+    the files (disk I/O) separately in `timer`.
+    """
+
+    def __init__(self, frame_format="png", compress_level=6, threads=2, max_queued=4):
+        """
+        Initialize the frame writer
+
+        Args:
+            frame_format (str): Image format of the frame files, `'png'`
+                (default) or `'ppm'`
+            compress_level (int): PNG compression level, from 0 (no compression,
+                fastest) to 9 (smallest files), defaults to Pillow's default of 6
+            threads (int): Number of writer threads
+            max_queued (int): Maximum number of frames waiting to be written
+        """
+
+        if frame_format not in FRAME_FORMATS:
+            raise ValueError(
+                f"Invalid frame format: {frame_format}. "
+                f"Choose one of: {', '.join(FRAME_FORMATS)}"
+            )
+        if not 0 <= compress_level <= 9:
+            raise ValueError(
+                f"Invalid compress level: {compress_level}. Must be from 0 to 9"
+            )
+
+        self.frame_format = frame_format
+        self.compress_level = compress_level
+        self.threads = threads
+        self.max_queued = max(1, max_queued)
+        self.timer = StageTimer()
+        self._executor = None
+        self._queued = collections.deque()
+
+    def __getstate__(self):
+        # Writer threads are started again in every process
+        state = self.__dict__.copy()
+        state["timer"] = StageTimer()
+        state["_executor"] = None
+        state["_queued"] = collections.deque()
+        return state
+
+    @property
+    def extension(self):
+        """
+        Get the file extension of the frame files, like `'.png'`
+        """
+
+        return f".{self.frame_format}"
+
+    def write(self, frame, frame_path):
+        """
+        Queue a frame to be written to an image file
+
+        The frame must not be modified until it has been written.
+
+        Args:
+            frame: Rendered frame (numpy array or PIL Image)
+            frame_path (str): Path of the image file to write
+        """
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix="FrameWriter"
+            )
+
+        # Wait for the oldest frame once the queue is full
+        while len(self._queued) >= self.max_queued:
+            self._queued.popleft().result()
+
+        self._queued.append(self._executor.submit(self.save, frame, frame_path))
+
+    def flush(self):
+        """
+        Wait until all queued frames are written
+
+        Raises the first error of any failed write.
+        """
+
+        while self._queued:
+            self._queued.popleft().result()
+
+    def close(self):
+        """
+        Write all queued frames and stop the writer threads
+        """
+
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def save(self, frame, frame_path):
+        """
+        Write a frame to an image file right away
+
+        Args:
+            frame: Rendered frame (numpy array or PIL Image)
+            frame_path (str): Path of the image file to write
+        """
+
+        with self.timer.measure("serialization"):
+            if self.frame_format == "png":
+                data = io.BytesIO()
+                frame_to_image(frame).save(
+                    data, format="PNG", compress_level=self.compress_level
+                )
+                chunks = [data.getbuffer()]
+            else:
+                # The raw RGB pixels after the same header Pillow writes. PPM has
+                # no alpha channel, which FFmpeg drops when encoding anyway
+                if isinstance(frame, Image.Image):
+                    width, height = frame.size
+                else:
+                    height, width = frame.shape[:2]
+                header = b"P6\n%d %d\n255\n" % (width, height)
+                chunks = [header, frame_to_rgb24(frame)]
+
+        with self.timer.measure("disk_io"):
+            with open(frame_path, "wb") as f:
+                f.writelines(chunks)
@@ -3,8 +3,6 @@ import time
 from datetime import datetime
 
 import pysrt
-from pydub import AudioSegment
-from pydub.playback import play
 
 
 class Playback:
@@ -66,6 +64,10 @@ class Playback:
             srt_file (str): Path to the SRT subtitle file
         """
 
+        # Import locally since this is a heavier dependency
+        from pydub import AudioSegment
+        from pydub.playback import play
+
         try:
             # Load the audio file
             audio = AudioSegment.from_file(audio_file)
@@ -0,0 +1,151 @@
+"""
+Micro-benchmark of subtitle text wrapping
+
+Wraps the transcripts of the example podcasts in `docs/assets` with
+`TextRenderer.wrap_text`, with and without its kerning check, and with the
+previous algorithm, which measured the whole line again after every word.
+Every cue is wrapped on its own, like the subtitles of a video, and joined into
+monologues of consecutive cues of the same speaker, as a stress test for long
+text.
+
+Run it in the development environment, from the root of the repository:
+
+    python benchmarks/bench_wrap.py
+"""
+
+import argparse
+import glob
+import os
+import re
+import timeit
+
+import pysrt
+
+from audim.sub2pod.elements.text import TextRenderer
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "..", "docs", "assets")
+
+
+def legacy_wrap(font, text, max_width):
+    """
+    Wrap text like `TextRenderer` did before `wrap_text`
+
+    Args:
+        font (FreeTypeFont): Font of the text
+        text (str): Text to wrap
+        max_width (int): Maximum width of a line
+
+    Returns:
+        list: Lines of the text
+    """
+
+    lines = []
+    current_line = []
+
+    for word in text.split():
+        current_line.append(word)
+        w = font.getlength(" ".join(current_line))
+        if w > max_width:
+            current_line.pop()
+            lines.append(" ".join(current_line))
+            current_line = [word]
+    lines.append(" ".join(current_line))
+
+    return lines
+
+
+def load_transcripts(assets_dir=ASSETS_DIR):
+    """
+    Load the cues of the example transcripts
+
+    Args:
+        assets_dir (str): Directory with one subdirectory per example podcast
+
+    Returns:
+        tuple: (list of cue texts, list of monologue texts)
+    """
+
+    cues = []
+    monologues = []
+
+    for path in sorted(glob.glob(os.path.join(assets_dir, "*", "*.srt"))):
+        speaker = None
+        for sub in pysrt.open(path):
+            match = re.match(r"\[(.*?)\]\s*(.*)", sub.text.replace("\n", " "))
+            cue_speaker, text = match.groups() if match else (speaker, sub.text)
+            cues.append(text)
+            if cue_speaker == speaker and monologues:
+                monologues[-1] += " " + text
+            else:
+                monologues.append(text)
+            speaker = cue_speaker
+
+    return cues, monologues
+
+
+def bench(wrap, texts, repeat):
+    """
+    Time a wrapping function
+
+    Args:
+        wrap (callable): Function wrapping a text
+        texts (list): Texts to wrap
+        repeat (int): Number of timed runs, the fastest one is reported
+
+    Returns:
+        float: Time per text in microseconds
+    """
+
+    # Warm up the font and width caches, like a render does after its first cue
+    for text in texts:
+        wrap(text)
+
+    best = min(
+        timeit.repeat(lambda: [wrap(text) for text in texts], number=1, repeat=repeat)
+    )
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--font-size", type=int, default=40)
+    parser.add_argument("--max-width", type=int, nargs="+", default=[400, 800, 1500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    renderer = TextRenderer()
+    font = renderer.get_font(args.font_size)
+    cues, monologues = load_transcripts()
+
+    print(f"{len(cues)} cues, {len(monologues)} monologues, {font.getname()[0]}")
+    print(
+        f"{'texts':<12}{'width':>6}{'words':>7}{'legacy':>11}"
+        f"{'checked':>11}{'unchecked':>11}{'same breaks':>13}"
+    )
+    for name, texts in (("cues", cues), ("monologues", monologues)):
+        words = sum(len(text.split()) for text in texts) / len(texts)
+        for max_width in args.max_width:
+            wrappers = {
+                "legacy": lambda text: legacy_wrap(font, text, max_width),
+                "checked": lambda text: renderer.wrap_text(
+                    text, max_width, args.font_size
+                ),
+                "unchecked": lambda text: renderer.wrap_text(
+                    text, max_width, args.font_size, kerning_check=False
+                ),
+            }
+            times = {
+                key: bench(wrap, texts, args.repeat) for key, wrap in wrappers.items()
+            }
+            same = sum(
+                wrappers["legacy"](text) == wrappers["checked"](text) for text in texts
+            )
+            print(
+                f"{name:<12}{max_width:>6}{words:>7.0f}"
+                + "".join(f"{times[key]:>9.1f}us" for key in wrappers)
+                + f"{same:>8}/{len(texts)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
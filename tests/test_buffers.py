@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from audim.sub2pod.buffers import FrameBuffer
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "RGBX"])
+def test_drawing_writes_into_the_buffer(mode):
+    buffer = FrameBuffer((8, 4), np.zeros((4, 8, 4), dtype=np.uint8))
+    image = buffer.get_image(mode)
+
+    ImageDraw.Draw(image).rectangle((0, 0, 1, 1), fill=(255, 0, 0, 255))
+    image.paste(Image.new("RGBA", (2, 2), (0, 0, 255, 255)), (6, 2))
+
+    # Drawing must not have made the image copy the buffer
+    assert buffer.get_image(mode) is image
+    np.testing.assert_array_equal(buffer.array[0, 0, :3], [255, 0, 0])
+    np.testing.assert_array_equal(buffer.array[3, 7, :3], [0, 0, 255])
+    assert buffer.view(image) is buffer.array
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from audim.sub2pod.cache import RenderCache
+from audim.sub2pod.core import VideoGenerator
+from audim.sub2pod.layouts.podcast import PodcastLayout
+from audim.sub2pod.timeline import Cue
+
+
+def _make_layout(highlight):
+    layout = PodcastLayout(video_width=320, video_height=180, header_height=40)
+    layout.set_transition_effect("fade")
+    layout.set_highlight_effect(highlight)
+    return layout
+
+
+def _transition_frame(layout, render_cache, cue, index, frames=5):
+    duration = (cue.end - cue.start) / 1000.0
+    return VideoGenerator._render_frame(
+        layout,
+        render_cache,
+        sub=cue,
+        kind="transition",
+        index=index,
+        frames=frames,
+        opacity=int(index / frames * 255),
+        subtitle_position=index / 30,
+        subtitle_duration=duration,
+    )
+
+
+@pytest.mark.parametrize("highlight", ["glow", "pulse"])
+def test_animated_transitions_are_keyed_by_duration(tmp_path, highlight):
+    layout = _make_layout(highlight)
+    render_cache = RenderCache(str(tmp_path), layout, 30)
+    short_cue = Cue(1, 0, 1000, "[Host] Yeah.")
+    long_cue = Cue(2, 5000, 9000, "[Host] Yeah.")
+
+    for index in range(5):
+        _transition_frame(layout, render_cache, short_cue, index)
+
+    for index in range(5):
+        frame, _ = _transition_frame(layout, render_cache, long_cue, index)
+        assert frame is not None, "transition frame of a longer cue was reused"
+        frame = np.array(frame)
+
+        uncached, _ = _transition_frame(layout, None, long_cue, index)
+        np.testing.assert_array_equal(frame, np.asarray(uncached))
+
+
+def test_static_transitions_are_shared_across_durations(tmp_path):
+    layout = _make_layout("box")
+    render_cache = RenderCache(str(tmp_path), layout, 30)
+    short_cue = Cue(1, 0, 1000, "[Host] Yeah.")
+    long_cue = Cue(2, 5000, 9000, "[Host] Yeah.")
+
+    short_key = render_cache.frame_key(short_cue, "transition", 2, 5)
+    long_key = render_cache.frame_key(long_cue, "transition", 2, 5)
+    assert short_key == long_key
@@ -0,0 +1,34 @@
+import concurrent.futures
+import time
+
+from audim.sub2pod.reassembly import BatchReassembler
+
+
+def test_slow_sink_keeps_batches_within_the_window():
+    window = 3
+    submitted = []
+    released = []
+    outstanding = []
+
+    def render(batch):
+        # Later batches finish first, so they wait for the earlier ones
+        time.sleep(0.002 * (window - batch % window))
+        return batch
+
+    def sink(index, result):
+        time.sleep(0.005)
+        released.append(result)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+
+        def submit(batch):
+            submitted.append(batch)
+            outstanding.append(len(submitted) - len(released))
+            return executor.submit(render, batch)
+
+        reassembler = BatchReassembler(submit, sink, window=window)
+        assert reassembler.run(range(50)) == 50
+
+    assert released == list(range(50))
+    assert max(outstanding) <= window
+    assert 0 < reassembler.peak_waiting <= window
@@ -0,0 +1,24 @@
+import numpy as np
+
+from audim.sub2pod.store import FrameStore
+
+
+def _open_store(store_dir, slot_keys):
+    return FrameStore(
+        str(store_dir), (4, 2), [0, 1, 5], [1, 4, 2], key="layout", slot_keys=slot_keys
+    )
+
+
+def test_changed_slots_are_rendered_again(tmp_path):
+    store = _open_store(tmp_path, ["a", "b", "c"])
+    for slot in range(len(store)):
+        store.write(slot, np.full((2, 4, 3), slot, dtype=np.uint8))
+    store.flush()
+
+    store = _open_store(tmp_path, ["a", "edited", "c"])
+    assert [store.is_done(slot) for slot in range(len(store))] == [True, False, True]
+    np.testing.assert_array_equal(store.read(2), np.full((2, 4, 3), 2))
+
+    # The new keys are kept, so the next run only misses the changed slot
+    store = _open_store(tmp_path, ["a", "edited", "c"])
+    assert store.missing() == 1
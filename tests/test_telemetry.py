@@ -0,0 +1,37 @@
+import os
+import stat
+
+from audim.sub2pod.telemetry import RenderReport
+
+
+def test_report_file_mode_follows_umask(tmp_path):
+    report = RenderReport(export_mode="frames")
+    report.finish(10)
+
+    umask = os.umask(0o022)
+    try:
+        report.write(str(tmp_path / "render.prom"))
+    finally:
+        os.umask(umask)
+
+    mode = stat.S_IMODE(os.stat(tmp_path / "render.prom").st_mode)
+    assert mode == 0o644
+    assert os.listdir(tmp_path) == ["render.prom"]
+
+
+def test_report_without_render_time(tmp_path):
+    report = RenderReport(export_mode="frames")
+    report.add_worker_stats(
+        {
+            "worker": (1, 1),
+            "busy": 0.5,
+            "rendered_frames": 3,
+            "cache_hits": 0,
+            "stages": {"rendering": [0.5, 0.5]},
+            "peak_rss": None,
+        }
+    )
+    report.finish(3)
+
+    assert report.to_dict()["workers"][0]["utilization"] == 0.0
+    report.write(str(tmp_path / "render.prom"))
@@ -0,0 +1,65 @@
+import glob
+import os
+import re
+
+import pysrt
+import pytest
+
+from audim.sub2pod.elements.text import TextRenderer
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "..", "docs", "assets")
+
+
+def _legacy_wrap(font, text, max_width):
+    # Wrapping before wrap_text, measuring the whole line after every word
+    lines = []
+    current_line = []
+    for word in text.split():
+        current_line.append(word)
+        if font.getlength(" ".join(current_line)) > max_width:
+            current_line.pop()
+            lines.append(" ".join(current_line))
+            current_line = [word]
+    lines.append(" ".join(current_line))
+    return lines
+
+
+def _load_texts():
+    cues = []
+    for path in sorted(glob.glob(os.path.join(ASSETS_DIR, "*", "*.srt"))):
+        for sub in pysrt.open(path):
+            cues.append(re.sub(r"^\[.*?\]\s*", "", sub.text.replace("\n", " ")))
+    return cues + [" ".join(cues)]
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    return TextRenderer()
+
+
+@pytest.mark.parametrize("max_width", [200, 400, 800, 1500])
+def test_line_breaks_match_legacy_wrapping(renderer, max_width):
+    font = renderer.get_font(40)
+    texts = _load_texts()
+    assert len(texts) > 100
+
+    for text in texts:
+        expected = _legacy_wrap(font, text, max_width)
+        # Except for the empty line before a first word wider than the line
+        if expected[0] == "" and len(expected) > 1:
+            expected = expected[1:]
+        assert renderer.wrap_text(text, max_width, 40) == expected
+
+
+def test_long_first_word_has_no_empty_line_before_it(renderer):
+    font = renderer.get_font(40)
+    text = "Supercalifragilisticexpialidocious is a word"
+
+    lines = renderer.wrap_text(text, 200, 40)
+    assert lines[0] == "Supercalifragilisticexpialidocious"
+    # The previous wrapping started with an empty line instead
+    assert _legacy_wrap(font, text, 200) == [""] + lines
+
+    # Later long words got a line of their own before as well
+    text = "a " + text
+    assert renderer.wrap_text(text, 200, 40) == _legacy_wrap(font, text, 200)